@@ -1,14 +1,17 @@
 import time
 import math
+import numpy as np
 from src.utils.graph import Graph
 from src.algorithms.a_star import AStar
 from src.algorithms.csp import CSP
 from src.algorithms.genetic_algorithm import GeneticAlgorithm
+from src.algorithms.assignment import AssignmentSolver
 from src.utils.visualization import plot_routes
 from src.utils.data_generator import generate_data
 from src.models.drone import Drone
 from src.models.delivery_point import DeliveryPoint
 from src.models.no_fly_zone import NoFlyZone
+from src.models.store import DeliveryStore, DroneStore
 
 def print_separator(title):
     print("\n" + "="*60)
@@ -116,7 +119,7 @@ def evaluate_astar_performance(drones, deliveries, no_fly_zones, graph):
                 
                 if path:
                     successful_paths += 1
-                    print(f"Drone {drone.id} → DP {target_delivery.id}: Başarılı (Maliyet: {cost:.2f}, Süre: {elapsed_time:.4f}s)")
+                    print(f"Drone {drone.id} → DP {target_delivery.id}: Başarılı (Maliyet: {cost:.2f}, Süre: {elapsed_time:.4f}s, Genişletilen: {a_star.stats['expanded']})")
                     
                     # Kapasite kontrolü
                     if target_delivery.weight > drone.max_weight:
@@ -136,15 +139,24 @@ def evaluate_astar_performance(drones, deliveries, no_fly_zones, graph):
     print(f"  - Başarılı Yollar: {successful_paths}")
     print(f"  - Başarısız Yollar: {failed_paths}")
     print(f"  - Ortalama Süre: {avg_time:.4f} saniye")
+    print(f"  - Yol Önbelleği: {a_star.cache_stats['hits']} isabet / {a_star.cache_stats['misses']} ıska")
     print(f"  - Başarı Oranı: {(successful_paths/(successful_paths+failed_paths)*100) if (successful_paths+failed_paths) > 0 else 0:.1f}%")
     
+    # Tüm drone × teslimat maliyetleri: drone başına tek tarama
+    start_time = time.time()
+    costs = a_star.cost_matrix([graph.index_of(f"drone_{drone.id}") for drone in drones],
+                               [graph.index_of(f"dp_{dp.id}") for dp in deliveries], drones)
+    matrix_time = time.time() - start_time
+    print(f"  - Maliyet Matrisi ({costs.shape[0]}×{costs.shape[1]}): {matrix_time:.4f} saniye, "
+          f"ulaşılabilir çift: {int(np.isfinite(costs).sum())}")
+    
     return total_time, successful_paths, failed_paths
 
-def evaluate_csp_performance(drones, deliveries, no_fly_zones):
+def evaluate_csp_performance(drones, deliveries, no_fly_zones, graph=None):
 
     print_subsection("CSP Analizi")
     
-    csp = CSP(drones, deliveries, no_fly_zones)
+    csp = CSP(drones, deliveries, no_fly_zones, graph=graph)
         
     start_time = time.time()
     try:
@@ -153,10 +165,14 @@ def evaluate_csp_performance(drones, deliveries, no_fly_zones):
         
         if assignments:
             print(f"\nCSP Çözüm Bulundu! (Süre: {csp_time:.4f} saniye)")
+            print(f"  - Arama Düğümü: {csp.stats.get('nodes', 0)}, Budama: {csp.stats.get('pruned', 0)}"
+                  f"{' (bütçe aşıldı, greedy sonuç)' if csp.stats.get('budget_exhausted') else ''}")
             
             # Kısıt ihlallerini kontrol et
             constraint_violations = 0
             assigned_deliveries = set()
+            drone_store = DroneStore(drones)
+            dp_store = DeliveryStore(deliveries)
             
             for drone_id, delivery_ids in assignments.items():
                 if delivery_ids:
@@ -168,9 +184,9 @@ def evaluate_csp_performance(drones, deliveries, no_fly_zones):
                         assigned_deliveries.add(dp_id)
                     
                     # Kapasite kontrolü
-                    drone = next((d for d in drones if d.id == drone_id), None)
+                    drone = drone_store.get(drone_id)
                     if drone:
-                        total_weight = sum(next(d.weight for d in deliveries if d.id == dp_id) for dp_id in delivery_ids)
+                        total_weight = sum(dp_store.get(dp_id).weight for dp_id in delivery_ids)
                         if total_weight > drone.max_weight:
                             constraint_violations += 1
                             print(f"  ⚠️  Kapasite aşımı Drone {drone_id}: {total_weight:.1f} > {drone.max_weight:.1f}")
@@ -181,6 +197,13 @@ def evaluate_csp_performance(drones, deliveries, no_fly_zones):
             print(f"  - Atanan Teslimat: {assigned_count}/{len(deliveries)} ({assignment_rate:.1f}%)")
             print(f"  - Kısıt İhlali: {constraint_violations}")
             
+            # Süre sınırlı dal-sınır: greedy çözümden başlayıp 500 ms içinde iyileştir
+            csp.solve_anytime(current_time="00:00", deadline=0.5)
+            report = csp.report
+            print(f"  - Dal-Sınır (500 ms): amaç {report['objective']:.1f}, alt sınır {report['lower_bound']:.1f}, "
+                  f"boşluk %{report['gap'] * 100:.1f}, atanmayan {report['unassigned']}"
+                  f"{' (optimal)' if report['optimal'] else ''}")
+            
         else:
             print(f"\nCSP Çözüm Bulunamadı! (Süre: {csp_time:.4f} saniye)")
             constraint_violations = len(deliveries)  # Tüm teslimatlar başarısız
@@ -213,11 +236,14 @@ def evaluate_ga_performance(drones, deliveries, no_fly_zones, graph):
         
         print(f"\nGA Tamamlandı! (Süre: {ga_time:.4f} saniye)")
         print(f"En İyi Fitness: {best_fitness:.2f}")
+        print(f"Fitness Değerlendirme: {ga.stats['evaluations']} (önbellek isabeti: {ga.stats['cache_hits']})")
+        print(f"Durma Nedeni: {ga.stop_reason} ({len(ga.history['best'])} nesil)")
         
         # Route analizi
         total_deliveries = 0
         total_energy = 0
         constraint_violations = 0
+        dp_store = DeliveryStore(deliveries)
         
         for i, route in enumerate(best_routes):
             if route:
@@ -230,7 +256,7 @@ def evaluate_ga_performance(drones, deliveries, no_fly_zones, graph):
                     total_energy += route_energy
                     
                     # Kapasite kontrolü
-                    route_weight = sum(next(d.weight for d in deliveries if d.id == dp_id) for dp_id in route if any(d.id == dp_id for d in deliveries))
+                    route_weight = sum(dp_store.get(dp_id).weight for dp_id in route if dp_id in dp_store.index)
                     if route_weight > drone.max_weight:
                         constraint_violations += 1
         
@@ -255,6 +281,23 @@ def evaluate_ga_performance(drones, deliveries, no_fly_zones, graph):
     
     return ga_time, best_routes, best_fitness
 
+def evaluate_assignment_performance(drones, deliveries, graph):
+    """Tek paket kuralında kesin atama çözücüsünün performansını değerlendir"""
+    print_subsection("Optimal Atama Analizi (Macar Algoritması)")
+    
+    solver = AssignmentSolver(drones, deliveries, graph)
+    start_time = time.time()
+    routes, fitness = solver.run(current_time="00:00")
+    assignment_time = time.time() - start_time
+    
+    delivered = sum(len(route) for route in routes)
+    print(f"\nAtama Tamamlandı! (Süre: {assignment_time:.4f} saniye)")
+    print(f"  - Teslimat Sayısı: {delivered}/{len(deliveries)}")
+    print(f"  - Fitness: {fitness:.2f}")
+    print(f"  - Atama Maliyeti (en iyilenen amaç): {solver.objective:.2f}")
+    
+    return assignment_time, routes, fitness
+
 def run_scenario(scenario_name, num_drones, num_deliveries, num_no_fly_zones, use_fixed_data=False, fixed_data=None):
     """Test senaryosunu çalıştır"""
     print_separator(f"SENARYO: {scenario_name}")
@@ -275,8 +318,9 @@ def run_scenario(scenario_name, num_drones, num_deliveries, num_no_fly_zones, us
     
     # Algoritma performansları
     astar_time, successful_paths, failed_paths = evaluate_astar_performance(drones, deliveries, no_fly_zones, graph)
-    csp_time, csp_assignments, csp_violations = evaluate_csp_performance(drones, deliveries, no_fly_zones)
+    csp_time, csp_assignments, csp_violations = evaluate_csp_performance(drones, deliveries, no_fly_zones, graph)
     ga_time, ga_routes, ga_fitness = evaluate_ga_performance(drones, deliveries, no_fly_zones, graph)
+    assignment_time, assignment_routes, assignment_fitness = evaluate_assignment_performance(drones, deliveries, graph)
     
     # Özet
     print_subsection("SENARYO ÖZETİ")
@@ -284,16 +328,19 @@ def run_scenario(scenario_name, num_drones, num_deliveries, num_no_fly_zones, us
     print(f"  - A*: {astar_time:.4f} saniye")
     print(f"  - CSP: {csp_time:.4f} saniye") 
     print(f"  - GA: {ga_time:.4f} saniye")
+    print(f"  - Optimal Atama: {assignment_time:.4f} saniye")
     
     # Tamamlanma oranları
     astar_completion = (successful_paths / len(drones)) * 100 if len(drones) > 0 else 0
     csp_completion = ((len(deliveries) - csp_violations) / len(deliveries)) * 100 if len(deliveries) > 0 else 0
     ga_completion = (sum(len(route) if route else 0 for route in ga_routes) / len(deliveries)) * 100 if len(deliveries) > 0 else 0
+    assignment_completion = (sum(len(route) for route in assignment_routes) / len(deliveries)) * 100 if len(deliveries) > 0 else 0
     
     print(f"Tamamlanma Oranları:")
     print(f"  - A*: {astar_completion:.1f}%")
     print(f"  - CSP: {csp_completion:.1f}%")
     print(f"  - GA: {ga_completion:.1f}%")
+    print(f"  - Optimal Atama: {assignment_completion:.1f}%")
     
     # Enerji tüketimi (tahmini)
     avg_energy = sum(d.battery * 0.1 for d in drones) / len(drones)
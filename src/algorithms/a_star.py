@@ -1,75 +1,294 @@
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from heapq import heappush, heappop
-from typing import List, Tuple, Dict
+from typing import List, Tuple, Dict, Optional, Sequence
+import numpy as np
 from src.utils.graph import Graph
+from src.algorithms.landmarks import LandmarkTable
 from src.models.drone import Drone
 
 class AStar:
-    def __init__(self, graph: Graph):
+    def __init__(self, graph: Graph, detour: bool = False, bidirectional: bool = False, landmarks: int = 0,
+                 cache_size: int = 1024):
+        """detour=True: kenar maliyetleri, aktif uçuş yasağı bölgelerinin etrafından dolaşan gerçek uçuş mesafesini kullanır.
+
+        bidirectional=True: sorgular çift yönlü Dijkstra ile çözülür. Her sorgunun genişletme sayıları `stats` içindedir.
+        landmarks=K: K işaret düğümlü (ALT) sezgisel kullanılır; ön hesaplama graf üzerinde (graph.landmarks) saklanır.
+        cache_size: en fazla bu kadar yol sonucu LRU önbellekte tutulur (0 = kapalı); sayaçlar `cache_stats` içindedir.
+        """
         self.graph = graph
+        self.detour = detour
+        self.bidirectional = bidirectional
+        self.landmarks = landmarks
+        self.stats: Dict[str, int] = {"expanded": 0, "pushed": 0}
+        self._node_arrays: Optional[Tuple[int, np.ndarray, np.ndarray, np.ndarray]] = None
+        self._weight_steps = np.empty(0)
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[tuple, Tuple[List[int], float]]" = OrderedDict()
+        self._cache_version = graph.version
+        self.cache_stats: Dict[str, int] = {"hits": 0, "misses": 0, "evictions": 0}
+        if landmarks:
+            self.landmark_table()
+
+    def landmark_table(self) -> Optional[LandmarkTable]:
+        """Grafın işaret düğümü tablosu; yoksa ya da graf değiştiyse yeniden kurulur."""
+        if not self.landmarks:
+            return None
+        table = self.graph.landmarks
+        if table is None or table.version != self.graph.version or len(table.landmarks) != self.landmarks:
+            # İşaret mesafeleri kuş uçuşu kenarlarla ve kapasite kısıtı olmadan hesaplanır: her drone ve zaman için alt sınırdır
+            table = LandmarkTable.build(AStar(self.graph), self.landmarks)
+            self.graph.landmarks = table
+        return table
+
+    def _arrays(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Düğüm başına maliyet çarpanı (teslimat ağırlığı, drone için 1), öncelik bonusu ve teslimat maskesi."""
+        graph = self.graph
+        if self._node_arrays is None or self._node_arrays[0] != graph.version:
+            n = len(graph.nodes)
+            weight = np.ones(n)
+            bonus = np.zeros(n)
+            is_dp = np.zeros(n, dtype=bool)
+            store = graph.delivery_store
+            for k, dp_id in enumerate(store.ids.tolist()):
+                j = graph.node_index.get(f"dp_{dp_id}")
+                if j is None or is_dp[j]:
+                    continue
+                weight[j] = store.weights[k]
+                bonus[j] = (6 - store.priorities[k]) * 100
+                is_dp[j] = True
+            self._node_arrays = (graph.version, weight, bonus, is_dp)
+            self._weight_steps = np.unique(weight[is_dp])
+        return self._node_arrays[1:]
+
+    def _edge_lengths(self, u: int, current_time: Optional[int]) -> Tuple[np.ndarray, np.ndarray]:
+        """u düğümünün komşuları ve kenar uzunlukları (detour modunda dolambaçlı uçuş mesafesi)."""
+        nbrs, lengths = self.graph.neighbors_with_distances(u)
+        if self.detour:
+            lengths = self.graph.detour_table(current_time).distances[u, nbrs]
+        return nbrs, lengths
+
+    def _goal_lower_bound(self, goal: int, scale: float, bonus: float) -> np.ndarray:
+        """Her düğümden hedefe kalan maliyet için tutarlı alt sınır: scale × kuş uçuşu + hedefin öncelik bonusu."""
+        graph = self.graph
+        if graph.distance_matrix is not None:
+            straight = graph.distance_matrix[:, goal].astype(np.float64)
+        else:
+            diff = graph.coordinates - graph.coordinates[goal]
+            straight = np.hypot(diff[:, 0], diff[:, 1])
+        h = scale * straight + bonus
+        h[goal] = 0.0
+        return h
 
-    def _heuristic(self, node1: str, node2: str, drone: Drone, current_time: int = 0) -> float:
-        """Heuristic fonksiyonu: mesafe + dinamik uçuş yasağı cezası."""
-        pos1 = self.graph.get_node_position(node1)
-        pos2 = self.graph.get_node_position(node2)
-        distance = ((pos1[0] - pos2[0]) ** 2 + (pos1[1] - pos2[1]) ** 2) ** 0.5
-        
-        # Dinamik no-fly zone kontrolü
-        penalty = 0
-        for nfz in self.graph.no_fly_zones:
-            if nfz.is_active(current_time) and self.graph._is_line_intersecting_no_fly_zone(pos1, pos2, nfz.coordinates):
-                penalty = 1000
-                break
-        
-        return distance + penalty
-
-    def _cost(self, node1: str, node2: str, drone: Drone) -> float:
-        """Maliyet fonksiyonu: Cost(distance) = distance × weight + (priority × 100)"""
-        pos1 = self.graph.get_node_position(node1)
-        pos2 = self.graph.get_node_position(node2)
-        distance = ((pos1[0] - pos2[0]) ** 2 + (pos1[1] - pos2[1]) ** 2) ** 0.5
-    
-        if node2.startswith("dp_"):
-            try:
-                dp_id = int(node2.split("_")[1])
-                dp = next(dp for dp in self.graph.delivery_points if dp.id == dp_id)
-                
-                # Kapasite kontrolü
-                if dp.weight > drone.max_weight:
-                    return float('inf')
-                
-                # Priority mantığı düzeltildi: Yüksek öncelik = düşük maliyet
-                priority_bonus = (6 - dp.priority) * 100  # Priority 5→100, Priority 1→500
-                cost = distance * dp.weight + priority_bonus
-                return cost
-            except StopIteration:
-                return distance * 1.0
-        return distance
- 
     def find_path(self, start: str, goal: str, drone: Drone, current_time: int = 0) -> Tuple[List[str], float]:
         """A* algoritması ile en kısa yolu bulur."""
-        open_set = []
-        heappush(open_set, (0, start))
-        came_from: Dict[str, str] = {}
-        g_score: Dict[str, float] = {start: 0}
-        f_score: Dict[str, float] = {start: self._heuristic(start, goal, drone, current_time)}
+        path, cost = self.find_path_indices(self.graph.index_of(start), self.graph.index_of(goal), drone, current_time)
+        return [self.graph.nodes[i] for i in path], cost
+
+    def _cache_key(self, start: int, goal: int, drone: Drone, current_time: Optional[int]) -> tuple:
+        """Sonucu belirleyen her şey: uçlar, drone'un taşıyabildiği teslimat kümesi ve (detour modunda) bölge aktiflik dilimi.
+
+        Kapasite sınıfı, drone'un taşıyabildiği teslimat ağırlığı eşiklerinin sayısıdır; hız maliyete girmediği için anahtarda yoktur.
+        Kuş uçuşu modunda maliyetler bölgelerden bağımsız olduğundan zaman dilimi anahtara katılmaz.
+        """
+        self._arrays()
+        capacity_class = int(np.searchsorted(self._weight_steps, drone.max_weight, side="right"))
+        slice_id = self.graph.edge_cache.slices.slice_of(current_time) if self.detour else None
+        return start, goal, capacity_class, slice_id
+
+    def clear_cache(self):
+        """Yol önbelleğini boşalt."""
+        self._cache.clear()
+        self._cache_version = self.graph.version
+
+    def find_path_indices(self, start: int, goal: int, drone: Drone, current_time: int = 0) -> Tuple[List[int], float]:
+        """Düğüm indeksleri üzerinde en kısa yol (önbellekten ya da arama ile)."""
+        if not self.cache_size:
+            return self._solve(start, goal, drone, current_time)
+        if self._cache_version != self.graph.version:
+            # Düğüm ya da bölge değişti: eski yollar geçersiz
+            self.clear_cache()
+        key = self._cache_key(start, goal, drone, current_time)
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            self.cache_stats["hits"] += 1
+            self.stats = {"expanded": 0, "pushed": 0}
+            return list(cached[0]), cached[1]
+        self.cache_stats["misses"] += 1
+        path, cost = self._solve(start, goal, drone, current_time)
+        self._cache[key] = (path, cost)
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+            self.cache_stats["evictions"] += 1
+        return list(path), cost
+
+    def _solve(self, start: int, goal: int, drone: Drone, current_time: int = 0) -> Tuple[List[int], float]:
+        """Kapalı küme, tembel silmeli yığın ve önceden hesaplanmış sezgisel dizisiyle en kısa yol.
+
+        Kenar maliyeti _cost ile aynıdır (teslimat düğümüne giriş: mesafe × ağırlık + öncelik bonusu, kapasite aşımı inf).
+        Sezgisel değer tutarlı olduğundan her düğüm en fazla bir kez genişletilir ve bulunan yol en ucuz yoldur.
+        """
+        weight, bonus, is_dp = self._arrays()
+        # Drone'un taşıyamayacağı teslimat düğümlerine giriş yasak
+        blocked = is_dp & (weight > drone.max_weight)
+        if self.bidirectional:
+            return self._bidirectional(start, goal, weight, bonus, blocked, current_time)
 
-        while open_set:
+        scale = min(1.0, float(weight[is_dp & ~blocked].min(initial=1.0)))
+        h = self._goal_lower_bound(goal, scale, bonus[goal])
+        table = self.landmark_table()
+        if table is not None:
+            h = np.maximum(h, table.lower_bound(goal))
+        stop = np.zeros(len(self.graph.nodes), dtype=bool)
+        stop[goal] = True
+        g, parent, closed = self._search(start, h, stop, weight, bonus, blocked, current_time)
+        if not closed[goal]:
+            return [], float('inf')
+        return _trace(parent, goal), float(g[goal])
+
+    def _search(self, start: int, h: np.ndarray, stop: np.ndarray, weight: np.ndarray, bonus: np.ndarray,
+                blocked: np.ndarray, current_time: Optional[int], reverse: bool = False) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Tek kaynaklı arama (h = 0 ise Dijkstra); `stop` maskesindeki düğümlerin tamamı kapanınca durur.
+
+        reverse=True: kenarlar ters yönde gezilir, g[u] = u'dan start'a en ucuz yol maliyeti olur.
+        """
+        n = len(self.graph.nodes)
+        g = np.full(n, np.inf)
+        parent = np.full(n, -1, dtype=np.int64)
+        closed = np.zeros(n, dtype=bool)
+        g[start] = 0.0
+        open_set = [(h[start], start)]
+        remaining = int(stop.sum())
+        expanded = pushed = 0
+        while open_set and remaining:
             current = heappop(open_set)[1]
-            if current == goal:
-                path = []
-                while current in came_from:
-                    path.append(current)
-                    current = came_from[current]
-                path.append(start)
-                return path[::-1], g_score[goal]
-
-            for neighbor in self.graph.get_neighbors(current):
-                tentative_g_score = g_score[current] + self._cost(current, neighbor, drone)
-                if tentative_g_score < g_score.get(neighbor, float('inf')):
-                    came_from[neighbor] = current
-                    g_score[neighbor] = tentative_g_score
-                    f_score[neighbor] = tentative_g_score + self._heuristic(neighbor, goal, drone, current_time)
-                    if neighbor not in [item[1] for item in open_set]:
-                        heappush(open_set, (f_score[neighbor], neighbor))
-
-        return [], float('inf')
\ No newline at end of file
+            if closed[current]:
+                continue  # Eskimiş yığın girdisi (tembel silme)
+            closed[current] = True
+            expanded += 1
+            if stop[current]:
+                remaining -= 1
+                if not remaining:
+                    break
+            nbrs, lengths = self._edge_lengths(current, current_time)
+            if not reverse:
+                costs = np.where(blocked[nbrs], np.inf, lengths * weight[nbrs] + bonus[nbrs])
+            elif blocked[current]:
+                costs = np.full(len(nbrs), np.inf)
+            else:
+                # Ters kenar u → current: maliyet current'a bağlı
+                costs = lengths * weight[current] + bonus[current]
+            tentative = g[current] + costs
+            better = (tentative < g[nbrs]) & ~closed[nbrs]
+            for neighbor, score in zip(nbrs[better].tolist(), tentative[better].tolist()):
+                g[neighbor] = score
+                parent[neighbor] = current
+                heappush(open_set, (score + h[neighbor], neighbor))
+            pushed += int(better.sum())
+        self.stats = {"expanded": expanded, "pushed": pushed}
+        return g, parent, closed
+
+    def costs_from(self, source: int, targets: Sequence[int], drone: Drone, current_time: int = 0) -> np.ndarray:
+        """Tek Dijkstra taramasıyla kaynaktan tüm hedeflere en ucuz yol maliyetleri (ulaşılamayan hedef inf)."""
+        weight, bonus, is_dp = self._arrays()
+        blocked = is_dp & (weight > drone.max_weight)
+        targets = np.asarray(targets, dtype=np.int64)
+        stop = np.zeros(len(self.graph.nodes), dtype=bool)
+        stop[targets] = True
+        g, _, _ = self._search(int(source), np.zeros(len(stop)), stop, weight, bonus, blocked, current_time)
+        return g[targets]
+
+    def cost_matrix(self, sources: Sequence[int], targets: Sequence[int], drones: Sequence[Drone],
+                    current_time: int = 0, workers: int = 1) -> np.ndarray:
+        """Kaynak×hedef maliyet matrisi; her kaynak için (drones[i] ile) tek tarama, D×P yerine D arama.
+
+        workers > 1 ise kaynaklar süreç havuzunda paralel taranır (her işçiye arama motoru bir kez gönderilir).
+        """
+        if len(sources) != len(drones):
+            raise ValueError("sources ve drones aynı uzunlukta olmalıdır")
+        targets = np.asarray(targets, dtype=np.int64)
+        jobs = [(int(source), drone) for source, drone in zip(sources, drones)]
+        if workers > 1 and len(jobs) > 1:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(self, targets, current_time)) as pool:
+                rows = list(pool.map(_worker_costs, jobs, chunksize=max(1, len(jobs) // (4 * workers))))
+        else:
+            rows = [self.costs_from(source, targets, drone, current_time) for source, drone in jobs]
+        return np.array(rows, dtype=np.float64).reshape(len(jobs), len(targets))
+
+    def _bidirectional(self, start: int, goal: int, weight: np.ndarray, bonus: np.ndarray, blocked: np.ndarray,
+                       current_time: Optional[int]) -> Tuple[List[int], float]:
+        """Çift yönlü Dijkstra: ileri arama start'tan, geri arama goal'dan; en iyi buluşma maliyeti kanıtlanınca durur."""
+        n = len(self.graph.nodes)
+        dist = [np.full(n, np.inf), np.full(n, np.inf)]
+        parent = [np.full(n, -1, dtype=np.int64), np.full(n, -1, dtype=np.int64)]
+        closed = [np.zeros(n, dtype=bool), np.zeros(n, dtype=bool)]
+        heaps = [[(0.0, start)], [(0.0, goal)]]
+        dist[0][start] = dist[1][goal] = 0.0
+        best, meet = (0.0, start) if start == goal else (np.inf, -1)
+        expanded = pushed = 0
+        while heaps[0] and heaps[1] and heaps[0][0][0] + heaps[1][0][0] < best:
+            side = 0 if heaps[0][0][0] <= heaps[1][0][0] else 1
+            current = heappop(heaps[side])[1]
+            if closed[side][current]:
+                continue
+            closed[side][current] = True
+            expanded += 1
+            nbrs, lengths = self._edge_lengths(current, current_time)
+            if side == 0:
+                # İleri kenar current → v: maliyet hedef düğüm v'ye bağlı
+                costs = np.where(blocked[nbrs], np.inf, lengths * weight[nbrs] + bonus[nbrs])
+            elif blocked[current]:
+                costs = np.full(len(nbrs), np.inf)
+            else:
+                # Geri kenar u → current: maliyet current'a bağlı
+                costs = lengths * weight[current] + bonus[current]
+            tentative = dist[side][current] + costs
+            # Karşı tarafın ulaştığı düğümler üzerinden buluşma
+            through = tentative + dist[1 - side][nbrs]
+            k = int(np.argmin(through)) if len(nbrs) else -1
+            if k >= 0 and through[k] < best:
+                best = float(through[k])
+                meet = (current, int(nbrs[k])) if side == 0 else (int(nbrs[k]), current)
+            better = (tentative < dist[side][nbrs]) & ~closed[side][nbrs]
+            for neighbor, score in zip(nbrs[better].tolist(), tentative[better].tolist()):
+                dist[side][neighbor] = score
+                parent[side][neighbor] = current
+                heappush(heaps[side], (score, neighbor))
+            pushed += int(better.sum())
+        self.stats = {"expanded": expanded, "pushed": pushed}
+        if meet == -1:
+            return [], float('inf')
+        if start == goal:
+            return [start], 0.0
+        u, v = meet
+        forward = _trace(parent[0], u)
+        backward = _trace(parent[1], v)[::-1]
+        # Buluşma kenarı boyunca maliyet, ileri yönde tek tek toplanarak yeniden hesaplanır
+        path = forward + backward
+        return path, self._path_cost(path, weight, bonus, current_time)
+
+    def _path_cost(self, path: List[int], weight: np.ndarray, bonus: np.ndarray, current_time: Optional[int]) -> float:
+        """Yol maliyetini ileri yönde kenar kenar topla (tek yönlü aramayla aynı kayan nokta sırası)."""
+        graph = self.graph
+        cost = 0.0
+        for u, v in zip(path, path[1:]):
+            length = graph.flight_distance(u, v, current_time) if self.detour else graph.distance(u, v)
+            cost = cost + (length * weight[v] + bonus[v])
+        return float(cost)
+
+_worker_state: Dict[str, object] = {}
+
+def _init_worker(engine: "AStar", targets: np.ndarray, current_time: int):
+    _worker_state.update(engine=engine, targets=targets, current_time=current_time)
+
+def _worker_costs(job: Tuple[int, Drone]) -> np.ndarray:
+    source, drone = job
+    return _worker_state["engine"].costs_from(source, _worker_state["targets"], drone, _worker_state["current_time"])
+
+def _trace(parent: np.ndarray, node: int) -> List[int]:
+    """Ebeveyn dizisinden node'a giden yolu (baştan sona) çıkar."""
+    path = [node]
+    while parent[path[-1]] != -1:
+        path.append(int(parent[path[-1]]))
+    return path[::-1]
@@ -0,0 +1,132 @@
+from typing import List, Tuple
+import numpy as np
+from src.utils.graph import Graph
+from src.models.drone import Drone
+from src.models.delivery_point import DeliveryPoint
+from src.models.store import DeliveryStore, DroneStore
+
+def linear_sum_assignment(cost: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Dikdörtgen maliyet matrisi için en küçük toplam maliyetli tam eşleme (Macar / Jonker-Volgenant).
+
+    Her satır (satır sayısı sütun sayısından fazlaysa her sütun) tam olarak bir kez eşlenir. Maliyetler sonlu
+    olmalıdır. Kısa yol araması potansiyellerle yapılır; iç döngü tüm sütunlar üzerinde vektöreldir: O(n² m).
+    Dönen (satırlar, sütunlar) satır sırasına göredir.
+    """
+    cost = np.asarray(cost, dtype=np.float64)
+    if cost.ndim != 2:
+        raise ValueError(f"Geçersiz maliyet matrisi boyutu: {cost.shape}")
+    if not np.isfinite(cost).all():
+        raise ValueError("Maliyet matrisi sonlu olmalıdır")
+    transposed = cost.shape[0] > cost.shape[1]
+    if transposed:
+        cost = cost.T
+    n, m = cost.shape
+    # 1 tabanlı indeksler: sütun 0 ve satır 0 kukla düğümdür
+    u = np.zeros(n + 1)
+    v = np.zeros(m + 1)
+    match = np.zeros(m + 1, dtype=np.int64)  # match[j]: j sütununa eşlenen satır (0 = boş)
+    way = np.zeros(m + 1, dtype=np.int64)
+    for i in range(1, n + 1):
+        match[0] = i
+        j0 = 0
+        min_slack = np.full(m + 1, np.inf)
+        used = np.zeros(m + 1, dtype=bool)
+        while True:
+            used[j0] = True
+            i0 = match[j0]
+            slack = cost[i0 - 1] - u[i0] - v[1:]
+            free = ~used[1:]
+            better = free & (slack < min_slack[1:])
+            min_slack[1:][better] = slack[better]
+            way[1:][better] = j0
+            candidates = np.where(free, min_slack[1:], np.inf)
+            j1 = int(np.argmin(candidates)) + 1
+            delta = candidates[j1 - 1]
+            u[match[used]] += delta
+            v[used] -= delta
+            min_slack[1:][free] -= delta
+            j0 = j1
+            if match[j0] == 0:
+                break
+        # Artırma yolu boyunca eşlemeyi güncelle
+        while j0:
+            j1 = way[j0]
+            match[j0] = match[j1]
+            j0 = j1
+
+    cols = np.flatnonzero(match[1:]) + 1
+    rows = match[cols] - 1
+    cols = cols - 1
+    if transposed:
+        rows, cols = cols, rows
+    order = np.argsort(rows, kind="stable")
+    return rows[order], cols[order]
+
+class AssignmentSolver:
+    """Tek paket kuralında (her drone en fazla bir teslimat) dağıtım dalgasının kesin çözümü.
+
+    Drone×teslimat maliyeti A*/CSP ile aynı modeldir: mesafe × ağırlık + (6 - öncelik) × 100; kapasiteyi aşan ya da
+    uçuş yasağı bölgesinden geçen çiftler sonsuz maliyetlidir. Önce teslimat sayısı, sonra toplam maliyet en iyilenir.
+    Çıktı GeneticAlgorithm.run ile aynı biçimdedir: (drone başına rota listesi, fitness).
+    """
+    def __init__(self, drones: List[Drone], delivery_points: List[DeliveryPoint], graph: Graph, detour: bool = False):
+        """detour=True: mesafe bölgelerin etrafından dolaşan uçuş mesafesidir; ulaşılamayan çiftler sonsuz maliyetlidir."""
+        self.drones = drones
+        self.delivery_points = delivery_points
+        self.graph = graph
+        self.detour = detour
+        self._drone_nodes = np.array([graph.index_of(f"drone_{drone.id}") for drone in drones], dtype=np.int64)
+        self._dp_nodes = np.array([graph.index_of(f"dp_{dp.id}") for dp in delivery_points], dtype=np.int64)
+        self.objective = 0.0  # Son run'da en iyilenen toplam atama maliyeti (seçilen çiftlerin cost_matrix toplamı)
+
+    def distance_matrix(self) -> np.ndarray:
+        """Drone×teslimat uçuş mesafeleri (D×P)."""
+        if self.detour:
+            return self.graph.detour_table().distances[np.ix_(self._drone_nodes, self._dp_nodes)]
+        src = self.graph.coordinates[self._drone_nodes]
+        dst = self.graph.coordinates[self._dp_nodes]
+        return np.hypot(src[:, None, 0] - dst[None, :, 0], src[:, None, 1] - dst[None, :, 1])
+
+    def cost_matrix(self) -> np.ndarray:
+        """Drone×teslimat atama maliyetleri (D×P); olanaksız çiftler inf."""
+        distance = self.distance_matrix()
+        drone_store, drone_rows = DroneStore.view(self.drones)
+        dp_store, dp_rows = DeliveryStore.view(self.delivery_points)
+        weight = dp_store.weights[dp_rows]
+        bonus = (6 - dp_store.priorities[dp_rows]) * 100.0
+        max_weight = drone_store.max_weight[drone_rows]
+        cost = distance * weight[None, :] + bonus[None, :]
+        infeasible = weight[None, :] > max_weight[:, None]
+        if not self.detour:
+            # GA fitness'ı ile aynı: tüm bölgeler (zamandan bağımsız) engel sayılır
+            infeasible |= self.graph.blocking_matrix(self._drone_nodes, self._dp_nodes)
+        return np.where(infeasible | ~np.isfinite(distance), np.inf, cost)
+
+    def run(self, current_time: str = "00:00") -> Tuple[List[List[int]], float]:
+        """En iyi atamayı bul; current_time GeneticAlgorithm.run ile uyum için alınır.
+
+        Fitness, GA ile aynı formüldür: teslimat × 50 - toplam enerji × 0.1 (atamalar olanaklı olduğundan ihlal yoktur).
+        Çözücünün asıl en iyilediği toplam atama maliyeti self.objective'e yazılır.
+        """
+        routes: List[List[int]] = [[] for _ in self.drones]
+        self.objective = 0.0
+        if not self.drones or not self.delivery_points:
+            return routes, 0.0
+        cost = self.cost_matrix()
+        feasible = np.isfinite(cost)
+        # Olanaksız çift "atanmamış" demektir; cezası, tüm olanaklı maliyetlerin toplamından büyük olduğundan
+        # çözücü önce atanan teslimat sayısını en büyükler
+        penalty = float(cost[feasible].max(initial=0.0)) * min(cost.shape) + 1.0
+        rows, cols = linear_sum_assignment(np.where(feasible, cost, penalty))
+        keep = feasible[rows, cols]
+        rows, cols = rows[keep], cols[keep]
+        self.objective = float(cost[rows, cols].sum())
+
+        distance = self.distance_matrix()[rows, cols]
+        drone_store, drone_rows = DroneStore.view(self.drones)
+        speed = drone_store.speed[drone_rows[rows]]
+        total_energy = float(np.sum(distance * 5 / speed))
+        for i, j in zip(rows.tolist(), cols.tolist()):
+            routes[i] = [self.delivery_points[j].id]
+        fitness = len(rows) * 50 - total_energy * 0.1
+        return routes, fitness
@@ -1,43 +1,227 @@
-from typing import List, Dict, Tuple
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Callable, List, Dict, Sequence, Tuple, Optional
+import heapq
+import multiprocessing
+import os
+import time
+import numpy as np
 from src.models.drone import Drone
 from src.models.delivery_point import DeliveryPoint, sort_deliveries_by_priority
 from src.models.no_fly_zone import NoFlyZone
+from src.models.store import DeliveryStore, DroneStore
+from src.utils.graph import Graph
+from src.utils.spatial_index import ZoneIndex
+from src.utils.geometry import segment_intersects_polygon, segments_intersect_polygons
+from src.utils.visibility import blocked_pairs
+
+# Teslimatlar arası yay tabloları (P×P) yalnızca bu kadar teslimat çiftine kadar kurulur
+_MAX_ARC_PAIRS = 1 << 22
+# Erişilebilirlik belleğinin en fazla kayıt sayısı; dolunca boşaltılır
+_MAX_REACH_MEMO = 1 << 14
+
+class _SearchState:
+    """Aramanın tek, yerinde değişen durumu: drone başına konum/düğüm/batarya/zaman, rotalar ve geri alma izi.
+
+    Alan matrisinde yalnızca False'a dönen hücreler (düz indeksleri) ize yazılır; her derinlik izdeki başlangıç
+    konumunu saklar. Böylece bir hamle O(1) + budanan hücre sayısı, geri alınması da yalnızca o hücreleri geri yazar.
+    Rotalar ve iz derinlik kadar büyür (baştan P boyutlu ayrılmaz); Drone nesneleri hiç değiştirilmez. Teslimat başına
+    alan boyutları (sizes) aynı izle güncel tutulur, MRV seçimi her düğümde satırları yeniden saymaz.
+    """
+    def __init__(self, drone_states: List[Dict], domains: np.ndarray):
+        self.pos = [state['pos'] for state in drone_states]
+        self.node = [state['node'] for state in drone_states]
+        self.battery = [state['battery'] for state in drone_states]
+        self.time = [state['time'] for state in drone_states]
+        self.routes: List[List[int]] = [[] for _ in drone_states]
+        self.unassigned = np.ones(domains.shape[0], dtype=bool)
+        self.domains = np.ascontiguousarray(domains)
+        self._cells_view = self.domains.reshape(-1)
+        self.sizes = self.domains.sum(axis=1)
+        self.depth = 0
+        # Derinlik başına geri alma izi: değişen drone (-1 = teslimat boş bırakıldı), eski durumu ve iz başlangıcı
+        self._trail_drone: List[int] = []
+        self._trail_state: List[Optional[tuple]] = []
+        self._trail_mark: List[int] = []
+        self._cells = np.empty(64, dtype=np.int64)
+        self._cell_count = 0
+
+    def restrict(self, k: int, keep: np.ndarray):
+        """k drone'unun alan sütununu keep ile kes; False'a dönen hücreleri ize yaz."""
+        flipped = np.flatnonzero(self.domains[:, k] & ~keep)
+        if len(flipped) == 0:
+            return
+        count = self._cell_count + len(flipped)
+        if count > len(self._cells):
+            self._cells = np.resize(self._cells, max(count, 2 * len(self._cells)))
+        self._cells[self._cell_count:count] = flipped * self.domains.shape[1] + k
+        self._cell_count = count
+        self.domains[flipped, k] = False
+        self.sizes[flipped] -= 1
+
+    def apply(self, k: int, j: int, pos, node: Optional[int], battery: float, current_time: float):
+        """j teslimatını k drone'una ata ve drone durumunu güncelle."""
+        self._trail_drone.append(k)
+        self._trail_state.append((self.pos[k], self.node[k], self.battery[k], self.time[k]))
+        self._trail_mark.append(self._cell_count)
+        self.pos[k], self.node[k], self.battery[k], self.time[k] = pos, node, battery, current_time
+        self.routes[k].append(j)
+        self.unassigned[j] = False
+        self.depth += 1
+
+    def end_states(self) -> List[Dict]:
+        """Drone sırasıyla güncel (rota sonu) durumları."""
+        return [{'pos': pos, 'node': node, 'battery': battery, 'time': current_time}
+                for pos, node, battery, current_time in zip(self.pos, self.node, self.battery, self.time)]
+
+    def skip(self, j: int):
+        """j teslimatını atamadan geç (dal-sınırda cezalı dal)."""
+        self._trail_drone.append(-1)
+        self._trail_state.append(None)
+        self._trail_mark.append(self._cell_count)
+        self.unassigned[j] = False
+        self.depth += 1
+
+    def undo(self, j: int):
+        """Son hamleyi (j teslimatı) ve ondan sonra budanan alan hücrelerini geri al."""
+        self.depth -= 1
+        k = self._trail_drone.pop()
+        state = self._trail_state.pop()
+        mark = self._trail_mark.pop()
+        cells = self._cells[mark:self._cell_count]
+        self._cells_view[cells] = True
+        np.add.at(self.sizes, cells // self.domains.shape[1], 1)
+        self._cell_count = mark
+        if k >= 0:
+            self.pos[k], self.node[k], self.battery[k], self.time[k] = state
+            self.routes[k].pop()
+        self.unassigned[j] = True
+
+    def assignment(self, drones: List[Drone], dps: List[DeliveryPoint], include_empty: bool) -> Dict[int, List[int]]:
+        """Güncel rotaları {drone_id: [dp_id, ...]} sözlüğü olarak döndür."""
+        result = {}
+        for k, drone in enumerate(drones):
+            if self.routes[k] or include_empty:
+                result.setdefault(drone.id, []).extend(dps[j].id for j in self.routes[k])
+        return result
 
 class CSP:
-    def __init__(self, drones: List[Drone], delivery_points: List[DeliveryPoint], no_fly_zones: List[NoFlyZone]):
+    def __init__(self, drones: List[Drone], delivery_points: List[DeliveryPoint], no_fly_zones: List[NoFlyZone],
+                 graph: Optional[Graph] = None, detour_routing: bool = False, variable_order: str = "mrv",
+                 node_budget: Optional[int] = 20000, time_budget: Optional[float] = None):
+        """detour_routing=True (graf gerekir): engellenen düz hatlar reddedilmez, bölgelerin etrafından
+        dolaşan gerçek uçuş mesafesiyle batarya/zaman hesaplanır.
+
+        variable_order: "mrv" (en az kalan değer, eşitlikte derece ve öncelik) ya da "priority" (öncelik sırası).
+        node_budget / time_budget (saniye): arama bütçesi; aşılırsa greedy yaklaşıma geçilir. Sayaçlar `stats` içindedir.
+        """
+        if detour_routing and graph is None:
+            raise ValueError("detour_routing için graf verilmelidir")
+        if variable_order not in ("mrv", "priority"):
+            raise ValueError(f"Geçersiz değişken sırası: {variable_order}")
         self.drones = drones
         self.delivery_points = sort_deliveries_by_priority(delivery_points)  # Teslimatları öncelik sırasına göre sırala
         self.no_fly_zones = no_fly_zones
+        self.graph = graph
+        self.detour_routing = detour_routing
+        # Graf verilmişse onun bölge indeksini paylaş, yoksa senaryo için bir kez kur
+        self.zone_index = graph.zone_index if graph is not None else ZoneIndex(no_fly_zones)
+        # Graf düğüm indeksleri: engellenme sorguları grafın zaman dilimli kenar önbelleğinden yanıtlanır
+        self._drone_nodes: Dict[int, int] = {}
+        self._dp_nodes: Dict[int, int] = {}
+        self._link_nodes(drones, delivery_points)
         self.assignments = {}
+        # Son planın drone başına başlangıç ve bitiş durumları (resolve için; dış plan verilirse bitişler yeniden uçurulur)
+        self._plan_start: Dict[int, Dict] = {}
+        self._plan_end: Optional[Dict[int, Dict]] = None
+        self.variable_order = variable_order
+        self.node_budget = node_budget
+        self.time_budget = time_budget
+        self.stats: Dict[str, float] = {}
+        self._deadline: Optional[float] = None
+        self._node_limit: Optional[int] = None
+        # Paralel modlarda süreçler arası paylaşılan en iyi amaç değeri ve durdurma bayrağı
+        self._shared_bound = None
+        self._bound_lock = None
+        self._stop = None
+        self._callback = None
+
+        self._index_problem()
+
+    def _link_nodes(self, drones: List[Drone], delivery_points: List[DeliveryPoint]):
+        """Grafta bulunan drone ve teslimatların düğüm indekslerini eşlemelere ekle."""
+        if self.graph is None:
+            return
+        node_index = self.graph.node_index
+        self._drone_nodes.update({drone.id: node_index[f"drone_{drone.id}"] for drone in drones
+                                  if f"drone_{drone.id}" in node_index})
+        self._dp_nodes.update({dp.id: node_index[f"dp_{dp.id}"] for dp in delivery_points
+                               if f"dp_{dp.id}" in node_index})
+
+    def _index_problem(self):
+        """Teslimat satır eşlemesini ve depo satırlarını yenile; alan sütunları ilk kullanımda yeniden kurulur."""
+        self._dp_row = {dp.id: j for j, dp in enumerate(self.delivery_points)}
+        self._drone_store, self._drone_rows = DroneStore.view(self.drones)
+        self._dp_store, self._dp_rows = DeliveryStore.view(self.delivery_points)
+        self._columns: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]] = None
+        self._arcs: Optional[Dict] = None
+        self._start_hits: Dict[tuple, np.ndarray] = {}
+        self._reach_memo: Dict[tuple, np.ndarray] = {}
+
+    def _domain_columns(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Alan (domain) budaması için sütunlar: teslimat konumları, bitiş zamanları ve kapasite uyumu (P×D)."""
+        if self._columns is None:
+            dp_pos = self._dp_store.positions[self._dp_rows]
+            dp_end = self._dp_store.time_windows[self._dp_rows, 1]
+            weights = self._dp_store.weights[self._dp_rows]
+            max_weights = self._drone_store.max_weight[self._drone_rows]
+            self._columns = (dp_pos, dp_end, weights[:, None] <= max_weights[None, :])
+        return self._columns
+
+    @property
+    def _dp_pos(self) -> np.ndarray:
+        return self._domain_columns()[0]
+
+    @property
+    def _dp_end(self) -> np.ndarray:
+        return self._domain_columns()[1]
+
+    @property
+    def _capable(self) -> np.ndarray:
+        return self._domain_columns()[2]
+
+    def __getstate__(self) -> Dict:
+        # Süreç havuzuna kopyalanırken geri çağırım ve paylaşılan nesneler taşınmaz
+        state = self.__dict__.copy()
+        state.update(_callback=None, _shared_bound=None, _bound_lock=None, _stop=None, _reach_memo={})
+        return state
 
     def _check_no_fly_zone_violation(self, pos1: Tuple[float, float], pos2: Tuple[float, float], current_time: int) -> bool:
         """İki nokta arasındaki çizginin uçuş yasağı bölgesini ihlal edip etmediğini kontrol eder."""
-        for no_fly_zone in self.no_fly_zones:
-            if no_fly_zone.is_active(current_time):
-                # Basit kesişim kontrolü - daha karmaşık geometrik hesaplama gerekebilir
-                if self._line_intersects_polygon(pos1, pos2, no_fly_zone.coordinates):
-                    return True
+        for no_fly_zone in self.zone_index.candidate_zones(pos1, pos2, current_time):
+            if self._line_intersects_polygon(pos1, pos2, no_fly_zone.coordinates):
+                return True
         return False
 
     def _line_intersects_polygon(self, pos1: Tuple[float, float], pos2: Tuple[float, float], polygon: List[Tuple[float, float]]) -> bool:
-        """Çizgi parçasının çokgen ile kesişip kesişmediğini kontrol eder."""
-        x1, y1 = pos1
-        x2, y2 = pos2
-        
-        for i in range(len(polygon)):
-            x3, y3 = polygon[i]
-            x4, y4 = polygon[(i + 1) % len(polygon)]
-            
-            # Basit bounding box kontrolü
-            if (max(x1, x2) >= min(x3, x4) and max(x3, x4) >= min(x1, x2) and
-                max(y1, y2) >= min(y3, y4) and max(y3, y4) >= min(y1, y2)):
-                return True
-        return False
+        """Çizgi parçasının çokgen ile kesişip kesişmediğini kontrol eder (yönelim testi + içerde olma)."""
+        return segment_intersects_polygon(pos1, pos2, polygon)
+
+    def _leg_distance(self, current_pos: Tuple[float, float], current_node: Optional[int], dp: DeliveryPoint,
+                      current_time: float) -> float:
+        """Bulunulan konumdan teslimat noktasına uçuş mesafesi (dolambaç modunda bölgelerin etrafından)."""
+        dp_node = self._dp_nodes.get(dp.id)
+        if self.detour_routing and current_node is not None and dp_node is not None:
+            return self.graph.flight_distance(current_node, dp_node, current_time)
+        return ((current_pos[0] - dp.pos[0]) ** 2 + (current_pos[1] - dp.pos[1]) ** 2) ** 0.5
 
     def _is_valid_assignment(self, drone: Drone, dp: DeliveryPoint, current_time_minutes: int, 
-                           current_pos: Tuple[float, float], remaining_battery: float) -> bool:
-        """Atamanın geçerli olup olmadığını kontrol eder."""
-        distance = ((current_pos[0] - dp.pos[0]) ** 2 + (current_pos[1] - dp.pos[1]) ** 2) ** 0.5
+                           current_pos: Tuple[float, float], remaining_battery: float,
+                           current_node: Optional[int] = None) -> bool:
+        """Atamanın geçerli olup olmadığını kontrol eder.
+
+        current_node: drone'un bulunduğu graf düğümü; verilirse uçuş yasağı kontrolü kenar önbelleğinden yapılır.
+        """
+        distance = self._leg_distance(current_pos, current_node, dp, current_time_minutes)
         
         # Ağırlık kontrolü - Drone kapasitesini aşan rotaları eleyin
         if dp.weight > drone.max_weight:
@@ -50,8 +234,7 @@ class CSP:
         
         # Şarj kontrolü
         if remaining_battery - battery_consumption < 20:
-            charge_time = drone.charge()  # Şarj süresi saniye cinsinden
-            current_time_minutes += charge_time / 60  # Dakikaya çevir
+            current_time_minutes += drone.charge_time / 60  # Şarj süresi saniyeden dakikaya; Drone nesnesi değiştirilmez
 
         # Zaman penceresi kontrolü
         travel_time = distance / drone.speed * 60  # Dakika cinsinden
@@ -60,8 +243,14 @@ class CSP:
         if not (dp_start <= delivery_time <= dp_end):
             return False
         
-        # Uçuş yasağı bölgesi kontrolü
-        if self._check_no_fly_zone_violation(current_pos, dp.pos, current_time_minutes):
+        # Uçuş yasağı bölgesi kontrolü (dolambaç modunda mesafe zaten bölgelerin etrafından hesaplandı)
+        dp_node = self._dp_nodes.get(dp.id)
+        if self.detour_routing and current_node is not None and dp_node is not None:
+            pass
+        elif current_node is not None and dp_node is not None:
+            if self.graph.is_edge_blocked(current_node, dp_node, current_time_minutes):
+                return False
+        elif self._check_no_fly_zone_violation(current_pos, dp.pos, current_time_minutes):
             return False
         
         return True
@@ -75,144 +264,901 @@ class CSP:
         priority_bonus = (6 - dp.priority) * 100  # Priority 5→100, Priority 1→500
         return distance * dp.weight + priority_bonus
 
-    def _backtrack(self, assignment: Dict[int, List[int]], unassigned_dps: List[DeliveryPoint], 
-                  drone_states: Dict[int, Dict]) -> Dict[int, List[int]]:
+    def _advance(self, drone: Drone, battery: float, current_time: float, distance: float) -> Tuple[float, float]:
+        """Bir uçuş bacağından sonraki (batarya, zaman); batarya %20'nin altına inerse tam şarj ve şarj süresi eklenir."""
+        battery -= distance * (5 / drone.speed)
+        current_time += distance / drone.speed * 60
+        if battery < 20:
+            battery = 100
+            current_time += drone.charge_time / 60
+        return battery, current_time
+
+    def _reachable(self, drone: Drone, pos: Tuple[float, float], current_time: float) -> np.ndarray:
+        """Drone'un bu durumdan sonra hangi teslimatlara hâlâ zamanında ulaşabileceği (gerekli koşul).
+
+        Ara duraklar yolu kısaltamaz (üçgen eşitsizliği) ve şarj yalnızca süre ekler; dolambaçlı uçuş da kuş uçuşundan
+        kısa olamaz. Bu yüzden en erken varış >= şimdiki zaman + kuş uçuşu süre; bu, bitiş zamanını aşıyorsa teslimat
+        bu drone için kalıcı olarak imkânsızdır.
         """
-        Geliştirilmiş geri izleme algoritması.
-        drone_states: {drone_id: {'pos': (x,y), 'battery': float, 'time': int}}
+        distance = np.hypot(self._dp_pos[:, 0] - pos[0], self._dp_pos[:, 1] - pos[1])
+        return current_time + distance / drone.speed * 60 <= self._dp_end + 1e-9
+
+    def _arc_tables(self) -> Optional[Dict]:
+        """Yay tutarlılığı tabloları; teslimat çifti sayısı _MAX_ARC_PAIRS'ı aşarsa None.
+
+        Teslimat pencereleri, drone hız/şarj sütunları, teslimatlar arası kuş uçuşu mesafeler ve (düz uçuşta) P×P×Z
+        bölge kesişimleri tutulur. Yaylar için her çiftte aktiflik penceresi en uzun kesişen bölge (yoksa boş pencere)
+        temsilci seçilir: yalnızca onun kapattığı yayları kapatmak güvenlidir, diğer bölgeler yalnızca budamayı zayıflatır.
         """
-        if not unassigned_dps:
-            return assignment.copy()
-        
-        # En yüksek öncelikli teslimat noktasını seç
-        dp = unassigned_dps[0]
-        
-        # Her drone için bu DP'yi atamayı dene
-        best_assignment = None
-        best_cost = float('inf')
-        
-        for drone in self.drones:
-            drone_id = drone.id
-            current_state = drone_states[drone_id]
-            
-            if self._is_valid_assignment(drone, dp, current_state['time'], 
-                                       current_state['pos'], current_state['battery']):
-                
-                # Maliyeti hesapla
-                distance = ((current_state['pos'][0] - dp.pos[0]) ** 2 + 
-                           (current_state['pos'][1] - dp.pos[1]) ** 2) ** 0.5
-                cost = self._calculate_assignment_cost(drone, dp, distance)
-                
-                if cost < best_cost:
-                    # Bu atamayı dene
-                    new_assignment = assignment.copy()
-                    if drone_id not in new_assignment:
-                        new_assignment[drone_id] = []
-                    new_assignment[drone_id].append(dp.id)
-                    
-                    # Drone durumunu güncelle
-                    new_drone_states = drone_states.copy()
-                    battery_consumption = distance * (5 / drone.speed)
-                    travel_time = distance / drone.speed * 60
-                    
-                    new_drone_states[drone_id] = {
-                        'pos': dp.pos,
-                        'battery': current_state['battery'] - battery_consumption,
-                        'time': current_state['time'] + travel_time
-                    }
-                    
-                    # Şarj gerekli mi?
-                    if new_drone_states[drone_id]['battery'] < 20:
-                        charge_time = drone.charge()
-                        new_drone_states[drone_id]['battery'] = 100
-                        new_drone_states[drone_id]['time'] += charge_time / 60
-                    
-                    # Recursive call
-                    result = self._backtrack(new_assignment, unassigned_dps[1:], new_drone_states)
-                    if result is not None:
-                        best_assignment = result
-                        best_cost = cost
-        
-        return best_assignment
+        if self._arcs is None:
+            count = len(self.delivery_points)
+            self._arcs = {}
+            if count * count <= _MAX_ARC_PAIRS:
+                pos = self._dp_pos
+                zones = [] if self.detour_routing else self.zone_index.zones
+                window = np.array([zone.active_time for zone in zones], dtype=np.float64).reshape(-1, 2)
+                hits = np.zeros((count, count, len(zones)), dtype=bool)
+                for z, zone in enumerate(zones):
+                    hits[:, :, z] = blocked_pairs(pos, pos, [zone.coordinates], symmetric=True)
+                # Kesişen bölge yoksa temsilci pencere boştur (başlangıç +inf, bitiş -inf)
+                length = np.where(hits, window[:, 1] - window[:, 0], -np.inf)
+                chosen = np.argmax(length, axis=2) if zones else np.zeros((count, count), dtype=np.int64)
+                blocking = np.isfinite(length.max(axis=2, initial=-np.inf))
+                window_of = window if zones else np.zeros((1, 2))
+                self._arcs = {"start": self._dp_store.time_windows[self._dp_rows, 0],
+                              "speed": self._drone_store.speed[self._drone_rows].tolist(),
+                              "charge": (self._drone_store.charge_time[self._drone_rows] / 60).tolist(),
+                              "window": window, "hits": hits,
+                              "distance": np.hypot(pos[:, None, 0] - pos[None, :, 0], pos[:, None, 1] - pos[None, :, 1]),
+                              "zone_start": np.where(blocking, window_of[chosen, 0], np.inf),
+                              "zone_end": np.where(blocking, window_of[chosen, 1], -np.inf)}
+        return self._arcs or None
+
+    def _leg_blocked(self, pos: Tuple[float, float], row: int, departure: np.ndarray, rows: np.ndarray,
+                     arcs: Dict) -> np.ndarray:
+        """Bulunulan yerden `rows` teslimatlarına düz uçuşun verilen kalkış anlarında aktif bölgeden geçip geçmediği.
+
+        row >= 0 ise drone o teslimat noktasındadır ve yay tablosu okunur; değilse (başlangıç konumu) kesişimler bir
+        kez hesaplanıp konum başına saklanır.
+        """
+        if row >= 0:
+            hits = arcs["hits"][row, rows]
+        else:
+            key = tuple(pos)
+            hits = self._start_hits.get(key)
+            if hits is None:
+                origin = np.broadcast_to(np.asarray(pos, dtype=np.float64), self._dp_pos.shape)
+                hits = segments_intersect_polygons(np.column_stack((origin, self._dp_pos)), self.zone_index.packed)
+                self._start_hits[key] = hits
+            hits = hits[rows]
+        window = arcs["window"]
+        return (hits & (window[:, 0] <= departure[:, None]) & (departure[:, None] <= window[:, 1])).any(axis=1)
+
+    def _reach(self, k: int, pos: Tuple[float, float], row: int, battery: float, current_time: float,
+               live: np.ndarray) -> np.ndarray:
+        """k drone'unun bu durumdan rotasına hâlâ ekleyebileceği teslimatlar (live içinden; gerekli koşul).
+
+        Drone beklemeden uçtuğu için rotasının sıradaki teslimatı şimdi geçerli olmalıdır: batarya, zaman penceresi ve
+        kalkış anında aktif bölgeler (_is_valid_assignment ile aynı; dolambaç modunda yalnızca kuş uçuşu alt sınırları).
+        Diğer teslimatlara ancak live içindeki teslimatlar üzerinden gidilebilir. Bir yay; kuş uçuşu en erken varış
+        bitiş zamanına yetişmiyorsa, bacak max(batarya, 100) ile uçulamıyorsa ya da olası kalkış aralığının tamamında
+        aktif bir bölgeden geçiyorsa kullanılamaz. En erken varışlar Bellman-Ford gevşetmesiyle yayılır, ulaşılamayan
+        teslimatlar düşer. Yay tablosu yoksa (P büyük) yalnızca kuş uçuşu zaman sınırı (_reachable) uygulanır.
+        """
+        arcs = self._arc_tables()
+        if arcs is None:
+            return live & self._reachable(self.drones[k], pos, current_time)
+        rows = np.flatnonzero(live)
+        result = np.zeros(len(live), dtype=bool)
+        if len(rows) == 0:
+            return result
+        start, end = arcs["start"][rows], self._dp_end[rows] + 1e-9
+        speed = arcs["speed"][k]
+        targets = self._dp_pos[rows]
+        distance = np.sqrt((targets[:, 0] - pos[0]) ** 2 + (targets[:, 1] - pos[1]) ** 2)
+        consumption = distance * (5 / speed)
+        ready = consumption <= battery + 1e-9
+        if self.detour_routing:
+            # Dolambaçlı uçuş kuş uçuşundan kısa olamaz: varış için yalnızca alt sınır bilinir
+            arrival = current_time + distance / speed * 60
+            ready &= arrival <= end
+        else:
+            departure = current_time + np.where(battery - consumption < 20, arcs["charge"][k], 0.0)
+            arrival = departure + distance / speed * 60
+            ready &= (start - 1e-9 <= arrival) & (arrival <= end)
+            if arcs["hits"].shape[2]:
+                ready &= ~self._leg_blocked(pos, row, departure, rows, arcs)
+        earliest = np.where(ready, np.maximum(arrival, start), np.inf)
+        if ready.any() and not ready.all():
+            # Yaylar yalnızca live satırları arasında: alt matrisler bir kez toplanır
+            pairs = np.ix_(rows, rows)
+            legs = arcs["distance"][pairs] * (60 / speed)
+            # Bacak max(batarya, 100) ile uçulabilmeli (batarya ya azalır ya da %100'e şarj edilir); kalkış
+            # [en erken varış, bitiş - uçuş] aralığındadır, bölge bu aralığın tamamında aktifse yay kapalıdır
+            flyable = arcs["distance"][pairs] * (5 / speed) <= max(battery, 100.0) + 1e-9
+            zone_start = np.where(arcs["zone_end"][pairs] >= end - legs, arcs["zone_start"][pairs], np.inf)
+            frontier = ready
+            while frontier.any():
+                sources = np.flatnonzero(frontier)
+                arrival = earliest[sources, None] + legs[sources]
+                usable = (arrival <= end) & flyable[sources] & (zone_start[sources] > earliest[sources, None])
+                candidate = np.where(usable, np.maximum(arrival, start), np.inf).min(axis=0)
+                frontier = candidate < earliest
+                earliest = np.minimum(earliest, candidate)
+        result[rows] = np.isfinite(earliest)
+        return result
+
+    def _revise(self, state: _SearchState, k: int):
+        """k drone'unun alan sütununu güncel durumuna göre yeniden buda (atanmış teslimat hücrelerine dokunulmaz).
+
+        Geri izleme aynı atamayı kardeş dallarda tekrar tekrar uygular; drone'un durumu ve canlı sütunu aynıysa
+        erişilebilirlik değişmez, bu yüzden sonuç (drone, durum, paketlenmiş live) anahtarıyla saklanır.
+        """
+        route = state.routes[k]
+        row = route[-1] if route else -1
+        live = state.domains[:, k] & state.unassigned
+        key = (k, row, tuple(state.pos[k]), state.battery[k], state.time[k], np.packbits(live).tobytes())
+        reach = self._reach_memo.get(key)
+        if reach is None:
+            reach = self._reach(k, state.pos[k], row, state.battery[k], state.time[k], live)
+            if len(self._reach_memo) >= _MAX_REACH_MEMO:
+                self._reach_memo.clear()
+            self._reach_memo[key] = reach
+        state.restrict(k, reach | ~state.unassigned)
+
+    def _select_variable(self, remaining: np.ndarray, state: _SearchState) -> int:
+        """Sıradaki teslimat: MRV (en küçük alan), eşitlikte derece (alanı paylaşan teslimat sayısı), sonra öncelik."""
+        if self.variable_order == "priority":
+            return int(remaining[0])
+        sizes = state.sizes[remaining]
+        ties = np.flatnonzero(sizes == sizes.min())
+        if len(ties) == 1:
+            return int(remaining[ties[0]])
+        # Derece, mantıksal matris çarpımıyla (bool @ bool: ortak drone var mı) eşit teslimat blokları hâlinde sayılır
+        rows = state.domains[remaining]
+        degree = np.empty(len(ties), dtype=np.int64)
+        for first in range(0, len(ties), 1024):
+            degree[first:first + 1024] = (rows @ rows[ties[first:first + 1024]].T).sum(axis=0)
+        # argmax ilk en büyüğü verir: remaining öncelik sıralı olduğundan eşitlikte yüksek öncelik kazanır
+        return int(remaining[ties[int(np.argmax(degree))]])
+
+    def _budget_exhausted(self) -> bool:
+        if self._node_limit is not None and self.stats["nodes"] > self._node_limit:
+            self.stats["budget_exhausted"] = True
+        elif self._deadline is not None and time.perf_counter() > self._deadline:
+            self.stats["budget_exhausted"] = True
+        elif self._stop is not None and self._stop.value:
+            self.stats["budget_exhausted"] = True
+        return self.stats["budget_exhausted"]
+
+    def _cutoff(self) -> float:
+        """Budama eşiği: yerel en iyi amaç ya da (paralel modda) tüm süreçlerin paylaştığı en iyi amaç."""
+        if self._shared_bound is None:
+            return self._incumbent_value
+        return min(self._incumbent_value, self._shared_bound.value)
+
+    def _publish(self, value: float):
+        """Yeni en iyi amaç değerini diğer süreçlere duyur."""
+        if self._shared_bound is not None:
+            with self._bound_lock:
+                if value < self._shared_bound.value:
+                    self._shared_bound.value = value
+
+    def _candidates(self, state: _SearchState, j: int) -> List[Tuple[float, int, float]]:
+        """j teslimatı için geçerli droneların (maliyet, drone sırası, mesafe) listesi, maliyete göre sıralı."""
+        dp = self.delivery_points[j]
+        candidates = []
+        for k in np.flatnonzero(state.domains[j]).tolist():
+            drone = self.drones[k]
+            if self._is_valid_assignment(drone, dp, state.time[k], state.pos[k], state.battery[k], state.node[k]):
+                distance = self._leg_distance(state.pos[k], state.node[k], dp, state.time[k])
+                candidates.append((self._calculate_assignment_cost(drone, dp, distance), k, distance))
+        candidates.sort(key=lambda c: (c[0], c[1]))
+        return candidates
+
+    def _apply(self, state: _SearchState, k: int, j: int, distance: float):
+        """j teslimatını k drone'una uygula ve k'nin alan sütununu yeni durumundan yeniden buda (yay tutarlılığı).
+
+        Diğer droneların sütunları yeniden hesaplanmaz: j'nin ara durak olarak düşmesiyle yalnızca daralabilirler,
+        bu yüzden güncel hâlleri güvenli bir üst kümedir.
+        """
+        drone = self.drones[k]
+        dp = self.delivery_points[j]
+        battery, current_time = self._advance(drone, state.battery[k], state.time[k], distance)
+        state.apply(k, j, dp.pos, self._dp_nodes.get(dp.id), battery, current_time)
+        self._revise(state, k)
+
+    def _backtrack(self, state: _SearchState) -> bool:
+        """
+        İleri kontrollü (forward checking) geri izleme; tam atama bulunursa True döner ve durum o atamada kalır.
+        state.domains: P×D olası drone matrisi; bir atamadan sonra yalnızca o drone'un sütunu yeniden budanır.
+        """
+        remaining = np.flatnonzero(state.unassigned)
+        if len(remaining) == 0:
+            return True
+        self.stats["nodes"] += 1
+        if self._budget_exhausted():
+            return False
+
+        j = self._select_variable(remaining, state)
+        # Değer sıralaması: geçerli droneları maliyete göre dene (eşitlikte drone sırası)
+        for cost, k, distance in self._candidates(state, j):
+            self._apply(state, k, j, distance)
+            # Alanı boşalan teslimat varsa dal kesilir
+            if not state.sizes[state.unassigned].all():
+                self.stats["pruned"] += 1
+                state.undo(j)
+                continue
+            if self._backtrack(state):
+                return True
+            state.undo(j)
+            if self.stats["budget_exhausted"]:
+                return False
+
+        self.stats["backtracks"] += 1
+        return False
 
     def solve(self, current_time: str = "00:00") -> Dict[int, List[int]]:
         """CSP problemini çözerek her drone'a teslimat noktaları atar."""
         # Başlangıç durumunu ayarla
         current_time_minutes = int(current_time.split(':')[0]) * 60 + int(current_time.split(':')[1])
         
-        # Drone durumlarını başlat
-        drone_states = {}
-        for drone in self.drones:
-            drone_states[drone.id] = {
-                'pos': drone.start_pos,
-                'battery': drone.battery,
-                'time': current_time_minutes
-            }
-        
-        # Tüm teslimat noktalarını başlangıçta atanmamış olarak işaretle
-        unassigned_dps = self.delivery_points.copy()
+        # Drone durumlarını ve başlangıç alanlarını (kapasite ve zamanında ulaşılabilirlik) hazırla
+        drone_states = self._initial_states(current_time_minutes)
+        state = _SearchState(drone_states, self._initial_domains(drone_states))
+        self.stats = {"nodes": 0, "backtracks": 0, "pruned": 0, "budget_exhausted": False, "time": 0.0}
+        self._deadline = time.perf_counter() + self.time_budget if self.time_budget is not None else None
+        self._node_limit = self.node_budget
+        started = time.perf_counter()
         
-        # Backtracking ile çözüm bul
-        result = self._backtrack({}, unassigned_dps, drone_states)
+        # Backtracking ile çözüm bul (alanı baştan boş teslimat varsa tam atama imkânsızdır)
+        result = None
+        if state.domains.any(axis=1).all():
+            if self._backtrack(state):
+                result = state.assignment(self.drones, self.delivery_points, include_empty=False)
+                end_states = state.end_states()
+        else:
+            self.stats["pruned"] += 1
+        self.stats["time"] = time.perf_counter() - started
+        self.stats["complete"] = result is not None
         
         # Eğer çözüm bulunamazsa, greedy yaklaşım kullan
         if result is None:
-            result = self._greedy_fallback(current_time_minutes)
+            end_states = self._initial_states(current_time_minutes)
+            result = self._greedy_fallback(current_time_minutes, end_states)
         
+        self._record_plan(result, drone_states, end_states)
         return result if result is not None else {}
 
-    def _greedy_fallback(self, current_time_minutes: int) -> Dict[int, List[int]]:
-        """Backtracking başarısız olursa greedy yaklaşım kullan."""
+    def _record_plan(self, plan: Dict[int, List[int]], drone_states: List[Dict],
+                     end_states: Optional[List[Dict]] = None):
+        """Planı ve drone başlangıç/bitiş durumlarını resolve için sakla.
+
+        end_states (drone sırasıyla rota sonu durumları) verilmezse rotalar başlangıç durumlarından yeniden uçurulur.
+        """
+        self.assignments = {drone_id: list(route) for drone_id, route in plan.items() if route}
+        self._plan_start = {drone.id: dict(state) for drone, state in zip(self.drones, drone_states)}
+        if end_states is None:
+            end_states = [self._replay(drone, self.assignments.get(drone.id, []), self._plan_start[drone.id])[2]
+                          for drone in self.drones]
+        self._plan_end = {drone.id: dict(state) for drone, state in zip(self.drones, end_states)}
+
+    def _initial_states(self, current_time_minutes: float) -> List[Dict]:
+        """Drone sırasıyla başlangıç durumları (Drone nesnelerinin kopyası değil, yalnızca değerleri)."""
+        return [{'pos': drone.start_pos, 'node': self._drone_nodes.get(drone.id),
+                 'battery': drone.battery, 'time': current_time_minutes} for drone in self.drones]
+
+    def _initial_domains(self, drone_states: List[Dict]) -> np.ndarray:
+        """Başlangıç alanları: kapasiteye uygun ve drone'un başlangıç durumundan ulaşılabilir (_reach) teslimatlar."""
+        domains = self._capable.copy()
+        for k, state in enumerate(drone_states):
+            domains[:, k] = self._reach(k, state['pos'], -1, state['battery'], state['time'], domains[:, k])
+        return domains
+
+    def _assignment_objective(self, assignment: Dict[int, List[int]], drone_states: List[Dict], penalty: float) -> float:
+        """Atamanın amaç değeri: her teslimat için _calculate_assignment_cost toplamı + atanmayan başına ceza."""
+        order = {drone.id: k for k, drone in enumerate(self.drones)}
+        dps = {dp.id: dp for dp in self.delivery_points}
+        total, assigned = 0.0, 0
+        for drone_id, dp_ids in assignment.items():
+            k = order[drone_id]
+            drone = self.drones[k]
+            state = dict(drone_states[k])
+            for dp_id in dp_ids:
+                dp = dps[dp_id]
+                distance = self._leg_distance(state['pos'], state['node'], dp, state['time'])
+                total += self._calculate_assignment_cost(drone, dp, distance)
+                state['battery'], state['time'] = self._advance(drone, state['battery'], state['time'], distance)
+                state['pos'], state['node'] = dp.pos, self._dp_nodes.get(dp.id)
+                assigned += 1
+        return total + penalty * (len(self.delivery_points) - assigned)
+
+    def _static_lower_bounds(self) -> np.ndarray:
+        """Her teslimatın atama maliyeti için alt sınır: en yakın başka noktadan (drone başlangıcı ya da teslimat) gelinir.
+
+        Bir drone teslimata ya kendi başlangıcından ya da başka bir teslimattan uçar; dolambaçlı uçuş da kuş uçuşundan kısa
+        olamaz. Bu yüzden mesafe >= en yakın komşu uzaklığı ve maliyet >= bu uzaklık × ağırlık + öncelik bonusu.
+        """
+        points = np.vstack((self._dp_pos, self._drone_store.positions[self._drone_rows]))
+        nearest = np.empty(len(self._dp_pos))
+        for j, pos in enumerate(self._dp_pos):
+            distance = np.hypot(points[:, 0] - pos[0], points[:, 1] - pos[1])
+            distance[j] = np.inf
+            nearest[j] = distance.min(initial=np.inf)
+        weights = self._dp_store.weights[self._dp_rows]
+        bonus = (6 - self._dp_store.priorities[self._dp_rows]) * 100.0
+        return np.where(np.isfinite(nearest), nearest, 0.0) * weights + bonus
+
+    def solve_anytime(self, current_time: str = "00:00", deadline: float = 0.5,
+                      callback: Optional[Callable[[Dict[int, List[int]], float], None]] = None,
+                      unassigned_penalty: Optional[float] = None) -> Dict[int, List[int]]:
+        """Her an kesilebilen dal-sınır (branch-and-bound) çözümü.
+
+        Greedy çözüm başlangıç eniyisi (incumbent) olur; her teslimat bir drone'a atanır ya da cezalı olarak boş bırakılır.
+        `deadline` saniye dolduğunda bulunan en iyi atama döner; her iyileşme `callback(atama, amaç)` ile bildirilir.
+        Amaç, alt sınır ve göreli boşluk `report` içindedir.
+        """
+        started = time.perf_counter()
+        self._prepare_branch_and_bound(current_time, unassigned_penalty, callback)
+        self._deadline = started + deadline
+        state = _SearchState(self._start_states, self._initial_domains(self._start_states))
+        root_bound = self._bound(0.0, state)
+        complete = self._branch_and_bound(state, 0.0)
+
+        lower = self._incumbent_value if complete else min(root_bound, self._incumbent_value)
+        self._finish_report(lower, complete, self.stats["nodes"], self.stats["incumbents"], started)
+        self._record_plan(self._incumbent, self._start_states)
+        return self._incumbent
+
+    def _prepare_branch_and_bound(self, current_time: str, unassigned_penalty: Optional[float],
+                                  callback: Optional[Callable[[Dict[int, List[int]], float], None]] = None):
+        """Dal-sınır için başlangıç durumları, ceza, statik alt sınırlar ve greedy başlangıç eniyisini hazırla."""
+        current_time_minutes = int(current_time.split(':')[0]) * 60 + int(current_time.split(':')[1])
+        drone_states = self._initial_states(current_time_minutes)
+        penalty = self._default_penalty(drone_states) if unassigned_penalty is None else unassigned_penalty
+
+        incumbent = self._greedy_fallback(current_time_minutes)
+        self._start_states = drone_states
+        self._incumbent = incumbent
+        self._incumbent_value = self._assignment_objective(incumbent, drone_states, penalty)
+        self._callback = callback
+        if callback is not None:
+            callback(incumbent, self._incumbent_value)
+
+        self._penalty = penalty
+        self._lower = np.minimum(self._static_lower_bounds(), penalty)
+        self._node_limit = None
+        self.stats = {"nodes": 0, "backtracks": 0, "pruned": 0, "budget_exhausted": False, "time": 0.0, "incumbents": 1}
+
+    def _default_penalty(self, drone_states: List[Dict]) -> float:
+        """Atanmayan teslimat cezası: tek bir teslimatı atamak, onu boş bırakmaktan her zaman daha ucuz olsun."""
+        span = np.ptp(np.vstack((self._dp_pos, [s['pos'] for s in drone_states])), axis=0) if len(self._dp_pos) else np.zeros(2)
+        max_weight = max((dp.weight for dp in self.delivery_points), default=0.0)
+        return float(np.hypot(*span)) * max_weight + 501.0
+
+    def _finish_report(self, lower: float, complete: bool, nodes: int, incumbents: int, started: float):
+        elapsed = time.perf_counter() - started
+        self.stats["time"] = elapsed
+        gap = 0.0 if self._incumbent_value == 0 else (self._incumbent_value - lower) / abs(self._incumbent_value)
+        self.report = {"objective": self._incumbent_value, "lower_bound": lower, "gap": gap, "optimal": complete,
+                       "unassigned": len(self.delivery_points) - sum(len(v) for v in self._incumbent.values()),
+                       "nodes": nodes, "incumbents": incumbents, "elapsed": elapsed}
+
+    def _split(self, state: _SearchState, cost: float, depth: int, prefix: List[Tuple[int, int]],
+               tasks: List[Tuple[float, Tuple[Tuple[int, int], ...], float]]):
+        """Arama ağacının ilk `depth` seviyesini açarak alt ağaç görevleri (alt sınır, hamle öneki, maliyet) üret.
+
+        Hamle (j, k): j teslimatı k drone'una; k = -1 ise teslimat boş bırakılır.
+        """
+        bound = self._bound(cost, state)
+        if bound >= self._incumbent_value:
+            self.stats["pruned"] += 1
+            return
+        remaining = np.flatnonzero(state.unassigned)
+        if depth == 0 or len(remaining) == 0:
+            tasks.append((bound, tuple(prefix), cost))
+            return
+        j = self._select_variable(remaining, state)
+        for leg_cost, k, distance in self._candidates(state, j):
+            self._apply(state, k, j, distance)
+            prefix.append((j, k))
+            self._split(state, cost + leg_cost, depth - 1, prefix, tasks)
+            prefix.pop()
+            state.undo(j)
+        state.skip(j)
+        prefix.append((j, -1))
+        self._split(state, cost + self._penalty, depth - 1, prefix, tasks)
+        prefix.pop()
+        state.undo(j)
+
+    def _solve_subtree(self, prefix: Sequence[Tuple[int, int]], cost: float) -> bool:
+        """Hamle önekini yeni bir arama durumuna uygulayıp kalan alt ağacı dal-sınırla ara."""
+        state = _SearchState(self._start_states, self._initial_domains(self._start_states))
+        for j, k in prefix:
+            if k < 0:
+                state.skip(j)
+            else:
+                distance = self._leg_distance(state.pos[k], state.node[k], self.delivery_points[j], state.time[k])
+                self._apply(state, k, j, distance)
+        return self._branch_and_bound(state, cost)
+
+    def solve_parallel(self, current_time: str = "00:00", deadline: float = 0.5, workers: Optional[int] = None,
+                       split_depth: int = 2, unassigned_penalty: Optional[float] = None) -> Dict[int, List[int]]:
+        """solve_anytime'ın çok süreçli hali: ağaç ilk `split_depth` atamada alt ağaçlara bölünür.
+
+        Alt ağaçlar alt sınırı en küçük olandan başlayarak süreç havuzuna dağıtılır; süreçler bulunan en iyi amacı
+        paylaşılan bir değer üzerinden birbirine duyurur ve birbirlerinin alt ağaçlarını budar. Sonuç ve `report`
+        solve_anytime ile aynı biçimdedir.
+        """
+        if split_depth < 0:
+            raise ValueError(f"Geçersiz bölme derinliği: {split_depth}")
+        started = time.perf_counter()
+        workers = workers or os.cpu_count() or 1
+        self._prepare_branch_and_bound(current_time, unassigned_penalty)
+        self._deadline = started + deadline
+        state = _SearchState(self._start_states, self._initial_domains(self._start_states))
+        root_bound = self._bound(0.0, state)
+        tasks: List[Tuple[float, Tuple[Tuple[int, int], ...], float]] = []
+        self._split(state, 0.0, split_depth, [], tasks)
+        tasks.sort(key=lambda task: task[0])
+
+        jobs = [(prefix, cost) for _, prefix, cost in tasks]
+        if workers > 1 and len(jobs) > 1:
+            bound = multiprocessing.RawValue('d', self._incumbent_value)
+            lock = multiprocessing.Lock()
+            deadline_wall = time.time() + (self._deadline - time.perf_counter())
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_split_worker,
+                                     initargs=(self, bound, lock, deadline_wall)) as pool:
+                results = list(pool.map(_worker_subtree, jobs))
+        else:
+            results = []
+            for prefix, cost in jobs:
+                incumbents = self.stats["incumbents"]
+                self.stats["nodes"] = 0
+                complete = self._solve_subtree(prefix, cost)
+                results.append((complete, self._incumbent_value, self._incumbent, self.stats["nodes"],
+                                self.stats["incumbents"] - incumbents))
+
+        nodes, incumbents = 0, 1
+        for complete, value, assignment, task_nodes, task_incumbents in results:
+            nodes += task_nodes
+            incumbents += task_incumbents
+            if value < self._incumbent_value:
+                self._incumbent, self._incumbent_value = assignment, value
+        # Tamamlanmayan alt ağaçların alt sınırları, küresel alt sınırı belirler
+        open_bounds = [task[0] for task, result in zip(tasks, results) if not result[0]]
+        complete = not open_bounds
+        lower = min([self._incumbent_value] + open_bounds) if tasks else self._incumbent_value
+        lower = max(lower, min(root_bound, self._incumbent_value))
+        self._finish_report(lower, complete, nodes, incumbents, started)
+        self._record_plan(self._incumbent, self._start_states)
+        return self._incumbent
+
+    def solve_portfolio(self, current_time: str = "00:00", strategies: Sequence[str] = ("mrv", "priority"),
+                        workers: Optional[int] = None, pick: str = "best") -> Dict[int, List[int]]:
+        """Değişken sıralama stratejilerini paralel süreçlerde aynı anda çalıştır.
+
+        pick="first": tam çözüm bulan ilk stratejinin sonucu döner, diğerleri durdurulur.
+        pick="best": tüm stratejiler biter, tam çözümler arasında amacı en küçük olan seçilir.
+        Hiçbir strateji tam çözüm bulamazsa greedy sonuçlar arasından en iyisi döner. Ayrıntılar `report` içindedir.
+        """
+        if pick not in ("first", "best"):
+            raise ValueError(f"Geçersiz seçim kuralı: {pick}")
+        for strategy in strategies:
+            if strategy not in ("mrv", "priority"):
+                raise ValueError(f"Geçersiz değişken sırası: {strategy}")
+        started = time.perf_counter()
+        workers = min(workers or os.cpu_count() or 1, len(strategies))
+        current_time_minutes = int(current_time.split(':')[0]) * 60 + int(current_time.split(':')[1])
+        drone_states = self._initial_states(current_time_minutes)
+        penalty = self._default_penalty(drone_states)
+
+        outcomes = []
+        if workers > 1:
+            stop = multiprocessing.RawValue('b', 0)
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_portfolio_worker,
+                                     initargs=(self, stop)) as pool:
+                pending = {pool.submit(_worker_strategy, strategy, current_time) for strategy in strategies}
+                while pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    outcomes.extend(future.result() for future in done)
+                    if pick == "first" and any(outcome[2]["complete"] for outcome in outcomes):
+                        stop.value = 1
+                        for future in pending:
+                            future.cancel()
+                        outcomes.extend(future.result() for future in pending if not future.cancelled())
+                        break
+        else:
+            original = self.variable_order
+            for strategy in strategies:
+                self.variable_order = strategy
+                result = self.solve(current_time)
+                outcomes.append((strategy, result, dict(self.stats)))
+                if pick == "first" and self.stats["complete"]:
+                    break
+            self.variable_order = original
+
+        scored = []
+        for order, (strategy, result, stats) in enumerate(outcomes):
+            objective = self._assignment_objective(result, drone_states, penalty)
+            scored.append((not stats["complete"], objective if pick == "best" else order, strategy, result, stats))
+        incomplete, _, strategy, result, stats = min(scored, key=lambda item: item[:2])
+        self.stats = stats
+        self.report = {"strategy": strategy, "complete": not incomplete,
+                       "objective": self._assignment_objective(result, drone_states, penalty),
+                       "strategies": {entry[2]: {"complete": not entry[0], "nodes": entry[4]["nodes"],
+                                                 "time": entry[4]["time"]} for entry in scored},
+                       "elapsed": time.perf_counter() - started}
+        return result
+
+    def _bound(self, cost: float, state: _SearchState) -> float:
+        """Kısmi atamanın alt sınırı: yapılan maliyet + kalan her teslimat için statik alt sınır (alanı boşsa ceza)."""
+        open_rows = state.unassigned
+        if not open_rows.any():
+            return cost
+        lower = np.where(state.sizes[open_rows] > 0, self._lower[open_rows], self._penalty)
+        return cost + float(lower.sum())
+
+    def _branch_and_bound(self, state: _SearchState, cost: float) -> bool:
+        """Derinlik öncelikli dal-sınır; arama tamamlandıysa True, süre dolduysa False döner."""
+        remaining = np.flatnonzero(state.unassigned)
+        if len(remaining) == 0:
+            if cost < self._cutoff():
+                self._incumbent = state.assignment(self.drones, self.delivery_points, include_empty=True)
+                self._incumbent_value = cost
+                self.stats["incumbents"] += 1
+                self._publish(cost)
+                if self._callback is not None:
+                    self._callback(self._incumbent, cost)
+            return True
+        self.stats["nodes"] += 1
+        if self._budget_exhausted():
+            return False
+        if self._bound(cost, state) >= self._cutoff():
+            self.stats["pruned"] += 1
+            return True
+
+        j = self._select_variable(remaining, state)
+        for leg_cost, k, distance in self._candidates(state, j):
+            self._apply(state, k, j, distance)
+            finished = self._branch_and_bound(state, cost + leg_cost)
+            state.undo(j)
+            if not finished:
+                return False
+
+        # Teslimatı boş bırakma dalı (cezalı)
+        state.skip(j)
+        finished = self._branch_and_bound(state, cost + self._penalty)
+        state.undo(j)
+        return finished
+
+    def _greedy_fallback(self, current_time_minutes: int, drone_states: Optional[List[Dict]] = None) -> Dict[int, List[int]]:
+        """Backtracking başarısız olursa greedy yaklaşım kullan.
+
+        Drone durumu (konum, düğüm, batarya, zaman) NumPy dizilerinde tutulur; her teslimat için tüm droneların
+        uygunluk maskesi ve maliyet vektörü tek adımda hesaplanır, ardından yalnızca seçilen drone'un satırı güncellenir.
+        Sonuç, her çifti _is_valid_assignment ile tek tek deneyen döngüyle aynıdır (eşitlikte drone sırası).
+        drone_states verilirse başlangıç durumu olarak kullanılır ve yerinde rota sonu durumlarına güncellenir.
+        """
         assignments = {drone.id: [] for drone in self.drones}
-        drone_states = {}
-        
-        # Drone durumlarını başlat
+        if drone_states is None:
+            drone_states = self._initial_states(current_time_minutes)
+        self._dispatch(range(len(self.delivery_points)), drone_states, assignments)
+        return assignments
+
+    def _dispatch(self, rows, drone_states: List[Dict], assignments: Dict[int, List[int]]) -> List[int]:
+        """Verilen teslimat satırlarını sırayla, bulundukları durumdan en ucuz geçerli drone'un rotasının sonuna ekle.
+
+        drone_states (drone sırasıyla) yerinde güncellenir; atanamayan teslimat satırları döndürülür.
+        """
+        rows = list(rows)
+        if not self.drones:
+            return rows
+        speed = self._drone_store.speed[self._drone_rows]
+        max_weight = self._drone_store.max_weight[self._drone_rows]
+        charge = self._drone_store.charge_time[self._drone_rows] / 60
+        pos = np.array([state['pos'] for state in drone_states], dtype=np.float64).reshape(-1, 2)
+        node = np.array([-1 if state['node'] is None else state['node'] for state in drone_states], dtype=np.int64)
+        battery = np.array([state['battery'] for state in drone_states], dtype=np.float64)
+        times = np.array([state['time'] for state in drone_states], dtype=np.float64)
+        # Hangi noktanın hangi bölgenin içinde kaldığı: ucu aktif bir bölgenin içinde olan parça kesin engellenir
+        dp_inside = self._zones_containing(self._dp_pos[np.array(rows, dtype=np.int64)].reshape(-1, 2))
+        drone_inside = self._zones_containing(pos)
+        unassigned = []
+
+        for r, j in enumerate(rows):
+            dp = self.delivery_points[j]
+            dp_node = self._dp_nodes.get(dp.id)
+            distance = self._leg_distances(pos, node, dp, dp_node, times)
+            consumption = distance * (5 / speed)
+            # Ağırlık, batarya ve zaman penceresi (şarj gerekiyorsa şarj süresi uçuştan önce eklenir)
+            start = times + np.where(battery - consumption < 20, charge, 0.0)
+            arrival = start + distance / speed * 60
+            feasible = ((dp.weight <= max_weight) & (consumption <= battery) &
+                        (dp.time_window[0] <= arrival) & (arrival <= dp.time_window[1]))
+            candidates = np.flatnonzero(feasible)
+            best = None
+            if len(candidates):
+                cost = distance[candidates] * dp.weight + (6 - dp.priority) * 100
+                order = candidates[np.argsort(cost, kind="stable")]
+                best = self._first_unblocked(order, pos, node, dp, dp_node, start, dp_inside[r] | drone_inside[order])
+            if best is None:
+                unassigned.append(j)
+                continue
+
+            # Yalnızca seçilen drone'un satırını güncelle
+            k = int(best)
+            assignments.setdefault(self.drones[k].id, []).append(dp.id)
+            battery[k], times[k] = self._advance(self.drones[k], battery[k], times[k], distance[k])
+            pos[k] = dp.pos
+            node[k] = -1 if dp_node is None else dp_node
+            drone_inside[k] = dp_inside[r]
+            drone_states[k].update(pos=dp.pos, node=dp_node, battery=float(battery[k]), time=float(times[k]))
+
+        return unassigned
+
+    def _replay(self, drone: Drone, route: List[int], state: Dict,
+                trace: Optional[List[Tuple[Dict, float]]] = None) -> Tuple[List[int], List[int], Dict, float]:
+        """Rotayı başlangıç durumundan yeniden uçur: (geçerli önek, kalan teslimatlar, bitiş durumu, önek maliyeti).
+
+        İlk geçersiz bacakta durulur; rota dışındaki (iptal edilmiş) teslimatlar atlanır.
+        trace verilirse her geçerli bacaktan önceki (durum, birikmiş maliyet) eklenir.
+        """
+        state = dict(state)
+        kept: List[int] = []
+        total = 0.0
+        for n, dp_id in enumerate(route):
+            j = self._dp_row.get(dp_id)
+            if j is None:
+                continue
+            dp = self.delivery_points[j]
+            if trace is not None:
+                trace.append((dict(state), total))
+            if not self._is_valid_assignment(drone, dp, state['time'], state['pos'], state['battery'], state['node']):
+                return kept, [x for x in route[n:] if x in self._dp_row], state, total
+            distance = self._leg_distance(state['pos'], state['node'], dp, state['time'])
+            total += self._calculate_assignment_cost(drone, dp, distance)
+            state['battery'], state['time'] = self._advance(drone, state['battery'], state['time'], distance)
+            state['pos'], state['node'] = dp.pos, self._dp_nodes.get(dp.id)
+            kept.append(dp_id)
+        return kept, [], state, total
+
+    def _insert(self, j: int, routes: Dict[int, List[int]], ends: np.ndarray, candidates: int) -> Optional[int]:
+        """Sınırlı yeniden arama: teslimatı en yakın `candidates` drone'un rotasında en ucuz geçerli konuma yerleştir.
+
+        ends: drone sırasıyla rota sonu konumları (yerleştirilen drone'un satırı güncellenir).
+        """
+        dp = self.delivery_points[j]
+        capable = np.flatnonzero(dp.weight <= self._drone_store.max_weight[self._drone_rows])
+        nearest = capable[np.argsort(np.hypot(ends[capable, 0] - dp.pos[0], ends[capable, 1] - dp.pos[1]),
+                                     kind="stable")[:candidates]]
+        best = None
+        for k in nearest.tolist():
+            drone = self.drones[k]
+            route = routes[drone.id]
+            # Önek durumları bir kez hesaplanır; her konum için yalnızca yeni teslimat ve sonrası yeniden uçurulur
+            trace: List[Tuple[Dict, float]] = []
+            _, _, end, base = self._replay(drone, route, self._plan_start[drone.id], trace)
+            trace.append((end, base))
+            for position, (state, prefix_cost) in enumerate(trace):
+                tail = [dp.id] + route[position:]
+                kept, _, tail_end, tail_cost = self._replay(drone, tail, state)
+                delta = prefix_cost + tail_cost - base
+                if len(kept) == len(tail) and (best is None or delta < best[0]):
+                    best = (delta, k, route[:position] + tail, tail_end)
+        if best is None:
+            return None
+        _, k, trial, end = best
+        routes[self.drones[k].id] = trial
+        self._plan_end[self.drones[k].id] = end
+        ends[k] = end['pos']
+        return k
+
+    def resolve(self, added: Sequence[DeliveryPoint] = (), cancelled: Sequence[int] = (),
+                removed_drones: Sequence[int] = (), updated_drones: Sequence[Drone] = (),
+                previous: Optional[Dict[int, List[int]]] = None, current_time: str = "00:00",
+                insert_candidates: int = 8) -> Dict[int, List[int]]:
+        """Önceki planı bir değişiklikle (delta) onararak yeniden çöz.
+
+        added: yeni teslimatlar; cancelled: iptal edilen teslimat kimlikleri; removed_drones: devreden çıkan droneların
+        kimlikleri; updated_drones: durumu (konum, batarya) değişen ya da yeni katılan droneların güncel nesneleri.
+        previous verilmezse son solve/resolve planı kullanılır. Yalnızca etkilenen droneların rotaları yeniden uçurulur;
+        geçersiz kalan kısımlar ve yeni teslimatlar önce rotaların sonuna greedy olarak eklenir, eklenemeyenler en yakın
+        `insert_candidates` drone'un rotasına en ucuz konumdan yerleştirilmeye çalışılır. Diğer rotalara dokunulmaz.
+        Sayaçlar `stats` içindedir.
+        """
+        started = time.perf_counter()
+        current_time_minutes = int(current_time.split(':')[0]) * 60 + int(current_time.split(':')[1])
+        if previous is not None and previous != self.assignments:
+            # Dışarıdan verilen plan: başlangıç durumları bilinmiyor, tüm rotalar şimdiki zamandan yeniden uçurulur
+            self._plan_start = {drone.id: dict(state) for drone, state in
+                                zip(self.drones, self._initial_states(current_time_minutes))}
+            self._plan_end = None
+        plan = self.assignments if previous is None else previous
+        removed = set(removed_drones)
+        cancelled = set(cancelled)
+        updated = {drone.id: drone for drone in updated_drones}
+
+        # Problemi güncelle: drone ve teslimat listeleri, graf düğüm eşlemeleri ve alan sütunları
+        orphans = [dp_id for drone_id in removed for dp_id in plan.get(drone_id, ())]
+        known = {drone.id for drone in self.drones}
+        self.drones = [updated.get(drone.id, drone) for drone in self.drones if drone.id not in removed]
+        self.drones += [drone for drone_id, drone in updated.items() if drone_id not in known and drone_id not in removed]
+        # Liste zaten öncelik sıralı: iptaller süzülür, yeni teslimatlar sıralı olarak araya katılır
+        kept_points = [dp for dp in self.delivery_points if dp.id not in cancelled] if cancelled else self.delivery_points
+        self.delivery_points = list(heapq.merge(kept_points, sort_deliveries_by_priority(list(added)),
+                                                key=lambda dp: (-dp.priority, dp.id)))
+        if self.graph is not None:
+            # Graf düğümü drone'un yeni konumuna taşınır; grafta olmayan drone düğümsüz kalır (koordinat tabanlı bölge testi)
+            for drone in updated.values():
+                name = f"drone_{drone.id}"
+                if name not in self.graph.node_index:
+                    self._drone_nodes.pop(drone.id, None)
+                elif tuple(self.graph.coordinates[self.graph.node_index[name]]) != tuple(drone.start_pos):
+                    self.graph.update_drone_position(drone.id, drone.start_pos)
+        self._link_nodes(list(updated.values()), list(added))
+        self._index_problem()
+        for drone_id in removed:
+            self._plan_start.pop(drone_id, None)
         for drone in self.drones:
-            drone_states[drone.id] = {
-                'pos': drone.start_pos,
-                'battery': drone.battery,
-                'time': current_time_minutes
-            }
-        
-        # Her teslimat noktası için en uygun drone'u bul
-        for dp in self.delivery_points:
-            best_drone = None
-            best_cost = float('inf')
-            
-            for drone in self.drones:
-                drone_id = drone.id
-                current_state = drone_states[drone_id]
-                
-                if self._is_valid_assignment(drone, dp, current_state['time'], 
-                                           current_state['pos'], current_state['battery']):
-                    
-                    distance = ((current_state['pos'][0] - dp.pos[0]) ** 2 + 
-                               (current_state['pos'][1] - dp.pos[1]) ** 2) ** 0.5
-                    cost = self._calculate_assignment_cost(drone, dp, distance)
-                    
-                    if cost < best_cost:
-                        best_cost = cost
-                        best_drone = drone
-            
-            # En iyi drone'a ata
-            if best_drone is not None:
-                drone_id = best_drone.id
-                assignments[drone_id].append(dp.id)
-                
-                # Drone durumunu güncelle
-                distance = ((drone_states[drone_id]['pos'][0] - dp.pos[0]) ** 2 + 
-                           (drone_states[drone_id]['pos'][1] - dp.pos[1]) ** 2) ** 0.5
-                battery_consumption = distance * (5 / best_drone.speed)
-                travel_time = distance / best_drone.speed * 60
-                
-                drone_states[drone_id]['pos'] = dp.pos
-                drone_states[drone_id]['battery'] -= battery_consumption
-                drone_states[drone_id]['time'] += travel_time
-                
-                # Şarj kontrolü
-                if drone_states[drone_id]['battery'] < 20:
-                    charge_time = best_drone.charge()
-                    drone_states[drone_id]['battery'] = 100
-                    drone_states[drone_id]['time'] += charge_time / 60
-        
-        return assignments
\ No newline at end of file
+            if drone.id in updated or drone.id not in self._plan_start:
+                self._plan_start[drone.id] = {'pos': drone.start_pos, 'node': self._drone_nodes.get(drone.id),
+                                              'battery': drone.battery, 'time': current_time_minutes}
+
+        routes = {drone.id: list(plan.get(drone.id, ())) for drone in self.drones}
+        affected = {drone_id for drone_id, route in routes.items()
+                    if drone_id in updated or any(dp_id in cancelled or dp_id not in self._dp_row for dp_id in route)}
+        if self._plan_end is None:
+            affected = set(routes)
+            self._plan_end = {}
+        for drone in self.drones:
+            if drone.id in affected:
+                kept, rest, end, _ = self._replay(drone, routes[drone.id], self._plan_start[drone.id])
+                routes[drone.id] = kept
+                orphans.extend(rest)
+                self._plan_end[drone.id] = end
+        for drone_id in removed:
+            self._plan_end.pop(drone_id, None)
+
+        # Yeni ve boşta kalan teslimatlar: önce rotaların sonuna (öncelik sırasıyla), sonra sınırlı ekleme araması
+        pending = sorted({self._dp_row[dp_id] for dp_id in orphans if dp_id in self._dp_row} |
+                         {self._dp_row[dp.id] for dp in added})
+        end_states = [self._plan_end[drone.id] for drone in self.drones]
+        leftover = self._dispatch(pending, end_states, routes)
+        inserted = 0
+        if leftover:
+            ends = np.array([state['pos'] for state in end_states], dtype=np.float64).reshape(-1, 2)
+            for j in leftover:
+                if self._insert(j, routes, ends, insert_candidates) is not None:
+                    inserted += 1
+
+        self.assignments = {drone_id: route for drone_id, route in routes.items() if route}
+        self.stats = {"replayed": len(affected), "orphaned": len(orphans), "pending": len(pending),
+                      "inserted": inserted, "unassigned": len(leftover) - inserted,
+                      "time": time.perf_counter() - started}
+        return {drone_id: list(route) for drone_id, route in self.assignments.items()}
+
+    def solve_greedy(self, current_time: str = "00:00") -> Dict[int, List[int]]:
+        """Yalnızca vektörel greedy dağıtım (arama yapılmaz); büyük filo × sipariş örnekleri için."""
+        current_time_minutes = int(current_time.split(':')[0]) * 60 + int(current_time.split(':')[1])
+        end_states = self._initial_states(current_time_minutes)
+        result = self._greedy_fallback(current_time_minutes, end_states)
+        self._record_plan(result, self._initial_states(current_time_minutes), end_states)
+        return result
+
+    def _leg_distances(self, pos: np.ndarray, node: np.ndarray, dp: DeliveryPoint, dp_node: Optional[int],
+                       times: np.ndarray) -> np.ndarray:
+        """Tüm droneların bulundukları yerden teslimata uçuş mesafeleri (_leg_distance'ın vektörel hali)."""
+        distance = np.hypot(pos[:, 0] - dp.pos[0], pos[:, 1] - dp.pos[1])
+        if not self.detour_routing or dp_node is None:
+            return distance
+        routed = np.flatnonzero(node >= 0)
+        if len(routed) == 0:
+            return distance
+        # Dolambaç tablosu zaman dilimine bağlıdır: droneları dilimlerine göre grupla
+        slices = self.graph.edge_cache.slices.slices_of(times[routed])
+        for slice_id in np.unique(slices):
+            rows = routed[slices == slice_id]
+            table = self.graph.detour_table(float(times[rows[0]]))
+            distance[rows] = table.distances[node[rows], dp_node]
+        return distance
+
+    def _zones_containing(self, points: np.ndarray) -> np.ndarray:
+        """Noktaların hangi bölgelerin içinde (ya da sınırında) kaldığı (N×Z)."""
+        return segments_intersect_polygons(np.hstack((points, points)), self.zone_index.packed)
+
+    def _first_unblocked(self, order: np.ndarray, pos: np.ndarray, node: np.ndarray, dp: DeliveryPoint,
+                         dp_node: Optional[int], times: np.ndarray, contained: np.ndarray) -> Optional[int]:
+        """Maliyet sırasındaki adaylar arasından uçuş yasağı bölgesine girmeyen ilkini döndür.
+
+        Önce tüm adaylar için kutu elemesi yapılır: kutusu aktif hiçbir bölgeyle çakışmayan ilk aday kesinlikle
+        serbesttir; bir ucu aktif bir bölgenin içinde kalan aday (contained) kesinlikle engellidir. Kesin test yalnızca
+        ilk serbest adaydan daha ucuz, belirsiz adaylarda tek bir toplu çağrıyla yapılır.
+        """
+        overlap = self._zone_overlap(order, pos, node, dp, dp_node, times[order])
+        clear = np.flatnonzero(~overlap.any(axis=1))
+        head = len(order) if len(clear) == 0 else int(clear[0])
+        unsure = np.flatnonzero(~(overlap[:head] & contained[:head]).any(axis=1))
+        if len(unsure):
+            rows = order[unsure]
+            free = np.flatnonzero(~self._blocked_legs(rows, pos, node, dp, dp_node, times[rows], overlap[unsure]))
+            if len(free):
+                return int(rows[free[0]])
+        return None if head == len(order) else int(order[head])
+
+    def _zone_overlap(self, rows: np.ndarray, pos: np.ndarray, node: np.ndarray, dp: DeliveryPoint,
+                      dp_node: Optional[int], times: np.ndarray) -> np.ndarray:
+        """Seçili droneların teslimata düz uçuş parçasının kutusu ile o anda aktif bölge kutularının çakışması (m×Z).
+
+        Kutusu hiçbir aktif bölgeyle çakışmayan parça engellenemez; dolambaç modunda graf üzerindeki bacaklar zaten
+        bölgelerin etrafından ölçüldüğü için hiç çakışmaz sayılır.
+        """
+        start = pos[rows]
+        bboxes = self.zone_index.bboxes
+        active = np.array([zone.active_time for zone in self.zone_index.zones], dtype=np.float64).reshape(-1, 2)
+        t = times[:, None]
+        overlap = ((np.minimum(start[:, 0], dp.pos[0])[:, None] <= bboxes[None, :, 2]) &
+                   (np.maximum(start[:, 0], dp.pos[0])[:, None] >= bboxes[None, :, 0]) &
+                   (np.minimum(start[:, 1], dp.pos[1])[:, None] <= bboxes[None, :, 3]) &
+                   (np.maximum(start[:, 1], dp.pos[1])[:, None] >= bboxes[None, :, 1]) &
+                   (active[None, :, 0] <= t) & (t <= active[None, :, 1]))
+        if self.detour_routing and dp_node is not None:
+            overlap[node[rows] >= 0] = False
+        return overlap
+
+    def _blocked_legs(self, rows: np.ndarray, pos: np.ndarray, node: np.ndarray, dp: DeliveryPoint,
+                      dp_node: Optional[int], times: np.ndarray, overlap: np.ndarray) -> np.ndarray:
+        """Seçili droneların teslimata düz uçuşunun verilen anlarda aktif bir bölgeye girip girmediği (kesin test).
+
+        overlap: _zone_overlap çıktısı; yalnızca kutusu çakışan (parça, bölge) çiftleri test edilir.
+        """
+        blocked = np.zeros(len(rows), dtype=bool)
+        on_graph = node[rows] >= 0 if dp_node is not None else blocked.copy()
+        graph_rows = np.flatnonzero(on_graph & overlap.any(axis=1))
+        if len(graph_rows):
+            blocked[graph_rows] = self._blocked_edges(node[rows[graph_rows]], dp_node, times[graph_rows])
+        check = np.flatnonzero(~on_graph & overlap.any(axis=1))
+        if len(check):
+            segments = np.column_stack((pos[rows[check]], np.broadcast_to(dp.pos, (len(check), 2))))
+            hits = segments_intersect_polygons(segments, self.zone_index.packed)
+            blocked[check] = (hits & overlap[check]).any(axis=1)
+        return blocked
+
+    def _blocked_edges(self, sources: np.ndarray, target: int, times: np.ndarray) -> np.ndarray:
+        """Graf düğümlerinden hedef düğüme kenarların engellenmesi (zaman dilimli kenar önbelleğinden)."""
+        graph = self.graph
+        if graph.indptr is not None:
+            return np.array([graph.is_edge_blocked(int(u), target, float(t)) for u, t in zip(sources, times)], dtype=bool)
+        cache = graph.edge_cache
+        blocked = np.zeros(len(sources), dtype=bool)
+        slices = cache.slices.slices_of(times)
+        for slice_id in np.unique(slices):
+            rows = slices == slice_id
+            bits = cache.slice_bits(int(slice_id))
+            blocked[rows] = ((bits[sources[rows], target >> 3] >> (target & 7)) & 1).astype(bool)
+        return blocked & (sources != target)
+
+# Süreç havuzu işçileri: çözücü her işçiye bir kez kopyalanır
+_worker_state: Dict = {}
+
+def _init_split_worker(solver: CSP, bound, lock, deadline_wall: float):
+    solver._shared_bound, solver._bound_lock, solver._callback = bound, lock, None
+    _worker_state.update(solver=solver, deadline=deadline_wall)
+
+def _worker_subtree(job: Tuple[Sequence[Tuple[int, int]], float]) -> Tuple[bool, float, Dict[int, List[int]], int, int]:
+    solver = _worker_state["solver"]
+    prefix, cost = job
+    solver._deadline = time.perf_counter() + (_worker_state["deadline"] - time.time())
+    solver.stats = {"nodes": 0, "backtracks": 0, "pruned": 0, "budget_exhausted": False, "time": 0.0, "incumbents": 0}
+    complete = solver._solve_subtree(prefix, cost)
+    return complete, solver._incumbent_value, solver._incumbent, solver.stats["nodes"], solver.stats["incumbents"]
+
+def _init_portfolio_worker(solver: CSP, stop):
+    solver._stop = stop
+    _worker_state.update(solver=solver)
+
+def _worker_strategy(strategy: str, current_time: str) -> Tuple[str, Dict[int, List[int]], Dict]:
+    solver = _worker_state["solver"]
+    solver.variable_order = strategy
+    result = solver.solve(current_time)
+    return strategy, result, dict(solver.stats)
@@ -1,51 +1,120 @@
-from typing import List, Tuple
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Tuple
 import random
+import time
+import numpy as np
 from src.utils.graph import Graph
 from src.models.drone import Drone
 from src.models.delivery_point import DeliveryPoint
+from src.models.store import DeliveryStore, DroneStore
+
+def _duplicate_rows(population: np.ndarray) -> np.ndarray:
+    """Aynı teslimatı birden fazla drone'a veren satırların maskesi."""
+    ordered = np.sort(population, axis=1)
+    return ((ordered[:, 1:] == ordered[:, :-1]) & (ordered[:, 1:] >= 0)).any(axis=1)
+
+def batch_fitness(population: np.ndarray, gain: np.ndarray) -> np.ndarray:
+    """(birey × drone) gen dizisinin (-1 = boş drone) tüm bireyleri için fitness değerleri.
+
+    gain: drone × (teslimat + 1) katkı tablosu; 0. sütun boş drone (0), j + 1. sütun teslimat j için
+    50 - enerji × 0.1 - ihlal × 1000. Toplam _fitness ile aynı formüldür; tekrarlı birey -inf alır.
+    """
+    offsets = np.arange(population.shape[1]) * gain.shape[1] + 1
+    fitness = gain.ravel()[population + offsets].sum(axis=1)
+    fitness[_duplicate_rows(population)] = float('-inf')
+    return fitness
 
 class GeneticAlgorithm:
-    def __init__(self, drones: List[Drone], delivery_points: List[DeliveryPoint], graph: Graph):
+    def __init__(self, drones: List[Drone], delivery_points: List[DeliveryPoint], graph: Graph, detour: bool = False,
+                 cache_size: int = 4096, vectorized: bool = False, seed: Optional[int] = None, workers: int = 1,
+                 stall_generations: Optional[int] = None, min_improvement: float = 0.0,
+                 time_budget: Optional[float] = None, target_fitness: Optional[float] = None):
+        """detour=True: enerji, bölgelerin etrafından dolaşan uçuş mesafesiyle hesaplanır; ulaşılabilen teslimat ihlal sayılmaz.
+
+        cache_size: en fazla bu kadar kromozomun fitness değeri LRU önbellekte tutulur (0 = kapalı);
+        değerlendirme ve önbellek sayaçları `stats` içindedir.
+        vectorized=True: popülasyon (birey × drone) tamsayı dizisidir (-1 = boş drone); fitness, çaprazlama, mutasyon
+        ve onarım tüm popülasyon üzerinde dizi işlemleriyle yapılır. seed bu motorun rastgele üretecini sabitler.
+        workers > 1 (vektörel motor): her neslin fitness'ı süreç havuzunda hesaplanır; problem tablosu paylaşımlı
+        bellekte bir kez yayımlanır, süreçler arasında yalnızca kromozomlar ve skorlar taşınır. Sonuç seri ile aynıdır.
+        Durdurma ölçütleri (generations üst sınırdır): en iyi fitness stall_generations nesil boyunca min_improvement'tan
+        fazla artmazsa, time_budget saniye dolarsa ya da target_fitness'a ulaşılırsa koşu biter. Neden `stop_reason`,
+        nesil başına en iyi/ortalama (sonlu değerler) fitness `history` içindedir.
+        """
         self.drones = drones
         self.delivery_points = delivery_points
         self.graph = graph
+        self.detour = detour
         self.population_size = 200
         self.generations = 100
         self.valid_dp_ids = [dp.id for dp in self.delivery_points]
+        self.dp_store, dp_rows = DeliveryStore.view(self.delivery_points)
+        drone_store, drone_rows = DroneStore.view(self.drones)
+        self._valid_ids = frozenset(self.valid_dp_ids)
+        self._dp_position = {dp_id: i for i, dp_id in enumerate(self.valid_dp_ids)}
+        # Drone başına kapasitesine uygun teslimat ID'leri (teslimat sırasıyla)
+        ids, weights = self.dp_store.ids[dp_rows], self.dp_store.weights[dp_rows]
+        self._eligible = [ids[weights <= capacity].tolist() for capacity in drone_store.max_weight[drone_rows]]
+        self._drone_nodes = [graph.index_of(f"drone_{drone.id}") for drone in self.drones]
+        self.cache_size = cache_size
+        self._fitness_cache: "OrderedDict[tuple, float]" = OrderedDict()
+        self._cache_version = graph.version
+        self.stats: Dict[str, int] = {"evaluations": 0, "cache_hits": 0, "evictions": 0}
+        self.vectorized = vectorized
+        self.seed = seed
+        self.workers = workers
+        self.stall_generations = stall_generations
+        self.min_improvement = min_improvement
+        self.time_budget = time_budget
+        self.target_fitness = target_fitness
+        self.stop_reason: Optional[str] = None
+        self.history: Dict[str, List[float]] = {"best": [], "mean": []}
+        self._started = 0.0
+        self._stall = 0
+        self._best_seen = float('-inf')
+        self._arrays: Optional[Dict[str, np.ndarray]] = None
+        self._arrays_version = -1
 
     def validate_chromosome(self, chromosome: List[List[int]]) -> Tuple[bool, str]:
-        """Chromosome'da duplicate teslimat ve tek paket kısıtını kontrol et"""
-        all_deliveries = []
+        """Chromosome'da duplicate teslimat ve tek paket kısıtını kontrol et (tek geçiş, küme üyeliğiyle)"""
+        seen = set()
+        duplicates = set()
         
         # Her drone'un rotasını kontrol et
         for i, drone_route in enumerate(chromosome):
             # TEK PAKET KISITI: Her drone maksimum 1 teslimat yapabilir
             if len(drone_route) > 1:
                 return False, f"Drone {i} has {len(drone_route)} deliveries, but can only carry 1 package"
-            
-            all_deliveries.extend(drone_route)
+            for delivery_id in drone_route:
+                if delivery_id in seen:
+                    duplicates.add(delivery_id)
+                seen.add(delivery_id)
         
         # Duplicate kontrol
-        unique_deliveries = set(all_deliveries)
-        if len(all_deliveries) != len(unique_deliveries):
-            duplicates = [x for x in all_deliveries if all_deliveries.count(x) > 1]
-            return False, f"Duplicate deliveries found: {set(duplicates)}"
+        if duplicates:
+            return False, f"Duplicate deliveries found: {duplicates}"
         
         # Geçersiz teslimat ID kontrol
-        valid_delivery_ids = set(self.valid_dp_ids)
-        invalid_ids = unique_deliveries - valid_delivery_ids
+        invalid_ids = seen - self._valid_ids
         if invalid_ids:
             return False, f"Invalid delivery IDs: {invalid_ids}"
             
         return True, "Valid"
 
     def repair_chromosome(self, chromosome: List[List[int]]) -> List[List[int]]:
-        """Bozuk chromosome'u onar - tek paket kısıtını uygula"""
+        """Bozuk chromosome'u onar - tek paket kısıtını uygula
+
+        Boş drone'lar bir bit maskesinde tutulur: her atanmamış teslimat ilk boş drone'a (en düşük bit) denenir,
+        kapasitesi yetmezse atlanır. O(drone + teslimat).
+        """
         # Her drone'dan sadece ilk teslimatı al (tek paket kısıtı)
         repaired_chromosome = []
         used_deliveries = set()
+        free_drones = 0
         
-        for drone_route in chromosome:
+        for i, drone_route in enumerate(chromosome):
             if drone_route and drone_route[0] not in used_deliveries:
                 # İlk teslimatı al ve kullanıldı olarak işaretle
                 repaired_chromosome.append([drone_route[0]])
@@ -53,34 +122,26 @@ class GeneticAlgorithm:
             else:
                 # Boş route veya zaten kullanılmış teslimat
                 repaired_chromosome.append([])
+                free_drones |= 1 << i
         
         # Atanmamış teslimatları boş drone'lara dağıt
-        all_delivery_ids = set(self.valid_dp_ids)
-        unassigned = list(all_delivery_ids - used_deliveries)
-        
-        for delivery_id in unassigned:
-            # Boş drone bul
-            empty_drone_idx = None
-            for i, route in enumerate(repaired_chromosome):
-                if not route:  # Boş drone
-                    empty_drone_idx = i
-                    break
-            
-            if empty_drone_idx is not None:
-                # Drone kapasitesini kontrol et
-                delivery = next(dp for dp in self.delivery_points if dp.id == delivery_id)
-                drone = self.drones[empty_drone_idx]
-                
-                if delivery.weight <= drone.max_weight:
-                    repaired_chromosome[empty_drone_idx] = [delivery_id]
+        for delivery_id in self.valid_dp_ids:
+            if not free_drones:
+                break
+            if delivery_id in used_deliveries:
+                continue
+            empty_drone_idx = (free_drones & -free_drones).bit_length() - 1
+            # Drone kapasitesini kontrol et
+            if self.dp_store.get(delivery_id).weight <= self.drones[empty_drone_idx].max_weight:
+                repaired_chromosome[empty_drone_idx] = [delivery_id]
+                free_drones &= free_drones - 1
             
         return repaired_chromosome
 
     def find_best_drone_for_delivery(self, delivery_id: int, current_chromosome: List[List[int]]) -> int:
         """Bir teslimat için en uygun BOŞ drone'u bul"""
-        try:
-            delivery = next(dp for dp in self.delivery_points if dp.id == delivery_id)
-        except StopIteration:
+        delivery = self.dp_store.get(delivery_id)
+        if delivery is None:
             return None
         
         best_drone_idx = None
@@ -105,6 +166,29 @@ class GeneticAlgorithm:
                 
         return best_drone_idx
 
+    def evaluate(self, routes: List[List[int]]) -> float:
+        """Kromozomun fitness değeri; aynı kromozom (kanonik anahtar) önbellekten döner, yeniden hesaplanmaz."""
+        if not self.cache_size:
+            self.stats["evaluations"] += 1
+            return self._fitness(routes)
+        if self._cache_version != self.graph.version:
+            # Düğüm ya da bölge değişti: eski değerler geçersiz
+            self._fitness_cache.clear()
+            self._cache_version = self.graph.version
+        key = tuple(tuple(route) for route in routes)
+        cached = self._fitness_cache.get(key)
+        if cached is not None:
+            self._fitness_cache.move_to_end(key)
+            self.stats["cache_hits"] += 1
+            return cached
+        self.stats["evaluations"] += 1
+        fitness = self._fitness(routes)
+        self._fitness_cache[key] = fitness
+        if len(self._fitness_cache) > self.cache_size:
+            self._fitness_cache.popitem(last=False)
+            self.stats["evictions"] += 1
+        return fitness
+
     def _fitness(self, routes: List[List[int]]) -> float:
         """
         Fitness fonksiyonu: Tek paket kısıtını da kontrol eder
@@ -131,27 +215,31 @@ class GeneticAlgorithm:
             drone = self.drones[i]
             dp_id = route[0]  # Sadece bir teslimat var
             
-            try:
-                dp = next(dp for dp in self.delivery_points if dp.id == dp_id)
-                
-                # Mesafe hesaplama
-                distance = ((current_pos[0] - dp.pos[0]) ** 2 + (current_pos[1] - dp.pos[1]) ** 2) ** 0.5
-                
-                # Enerji tüketimi hesaplama
-                energy_consumption = distance * 5 / drone.speed
-                total_energy += energy_consumption
-                
-                # Kapasite ihlali kontrolü
-                if dp.weight > drone.max_weight:
-                    violations += 1
-                
-                # No-fly zone ihlali kontrolü
-                if self.graph.is_in_no_fly_zone(current_pos, dp.pos):
-                    violations += 1
-                
-            except StopIteration:
+            dp = self.dp_store.get(dp_id)
+            if dp is None:
                 violations += 1
                 continue
+            # Mesafe hesaplama (graf mesafe matrisinden)
+            dp_node = self.graph.index_of(f"dp_{dp_id}")
+            if self.detour:
+                distance = self.graph.flight_distance(self._drone_nodes[i], dp_node)
+                if distance == float('inf'):
+                    violations += 1
+                    continue
+            else:
+                distance = self.graph.distance(self._drone_nodes[i], dp_node)
+            
+            # Enerji tüketimi hesaplama
+            energy_consumption = distance * 5 / drone.speed
+            total_energy += energy_consumption
+            
+            # Kapasite ihlali kontrolü
+            if dp.weight > drone.max_weight:
+                violations += 1
+            
+            # No-fly zone ihlali kontrolü
+            if not self.detour and self.graph.is_in_no_fly_zone(current_pos, dp.pos):
+                violations += 1
         
         # Fitness formülü
         fitness = (total_deliveries * 50) - (total_energy * 0.1) - (violations * 1000)
@@ -177,10 +265,12 @@ class GeneticAlgorithm:
         """Mutasyon işlemi - Tek paket için"""
         if random.random() < 0.1:  # %10 mutasyon şansı
             if route:
-                # Mevcut teslimatı rastgele başka bir teslimatla değiştir
-                available_dps = [dp_id for dp_id in self.valid_dp_ids if dp_id != route[0]]
-                if available_dps and random.random() < 0.3:
-                    route[0] = random.choice(available_dps)
+                # Mevcut teslimatı rastgele başka bir teslimatla değiştir (listesini kurmadan: mevcut atlanır)
+                current = self._dp_position.get(route[0])
+                others = len(self.valid_dp_ids) - (current is not None)
+                if others and random.random() < 0.3:
+                    pick = random.randrange(others)
+                    route[0] = self.valid_dp_ids[pick + (current is not None and pick >= current)]
             else:
                 # Boş rotaya rastgele teslimat ekle
                 if random.random() < 0.2:
@@ -193,33 +283,33 @@ class GeneticAlgorithm:
         return route
 
     def _generate_initial_population(self) -> List[List[List[int]]]:
-        """Başlangıç popülasyonunu üret - Tek paket kısıtı ile"""
+        """Başlangıç popülasyonunu üret - Tek paket kısıtı ile
+
+        Her drone'un uygun teslimatları bir havuz dizisindedir; birey başına yalnızca havuzun canlı boyu sıfırlanır.
+        Çekilen teslimat kullanılmışsa havuzun canlı sonuna atılır (swap-remove) ve yeniden çekilir: her çekiş O(1)'dir,
+        kullanılmış bir teslimat bir drone için en fazla bir kez atılır. Birey başına O(drone × atanan teslimat).
+        """
         population = []
+        pools = [list(eligible) for eligible in self._eligible]  # Swap-remove sırayı karıştırır, kümeyi değiştirmez
         
         for _ in range(self.population_size):
             individual = []
             used_dps = set()
             
-            for drone in self.drones:
-                # Her drone için maksimum 1 teslimat
-                available_dps = [dp_id for dp_id in self.valid_dp_ids if dp_id not in used_dps]
-                
-                if available_dps:
-                    # Drone kapasitesine uygun DP'leri filtrele
-                    suitable_dps = []
-                    for dp_id in available_dps:
-                        dp = next(dp for dp in self.delivery_points if dp.id == dp_id)
-                        if dp.weight <= drone.max_weight:
-                            suitable_dps.append(dp_id)
-                    
-                    if suitable_dps and random.random() < 0.7:  # %70 şansla teslimat ata
-                        selected_dp = random.choice(suitable_dps)
-                        route = [selected_dp]
-                        used_dps.add(selected_dp)
-                    else:
-                        route = []
-                else:
-                    route = []
+            for pool in pools:
+                # Her drone için maksimum 1 teslimat; kapasitesine uygun DP yoksa boş kalır
+                route = []
+                size = len(pool)
+                if size and random.random() < 0.7:  # %70 şansla teslimat ata
+                    while size:
+                        pick = random.randrange(size)
+                        selected_dp = pool[pick]
+                        if selected_dp not in used_dps:
+                            route = [selected_dp]
+                            used_dps.add(selected_dp)
+                            break
+                        size -= 1
+                        pool[pick], pool[size] = pool[size], pool[pick]
                     
                 individual.append(route)
             
@@ -227,13 +317,352 @@ class GeneticAlgorithm:
         
         return population
 
+    def problem_arrays(self) -> Dict[str, np.ndarray]:
+        """Vektörel motorun drone×teslimat (D×P) tabloları; graf değişene kadar bir kez hesaplanır.
+
+        gain: batch_fitness katkı tablosu (teslimat + enerji + kapasite/bölge ihlali), eligible: kapasiteye uygunluk.
+        detour=True'da ulaşılamayan çift tek ihlal sayılır ve enerjisi eklenmez (_fitness ile aynı).
+        """
+        if self._arrays is not None and self._arrays_version == self.graph.version:
+            return self._arrays
+        drone_nodes = np.array(self._drone_nodes, dtype=np.int64)
+        dp_nodes = np.array([self.graph.index_of(f"dp_{dp.id}") for dp in self.delivery_points], dtype=np.int64)
+        if self.detour:
+            distance = self.graph.detour_table().distances[np.ix_(drone_nodes, dp_nodes)]
+        elif self.graph.distance_matrix is not None:
+            distance = self.graph.distance_matrix[np.ix_(drone_nodes, dp_nodes)].astype(np.float64)
+        else:
+            src = self.graph.positions[drone_nodes]
+            dst = self.graph.positions[dp_nodes]
+            distance = np.hypot(src[:, None, 0] - dst[None, :, 0], src[:, None, 1] - dst[None, :, 1])
+        drone_store, drone_rows = DroneStore.view(self.drones)
+        dp_store, dp_rows = DeliveryStore.view(self.delivery_points)
+        speed = drone_store.speed[drone_rows]
+        max_weight = drone_store.max_weight[drone_rows]
+        weight = dp_store.weights[dp_rows]
+        eligible = weight[None, :] <= max_weight[:, None]
+        violations = (~eligible).astype(np.int64)
+        if self.detour:
+            unreachable = ~np.isfinite(distance)
+            violations[unreachable] = 1
+            distance = np.where(unreachable, 0.0, distance)
+        elif len(drone_nodes) and len(dp_nodes):
+            # _fitness ile aynı: tüm bölgeler (zamandan bağımsız) ihlal sayılır
+            violations += self.graph.blocking_matrix(drone_nodes, dp_nodes)
+        gain = np.zeros((len(self.drones), len(self.delivery_points) + 1))
+        gain[:, 1:] = 50 - (distance * 5 / speed[:, None]) * 0.1 - violations * 1000.0
+        self._arrays = {"gain": gain, "eligible": eligible}
+        self._arrays_version = self.graph.version
+        return self._arrays
+
+    def decode(self, individual: np.ndarray) -> List[List[int]]:
+        """Gen satırını (-1 = boş) drone başına rota listesine çevir."""
+        return [[self.valid_dp_ids[gene]] if gene >= 0 else [] for gene in individual.tolist()]
+
+    def _array_initial_population(self, rng: np.random.Generator) -> np.ndarray:
+        """Başlangıç popülasyonu: her drone %70 şansla kapasitesine uygun rastgele bir teslimat alır.
+
+        Aynı bireyde tekrar eden teslimatların yalnızca ilki kalır.
+        """
+        eligible = self.problem_arrays()["eligible"]
+        num_drones = eligible.shape[0]
+        counts = eligible.sum(axis=1)
+        # Her drone için uygun teslimat indeksleri satırın başında (kararlı sıralama)
+        choices = np.argsort(~eligible, axis=1, kind="stable").astype(np.int32)
+        pick = (rng.random((self.population_size, num_drones)) * counts).astype(np.int64)
+        population = choices[np.arange(num_drones), pick]
+        active = (rng.random((self.population_size, num_drones)) < 0.7) & (counts > 0)
+        return self._array_dedupe(np.where(active, population, -1))[0]
+
+    def _array_dedupe(self, population: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Her satırda tekrar eden teslimatların ilki dışındakileri yerinde boşalt (-1).
+
+        Drone sütunları sırayla taranır (satırlar vektörel); (popülasyon, kullanılan teslimat maskesi) döner.
+        """
+        rows, num_drones = population.shape
+        width = len(self.valid_dp_ids) + 1
+        seen = np.zeros(rows * width, dtype=bool)
+        base = np.arange(rows) * width + 1
+        for i in range(num_drones):
+            genes = population[:, i]
+            slots = base + genes
+            repeated = seen[slots] & (genes >= 0)
+            genes[repeated] = -1
+            seen[slots] = True
+        return population, seen.reshape(rows, width)[:, 1:]
+
+    def _array_repair(self, population: np.ndarray) -> np.ndarray:
+        """repair_chromosome'un dizi karşılığı: tekrarları boşalt, atanmamış teslimatları boş drone'lara dağıt.
+
+        Her satırda atanmamış teslimatlar sırayla ilk boş drone'a denenir; kapasitesi yetmezse teslimat atlanır ve
+        drone boş kalır. Döngü teslimatlar üzerindedir, satırlar vektöreldir: O(teslimat × satır).
+        """
+        eligible = self.problem_arrays()["eligible"]
+        population, used = self._array_dedupe(population)
+        rows, num_drones = population.shape
+        empty = population < 0
+        # Her satırın boş drone'ları satır başında, drone sırasıyla (kararlı sıralama)
+        empty_drones = np.argsort(~empty, axis=1, kind="stable")
+        empty_count = empty.sum(axis=1)
+        next_empty = np.zeros(rows, dtype=np.int64)  # Satırın sıradaki boş drone'unun empty_drones sütunu
+        row_ids = np.arange(rows)
+        for gene in range(used.shape[1]):
+            waiting = next_empty < empty_count
+            if not waiting.any():
+                break
+            candidates = row_ids[waiting & ~used[:, gene]]
+            drones = empty_drones[candidates, next_empty[candidates]]
+            fits = eligible[drones, gene]
+            population[candidates[fits], drones[fits]] = gene
+            next_empty[candidates[fits]] += 1
+        return population
+
+    def _array_offspring(self, population: np.ndarray, fitness: np.ndarray, count: int,
+                         rng: np.random.Generator, tournament_size: int = 3) -> np.ndarray:
+        """Sıralı popülasyonun ilk yarısından turnuva seçimi, gen başına çaprazlama ve mutasyonla `count` çocuk."""
+        num_dps = len(self.valid_dp_ids)
+        shape = (count, population.shape[1])
+        pool = max(1, len(population) // 2)
+        parents = []
+        for _ in range(2):
+            tournament = rng.integers(0, pool, (count, tournament_size))
+            parents.append(population[tournament[np.arange(count), np.argmax(fitness[tournament], axis=1)]])
+        parent1, parent2 = parents
+        # Çaprazlama: biri boşsa diğeri, ikisi de doluysa yarı yarıya
+        pick = rng.random(shape) < 0.5
+        children = np.where(parent1 < 0, parent2, np.where((parent2 < 0) | pick, parent1, parent2))
+        # Mutasyon (%10): dolu gen %30 şansla başka bir teslimata, boş gen %20 şansla rastgele teslimata
+        rows, cols = np.nonzero(rng.random(shape) < 0.1)
+        genes = children[rows, cols]
+        roll = rng.random(len(genes))
+        assigned = genes >= 0
+        other = (genes + rng.integers(1, max(num_dps, 2), len(genes))) % num_dps
+        new = rng.integers(0, num_dps, len(genes))
+        changed = np.where(assigned, roll < 0.3, roll < 0.2)
+        children[rows[changed], cols[changed]] = np.where(assigned, other, new)[changed]
+        # Tekrarlı çocukları onar
+        invalid = _duplicate_rows(children)
+        if invalid.any():
+            children[invalid] = self._array_repair(children[invalid])
+        return children
+
+    @staticmethod
+    def _fitness_summary(fitness: np.ndarray) -> Tuple[float, float, int]:
+        """(en iyi, sonlu değerlerin toplamı, sonlu değer sayısı); ortalama geçersiz (-inf) bireyleri dışarıda bırakır."""
+        finite = fitness[np.isfinite(fitness)]
+        return float(np.max(fitness, initial=float('-inf'))), float(finite.sum()), len(finite)
+
+    def _begin_run(self):
+        """Durdurma durumunu ve izleme geçmişini sıfırla; süre bütçesi buradan başlar."""
+        self.stats = {"evaluations": 0, "cache_hits": 0, "evictions": 0}
+        self.stop_reason = "generations"
+        self.history = {"best": [], "mean": []}
+        self._started = time.perf_counter()
+        self._stall = 0
+        self._best_seen = float('-inf')
+
+    def _observe(self, best: float, mean: Optional[float] = None) -> Optional[str]:
+        """Bir neslin en iyi/ortalama fitness'ını kaydet; durma nedeni varsa döndür (mean=None: başlangıç popülasyonu)."""
+        if mean is not None:
+            self.history["best"].append(best)
+            self.history["mean"].append(mean)
+            self._stall = 0 if best > self._best_seen + self.min_improvement else self._stall + 1
+        self._best_seen = max(self._best_seen, best)
+        if self.target_fitness is not None and self._best_seen >= self.target_fitness:
+            return "target_fitness"
+        if mean is not None and self.stall_generations is not None and self._stall >= self.stall_generations:
+            return "stall"
+        if self.time_budget is not None and time.perf_counter() - self._started >= self.time_budget:
+            return "time_budget"
+        return None
+
+    def _observe_population(self, fitness: np.ndarray, initial: bool = False) -> bool:
+        """Popülasyonun fitness vektörünü _observe'a ver; durulacaksa stop_reason'ı yazıp True döndür."""
+        best, total, count = self._fitness_summary(fitness)
+        reason = self._observe(best, None if initial else (total / count if count else float('-inf')))
+        if reason is not None:
+            self.stop_reason = reason
+        return reason is not None
+
+    def _run_vectorized(self) -> Tuple[List[List[int]], float]:
+        """run()'un dizi tabanlı karşılığı: aynı elitizm (%25), turnuva ve gen operatörleri."""
+        rng = np.random.default_rng(self.seed)
+        gain = self.problem_arrays()["gain"]
+        if not self.drones or not self.delivery_points:
+            return [[] for _ in self.drones], 0.0
+        if self.workers <= 1:
+            return self._evolve(rng, lambda population: batch_fitness(population, gain))
+
+        # Katkı tablosu paylaşımlı belleğe bir kez yazılır; işçiler kopyalamadan eşler
+        shared = shared_memory.SharedMemory(create=True, size=max(gain.nbytes, 1))
+        try:
+            np.ndarray(gain.shape, dtype=gain.dtype, buffer=shared.buf)[:] = gain
+            with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_fitness_worker,
+                                     initargs=(shared.name, gain.shape, gain.dtype.str)) as pool:
+                def evaluate(population: np.ndarray) -> np.ndarray:
+                    # Satırlar birbirinden bağımsız toplandığından parçalara bölmek sonucu değiştirmez
+                    chunks = np.array_split(population, self.workers)
+                    return np.concatenate(list(pool.map(_worker_fitness, chunks)))
+                return self._evolve(rng, evaluate)
+        finally:
+            shared.close()
+            shared.unlink()
+
+    def _evolve(self, rng: np.random.Generator, evaluate) -> Tuple[List[List[int]], float]:
+        """Vektörel motorun nesil döngüsü; evaluate bir popülasyon dizisinin fitness vektörünü döndürür."""
+        population = self._array_initial_population(rng)
+        fitness = evaluate(population)
+        self.stats["evaluations"] += len(population)
+        stop = self._observe_population(fitness, initial=True)
+
+        for generation in range(self.generations):
+            if stop:
+                break
+            population, fitness = self._next_generation(population, fitness, rng, evaluate)
+            self.stats["evaluations"] += self.population_size - self.population_size // 4
+
+            if generation % 20 == 0:
+                delivered_count = int((population[np.argmax(fitness)] >= 0).sum())
+                print(f"Generation {generation}: {delivered_count}/{len(self.delivery_points)} teslimat yapıldı.")
+            stop = self._observe_population(fitness)
+
+        best = int(np.argmax(fitness))
+        return self.decode(population[best]), float(fitness[best])
+
+    def _next_generation(self, population: np.ndarray, fitness: np.ndarray, rng: np.random.Generator,
+                         evaluate) -> Tuple[np.ndarray, np.ndarray]:
+        """Tek nesil: sırala, en iyi %25'i koru, kalanını çocuklarla doldur."""
+        elite_size = self.population_size // 4
+        order = np.argsort(-fitness, kind="stable")
+        population, fitness = population[order], fitness[order]
+        children = self._array_offspring(population, fitness, self.population_size - elite_size, rng)
+        return (np.concatenate((population[:elite_size], children)),
+                np.concatenate((fitness[:elite_size], evaluate(children))))
+
+    def _evolve_island(self, population: Optional[np.ndarray], fitness: Optional[np.ndarray],
+                       rng: np.random.Generator, generations: int):
+        """Bir adayı `generations` nesil ilerlet (popülasyon yoksa önce üret).
+
+        (popülasyon, fitness, rng, değerlendirme sayısı, nesil başına _fitness_summary listesi) döndürür.
+        """
+        gain = self.problem_arrays()["gain"]
+        evaluate = lambda individuals: batch_fitness(individuals, gain)
+        evaluations = 0
+        if population is None:
+            population = self._array_initial_population(rng)
+            fitness = evaluate(population)
+            evaluations += len(population)
+        trace = []
+        for _ in range(generations):
+            population, fitness = self._next_generation(population, fitness, rng, evaluate)
+            evaluations += self.population_size - self.population_size // 4
+            trace.append(self._fitness_summary(fitness))
+        return population, fitness, rng, evaluations, trace
+
+    @staticmethod
+    def _migrate(islands: List[tuple], migrants: int, topology: str, rng: np.random.Generator) -> List[tuple]:
+        """Her adanın en iyi `migrants` bireyi hedef adanın en kötü bireylerinin yerine geçer (fitness'larıyla)."""
+        n = len(islands)
+        if n < 2 or migrants <= 0:
+            return islands
+        best = [np.argsort(-fitness, kind="stable")[:migrants] for _, fitness, _ in islands]
+        if topology == "ring":
+            targets = [(i + 1) % n for i in range(n)]
+        else:
+            targets = [(i + int(rng.integers(1, n))) % n for i in range(n)]
+        incoming: List[List[int]] = [[] for _ in range(n)]
+        for source, target in enumerate(targets):
+            incoming[target].append(source)
+
+        migrated = []
+        for i, (population, fitness, island_rng) in enumerate(islands):
+            if incoming[i]:
+                arrivals = np.concatenate([islands[s][0][best[s]] for s in incoming[i]])
+                scores = np.concatenate([islands[s][1][best[s]] for s in incoming[i]])
+                worst = np.argsort(fitness, kind="stable")[:len(scores)]
+                population, fitness = population.copy(), fitness.copy()
+                population[worst] = arrivals[:len(worst)]
+                fitness[worst] = scores[:len(worst)]
+            migrated.append((population, fitness, island_rng))
+        return migrated
+
+    def run_islands(self, islands: int = 4, migration_interval: int = 10, migrants: int = 2,
+                    topology: str = "ring", workers: Optional[int] = None) -> Tuple[List[List[int]], float]:
+        """Ada modeli: her biri population_size bireyli `islands` alt popülasyon vektörel motorla ayrı süreçlerde evrilir.
+
+        Adaların rastgele akışları seed'den (SeedSequence.spawn) bağımsız türetilir. Her `migration_interval` neslin
+        sonunda en iyi `migrants` birey halka ("ring") ya da rastgele ("random") topolojide komşu adaya göç eder.
+        Sonuç işçi sayısından bağımsızdır; dönen değer tüm adaların en iyisidir. Durdurma ölçütleri göç
+        aralıklarında, adaların birleşik nesil özetleriyle denetlenir.
+        """
+        if topology not in ("ring", "random"):
+            raise ValueError(f"Geçersiz göç topolojisi: {topology}")
+        if islands < 1 or migration_interval < 1:
+            raise ValueError(f"Geçersiz ada ayarı: islands={islands}, migration_interval={migration_interval}")
+        self._begin_run()
+        if not self.drones or not self.delivery_points:
+            return [[] for _ in self.drones], 0.0
+        self.problem_arrays()  # İşçilere hesaplanmış tablolarla gönderilir
+
+        streams = np.random.SeedSequence(self.seed).spawn(islands + 1)
+        migration_rng = np.random.default_rng(streams[-1])
+        states = [(None, None, np.random.default_rng(stream)) for stream in streams[:-1]]
+        workers = islands if workers is None else min(workers, islands)
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_island_worker, initargs=(self,)) \
+            if workers > 1 else None
+        try:
+            generation = 0
+            while True:
+                steps = min(migration_interval, self.generations - generation)
+                jobs = [(population, fitness, rng, steps) for population, fitness, rng in states]
+                results = list(pool.map(_worker_island, jobs)) if pool else [self._evolve_island(*job) for job in jobs]
+                states = [(population, fitness, rng) for population, fitness, rng, _, _ in results]
+                self.stats["evaluations"] += sum(result[3] for result in results)
+                generation += steps
+
+                reason = None
+                for summaries in zip(*(result[4] for result in results)):
+                    total = sum(summary[1] for summary in summaries)
+                    count = sum(summary[2] for summary in summaries)
+                    # Dönemin tüm nesilleri koşuldu: hepsi geçmişe yazılır, ilk durma nedeni geçerlidir
+                    observed = self._observe(max(summary[0] for summary in summaries),
+                                             total / count if count else float('-inf'))
+                    reason = reason or observed
+
+                island, best = max(((i, int(np.argmax(fitness))) for i, (_, fitness, _) in enumerate(states)),
+                                   key=lambda item: states[item[0]][1][item[1]])
+                delivered_count = int((states[island][0][best] >= 0).sum())
+                print(f"Generation {generation}: {delivered_count}/{len(self.delivery_points)} teslimat yapıldı.")
+                if reason is not None:
+                    self.stop_reason = reason
+                    break
+                if generation >= self.generations:
+                    break
+                states = self._migrate(states, migrants, topology, migration_rng)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+        population, fitness, _ = states[island]
+        return self.decode(population[best]), float(fitness[best])
+
     def run(self, current_time: str = "00:00") -> Tuple[List[List[int]], float]:
-        """Genetik algoritmayı çalıştırır - Tek paket kısıtı ile"""
-        population = self._generate_initial_population()
+        """Genetik algoritmayı çalıştırır - Tek paket kısıtı ile
+
+        Her birey fitness değeriyle birlikte (fitness, birey) çifti olarak tutulur; fitness bir kez hesaplanır.
+        vectorized=True ise dizi tabanlı motor kullanılır.
+        """
+        self._begin_run()
+        if self.vectorized:
+            return self._run_vectorized()
+        population = [(self.evaluate(individual), individual) for individual in self._generate_initial_population()]
+        stop = self._observe_population(np.array([scored[0] for scored in population]), initial=True)
         
         for generation in range(self.generations):
+            if stop:
+                break
             # Fitness değerlerine göre sırala
-            population = sorted(population, key=self._fitness, reverse=True)
+            population = sorted(population, key=lambda scored: scored[0], reverse=True)
             
             # En iyi %25'i koru (elitism)
             elite_size = self.population_size // 4
@@ -257,23 +686,39 @@ class GeneticAlgorithm:
                 if not is_valid:
                     child = self.repair_chromosome(child)
                 
-                new_population.append(child)
+                new_population.append((self.evaluate(child), child))
             
             population = new_population
             
             # Progress log
             if generation % 20 == 0:
-                best_individual = sorted(population, key=self._fitness, reverse=True)[0]
+                best_individual = max(population, key=lambda scored: scored[0])[1]
                 delivered_count = sum(len(route) for route in best_individual)
                 print(f"Generation {generation}: {delivered_count}/{len(self.delivery_points)} teslimat yapıldı.")
+            stop = self._observe_population(np.array([scored[0] for scored in population]))
         
         # En iyi çözümü döndür
-        best_individual = sorted(population, key=self._fitness, reverse=True)[0]
-        best_fitness = self._fitness(best_individual)
+        best_fitness, best_individual = max(population, key=lambda scored: scored[0])
         
         return best_individual, best_fitness
 
-    def _tournament_selection(self, population: List[List[List[int]]], tournament_size: int = 3) -> List[List[int]]:
-        """Tournament selection ile parent seçimi."""
+    def _tournament_selection(self, population: List[Tuple[float, List[List[int]]]], tournament_size: int = 3) -> List[List[int]]:
+        """Tournament selection ile parent seçimi (population: (fitness, birey) çiftleri)."""
         tournament = random.sample(population, min(tournament_size, len(population)))
-        return max(tournament, key=self._fitness)
\ No newline at end of file
+        return max(tournament, key=lambda scored: scored[0])[1]
+
+_worker_state: Dict[str, object] = {}
+
+def _init_fitness_worker(name: str, shape: Tuple[int, ...], dtype: str):
+    # Ana süreç tabloyu yayımlar ve siler; işçi yalnızca eşler
+    shared = shared_memory.SharedMemory(name=name)
+    _worker_state.update(shared=shared, gain=np.ndarray(shape, dtype=dtype, buffer=shared.buf))
+
+def _worker_fitness(population: np.ndarray) -> np.ndarray:
+    return batch_fitness(population, _worker_state["gain"])
+
+def _init_island_worker(ga: GeneticAlgorithm):
+    _worker_state.update(ga=ga)
+
+def _worker_island(job: tuple):
+    return _worker_state["ga"]._evolve_island(*job)
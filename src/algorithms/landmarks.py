@@ -0,0 +1,87 @@
+from typing import List
+import hashlib
+import numpy as np
+
+def graph_fingerprint(graph) -> str:
+    """Tablonun geçerliliğini belirleyen graf girdilerinin özeti: düğümler, koordinatlar, teslimat ağırlık/öncelikleri,
+    uçuş yasağı bölgeleri ve komşuluk modu (mode/k/radius)."""
+    digest = hashlib.sha256()
+    digest.update(repr((graph.nodes, graph.mode, graph.k, graph.radius)).encode())
+    digest.update(np.ascontiguousarray(graph.positions, dtype=np.float64).tobytes())
+    store = graph.delivery_store
+    for column in (store.ids, store.weights, store.priorities):
+        digest.update(np.ascontiguousarray(column).tobytes())
+    digest.update(repr([(zone.id, [tuple(map(float, point)) for point in zone.coordinates], tuple(zone.active_time))
+                        for zone in graph.no_fly_zones]).encode())
+    return digest.hexdigest()
+
+class LandmarkTable:
+    """A* için işaret düğümü (ALT) ön hesaplaması.
+
+    Her işaret L için tüm düğümlere ileri (L → u) ve geri (u → L) en ucuz yol maliyetleri saklanır.
+    Üçgen eşitsizliğinden d(u, g) >= max(d(L, g) - d(L, u), d(u, L) - d(g, L)) alt sınırı elde edilir.
+    """
+    def __init__(self, landmarks: np.ndarray, from_landmark: np.ndarray, to_landmark: np.ndarray, nodes: List[str], version: int = 0,
+                 fingerprint: str = ""):
+        self.landmarks = np.asarray(landmarks, dtype=np.int64)
+        self.from_landmark = np.asarray(from_landmark, dtype=np.float64)
+        self.to_landmark = np.asarray(to_landmark, dtype=np.float64)
+        self.nodes = list(nodes)
+        self.version = version
+        self.fingerprint = fingerprint  # graph_fingerprint(graph); kaydedilen tablo yalnızca aynı özetli grafa yüklenir
+
+    @classmethod
+    def build(cls, engine, count: int) -> "LandmarkTable":
+        """Uzaklık-en-uzak (farthest point) seçimiyle `count` işaret düğümü seç ve mesafe dizilerini hesapla."""
+        graph = engine.graph
+        weight, bonus, _ = engine._arrays()
+        alive = graph.alive
+        n = len(graph.nodes)
+        blocked = np.zeros(n, dtype=bool)
+        zeros = np.zeros(n)
+        landmarks, forward, backward = [], [], []
+        # İlk işaret: ilk canlı düğümden en uzak düğüm; sonrakiler seçilenlere en uzak olanlar
+        nearest = np.where(alive, np.inf, -np.inf)
+        first = int(np.flatnonzero(alive)[0]) if alive.any() else None
+        if first is not None:
+            g, _, _ = engine._search(first, zeros, alive, weight, bonus, blocked, None)
+            nearest = np.where(alive & np.isfinite(g), g, -np.inf)
+        for _ in range(min(count, int(alive.sum()))):
+            landmark = int(np.argmax(nearest))
+            g_from, _, _ = engine._search(landmark, zeros, alive, weight, bonus, blocked, None)
+            g_to, _, _ = engine._search(landmark, zeros, alive, weight, bonus, blocked, None, reverse=True)
+            landmarks.append(landmark)
+            forward.append(g_from)
+            backward.append(g_to)
+            nearest = np.minimum(nearest, np.where(alive, g_from, -np.inf))
+            nearest[landmark] = -np.inf
+        shape = (len(landmarks), n)
+        return cls(np.array(landmarks, dtype=np.int64), np.array(forward).reshape(shape), np.array(backward).reshape(shape),
+                   graph.nodes, graph.version, graph_fingerprint(graph))
+
+    def lower_bound(self, goal: int) -> np.ndarray:
+        """Her düğümden goal'a kalan maliyet için işaret düğümü alt sınırı."""
+        if len(self.landmarks) == 0:
+            return np.zeros(len(self.nodes))
+        with np.errstate(invalid="ignore"):
+            ahead = self.from_landmark[:, goal, None] - self.from_landmark
+            behind = self.to_landmark - self.to_landmark[:, goal, None]
+            bound = np.fmax(ahead, behind).max(axis=0)
+        bound = np.where(np.isfinite(bound) & (bound > 0), bound, 0.0)
+        bound[goal] = 0.0
+        return bound
+
+    def save(self, path: str):
+        """Tabloyu .npz dosyasına kaydet."""
+        np.savez(path, landmarks=self.landmarks, from_landmark=self.from_landmark, to_landmark=self.to_landmark,
+                 nodes=np.array(["" if node is None else node for node in self.nodes]), fingerprint=np.array(self.fingerprint))
+
+    @classmethod
+    def load(cls, path: str, graph) -> "LandmarkTable":
+        """Kaydedilmiş tabloyu yükle; düğümleri ya da graf özeti (graph_fingerprint) grafla aynı değilse ValueError."""
+        with np.load(path) as data:
+            nodes = [node or None for node in data["nodes"].tolist()]
+            fingerprint = str(data["fingerprint"]) if "fingerprint" in data.files else ""
+            if nodes != graph.nodes or fingerprint != graph_fingerprint(graph):
+                raise ValueError("İşaret düğümü tablosu bu grafa ait değil")
+            return cls(data["landmarks"], data["from_landmark"], data["to_landmark"], nodes, graph.version, fingerprint)
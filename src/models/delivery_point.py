@@ -1,7 +1,10 @@
 from typing import List, Tuple
+import copy
 import heapq
 
 class DeliveryPoint:
+    __slots__ = ("id", "pos", "weight", "priority", "time_window")
+
     def __init__(self, id: int, pos: tuple, weight: float, priority: int, time_window: tuple):
         self.id = id
         self.pos = pos
@@ -9,8 +12,16 @@ class DeliveryPoint:
         self.priority = priority
         self.time_window = time_window
 
+    def __copy__(self) -> "DeliveryPoint":
+        """Bağımsız kopya: kopyadaki değişiklik aslını etkilemez."""
+        return DeliveryPoint(self.id, self.pos, self.weight, self.priority, self.time_window)
+
+    def __deepcopy__(self, memo: dict) -> "DeliveryPoint":
+        return DeliveryPoint(self.id, copy.deepcopy(self.pos, memo), self.weight, self.priority,
+                             copy.deepcopy(self.time_window, memo))
+
 def sort_deliveries_by_priority(deliveries: List[DeliveryPoint]) -> List[DeliveryPoint]:
     """Teslimat noktalarını öncelik sırasına göre sıralar (yüksek öncelik önce)."""
     heap = [(-dp.priority, dp.id, dp) for dp in deliveries]  # Negatif priority ve id ile Min-Heap
     heapq.heapify(heap)
-    return [heapq.heappop(heap)[2] for _ in range(len(heap))]
\ No newline at end of file
+    return [heapq.heappop(heap)[2] for _ in range(len(heap))]
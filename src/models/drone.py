@@ -1,4 +1,8 @@
+import copy
+
 class Drone:
+    __slots__ = ("id", "start_pos", "max_weight", "battery", "speed", "charge_time")
+
     def __init__(self, id: int, start_pos: tuple, max_weight: float, battery: float, speed: float, charge_time: float = 300):
         self.id = id
         self.start_pos = start_pos
@@ -7,6 +11,14 @@ class Drone:
         self.speed = speed
         self.charge_time = charge_time  # Şarj süresi (saniye)
 
+    def __copy__(self) -> "Drone":
+        """Bağımsız kopya: kopyada batarya/konum değişikliği aslını etkilemez."""
+        return Drone(self.id, self.start_pos, self.max_weight, self.battery, self.speed, self.charge_time)
+
+    def __deepcopy__(self, memo: dict) -> "Drone":
+        return Drone(self.id, copy.deepcopy(self.start_pos, memo), self.max_weight, self.battery, self.speed,
+                     self.charge_time)
+
     def consume_battery(self, distance: float):
         """Batarya tüketimini hesapla."""
         consumption = distance * (5 / self.speed)  # Basit bir tüketim modeli
@@ -20,4 +32,4 @@ class Drone:
         if self.battery < 20:  # %20 altında şarj
             self.battery = 100  # Tam şarj
             return self.charge_time
-        return 0
\ No newline at end of file
+        return 0
@@ -1,4 +1,6 @@
 class NoFlyZone:
+    __slots__ = ("id", "coordinates", "active_time")
+
     def __init__(self, id: int, coordinates: list, active_time: tuple):
         self.id = id
         self.coordinates = coordinates
@@ -0,0 +1,65 @@
+from typing import TYPE_CHECKING, Dict, List, Tuple
+import numpy as np
+
+if TYPE_CHECKING:
+    from src.models.drone import Drone
+    from src.models.delivery_point import DeliveryPoint
+
+class ColumnStore:
+    """Model nesnelerinin alanlarının NumPy sütunlarındaki anlık görüntüsü (struct-of-arrays) ve id→indeks haritası.
+
+    Sütunlar kurulum anındaki değerlerin kopyasıdır; nesneler düz alanlarını korur ve depoya bağlanmaz. Nesneler
+    sonradan değişirse depo yeniden kurulmalıdır (ör. view ile).
+    """
+    kind = "nesne"
+    # (sütun adı, nesne alanı, dtype, genişlik): genişlik > 1 olan alanlar (konum, zaman penceresi) N×genişlik olur
+    fields: Tuple[Tuple[str, str, type, int], ...] = ()
+
+    def __init__(self, items: list):
+        self.items = list(items)
+        for column, name, dtype, width in self.fields:
+            values = np.array([getattr(item, name) for item in self.items], dtype=dtype)
+            setattr(self, column, values.reshape(-1, width) if width > 1 else values)
+        self.index: Dict[int, int] = {}
+        for i, item_id in enumerate(self.ids.tolist()):
+            self.index.setdefault(item_id, i)  # Aynı id tekrarlanırsa ilk nesne geçerli
+
+    @classmethod
+    def view(cls, items: list) -> Tuple["ColumnStore", np.ndarray]:
+        """Nesnelerin güncel değerlerinden depo ve satır indeksleri (sütunlar `store.weights[rows]` ile okunur)."""
+        store = cls(items)
+        return store, np.arange(len(store), dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def index_of(self, item_id: int) -> int:
+        """Id'nin sütun indeksini döndür."""
+        index = self.index.get(item_id)
+        if index is None:
+            raise ValueError(f"Geçersiz {self.kind}: {item_id}")
+        return index
+
+    def get(self, item_id: int):
+        """Id'si verilen nesne (yoksa None), O(1)."""
+        index = self.index.get(item_id)
+        return None if index is None else self.items[index]
+
+class DroneStore(ColumnStore):
+    """Drone filosunun sütunları: ids, positions, max_weight, battery, speed, charge_time."""
+    kind = "drone"
+    fields = (("ids", "id", np.int64, 1), ("positions", "start_pos", np.float64, 2),
+              ("max_weight", "max_weight", np.float64, 1), ("battery", "battery", np.float64, 1),
+              ("speed", "speed", np.float64, 1), ("charge_time", "charge_time", np.float64, 1))
+
+    def __init__(self, drones: List["Drone"]):
+        super().__init__(drones)
+
+class DeliveryStore(ColumnStore):
+    """Teslimat noktalarının sütunları: ids, positions, weights, priorities, time_windows."""
+    kind = "teslimat noktası"
+    fields = (("ids", "id", np.int64, 1), ("positions", "pos", np.float64, 2), ("weights", "weight", np.float64, 1),
+              ("priorities", "priority", np.int64, 1), ("time_windows", "time_window", np.float64, 2))
+
+    def __init__(self, delivery_points: List["DeliveryPoint"]):
+        super().__init__(delivery_points)
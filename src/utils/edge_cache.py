@@ -0,0 +1,233 @@
+from bisect import bisect_left
+from typing import Dict, Iterator, List, Optional, Tuple
+import numpy as np
+from src.utils.geometry import pack_polygons
+
+class TimeSlices:
+    """Bölge aktiflik pencerelerini, aktif bölge kümesinin sabit kaldığı zaman dilimlerine böler.
+
+    Tüm başlangıç/bitiş anları sıralı `breakpoints` listesindedir. Bölge kimliği (region):
+    0 = (-inf, b0), 1 = {b0}, 2 = (b0, b1), 3 = {b1}, ... ; kapalı [start, end] aralıkları tam korunur.
+    Aynı aktif bölge kümesine sahip bölgeler tek bir dilimi (slice) paylaşır.
+    """
+    def __init__(self, no_fly_zones: list):
+        self.zones = list(no_fly_zones)
+        points = sorted({float(t) for zone in self.zones for t in zone.active_time})
+        self.breakpoints: List[float] = points
+
+        representatives = []
+        if points:
+            representatives.append(points[0] - 1.0)
+            for i, point in enumerate(points):
+                representatives.append(point)
+                nxt = points[i + 1] if i + 1 < len(points) else point + 2.0
+                representatives.append((point + nxt) / 2.0)
+        else:
+            representatives.append(0.0)
+
+        masks: Dict[bytes, int] = {}
+        slice_masks = []
+        self.region_slice = np.empty(len(representatives), dtype=np.int64)
+        for region, t in enumerate(representatives):
+            mask = np.array([zone.is_active(t) for zone in self.zones], dtype=bool)
+            key = mask.tobytes()
+            if key not in masks:
+                masks[key] = len(slice_masks)
+                slice_masks.append(mask)
+            self.region_slice[region] = masks[key]
+        # Zaman verilmeyen sorgular için tüm bölgelerin aktif olduğu statik dilim
+        all_key = np.ones(len(self.zones), dtype=bool).tobytes()
+        if all_key not in masks:
+            masks[all_key] = len(slice_masks)
+            slice_masks.append(np.ones(len(self.zones), dtype=bool))
+        self.static_slice = masks[all_key]
+        self.slice_masks = np.array(slice_masks, dtype=bool).reshape(len(slice_masks), len(self.zones))
+
+    def region_of(self, current_time: float) -> int:
+        """Zamanın düştüğü bölge kimliği (ikili arama)."""
+        i = bisect_left(self.breakpoints, current_time)
+        if i < len(self.breakpoints) and self.breakpoints[i] == current_time:
+            return 2 * i + 1
+        return 2 * i
+
+    def slice_of(self, current_time: Optional[float]) -> int:
+        """Zamana karşılık gelen dilim; None verilirse statik (tüm bölgeler aktif) dilim."""
+        if current_time is None:
+            return self.static_slice
+        return int(self.region_slice[self.region_of(current_time)])
+
+    def slices_of(self, times: np.ndarray) -> np.ndarray:
+        """Zaman dizisi için dilim kimlikleri (vektörel)."""
+        times = np.asarray(times, dtype=np.float64)
+        bp = np.asarray(self.breakpoints, dtype=np.float64)
+        i = np.searchsorted(bp, times, side="left")
+        exact = (i < len(bp)) & (bp[np.minimum(i, len(bp) - 1)] == times) if len(bp) else np.zeros(len(times), dtype=bool)
+        return self.region_slice[2 * i + exact]
+
+class EdgeBlockCache:
+    """Graf kenarları için zaman dilimli engellenme önbelleği.
+
+    Her (kenar, bölge) kesişimi kesişim çekirdeğiyle bir kez hesaplanır. Her zaman dilimi için
+    engellenen kenarların bit kümesi ilk ihtiyaçta bir kez kurulur; "(u, v) kenarı t anında engelli mi"
+    sorgusu bir ikili arama ve tek bir bit okumasıdır.
+
+    Graf artımlı güncellendiğinde yalnızca değişen düğümün kenarları (update_node; knn modunda değişen kenarlar,
+    update_edges) ya da eklenen/silinen bölge (add_zone/remove_zone) yeniden hesaplanır; yoğun grafta önbellekteki
+    bit kümeleri yerinde yamanır.
+    """
+    def __init__(self, graph, max_pairs: int = 1 << 20):
+        self.graph = graph
+        self.max_pairs = max_pairs
+        self.slices = TimeSlices(graph.zone_index.zones)
+        self._slice_bits: Dict[int, np.ndarray] = {}
+        hit_u, hit_v, hit_zone = [], [], []
+        for u, v in self._pair_chunks():
+            hits = graph.segment_zone_hits(u, v)
+            m, z = np.nonzero(hits)
+            hit_u.append(u[m])
+            hit_v.append(v[m])
+            hit_zone.append(z)
+        # Yalnızca kesişen (u < v, bölge) üçlüleri saklanır
+        self.hit_u = np.concatenate(hit_u) if hit_u else np.empty(0, dtype=np.int64)
+        self.hit_v = np.concatenate(hit_v) if hit_v else np.empty(0, dtype=np.int64)
+        self.hit_zone = np.concatenate(hit_zone) if hit_zone else np.empty(0, dtype=np.int64)
+
+    def _append_hits(self, u: np.ndarray, v: np.ndarray, packed=None, zone_offset: int = 0):
+        """(u, v) çiftlerini bölgelerle kesiştirip bulunan üçlüleri ekle."""
+        if len(u) == 0:
+            return
+        m, z = np.nonzero(self.graph.segment_zone_hits(u, v, packed))
+        self.hit_u = np.concatenate((self.hit_u, u[m]))
+        self.hit_v = np.concatenate((self.hit_v, v[m]))
+        self.hit_zone = np.concatenate((self.hit_zone, z + zone_offset))
+
+    def _keep_hits(self, keep: np.ndarray):
+        self.hit_u, self.hit_v, self.hit_zone = self.hit_u[keep], self.hit_v[keep], self.hit_zone[keep]
+
+    def update_node(self, i: int):
+        """Yoğun grafta i düğümü eklendi/silindi/taşındı: yalnızca ona ait kesişimleri yeniden hesapla."""
+        graph = self.graph
+        self._keep_hits((self.hit_u != i) & (self.hit_v != i))
+        others = np.flatnonzero(graph.alive)
+        others = others[others != i] if graph.nodes[i] is not None else np.empty(0, dtype=np.int64)
+        start = len(self.hit_u)
+        self._append_hits(np.minimum(others, i), np.maximum(others, i))
+        # Önbellekteki bit kümelerinde yalnızca i satırı ve sütunu yenilenir (O(N))
+        u, v, zone = self.hit_u[start:], self.hit_v[start:], self.hit_zone[start:]
+        for slice_id, bits in self._slice_bits.items():
+            bits[i, :] = 0
+            bits[:, i >> 3] &= np.uint8(~(1 << (i & 7)) & 0xFF)
+            active = self.slices.slice_masks[slice_id][zone]
+            j = np.where(u[active] == i, v[active], u[active])
+            np.bitwise_or.at(bits, (i, j >> 3), (1 << (j & 7)).astype(np.uint8))
+            np.bitwise_or.at(bits, (j, i >> 3), np.uint8(1 << (i & 7)))
+
+    def update_edges(self, touched: Dict[int, bool]):
+        """knn modunda değişen (u < v) kenarlar: anahtar u << 32 | v, değer kenarın artık var olup olmadığı.
+
+        Değişen kenarların eski kesişimleri atılır, var olanlarınki (uçlarından biri taşınmış olabilir) yeniden hesaplanır.
+        """
+        if not touched:
+            return
+        keys = np.fromiter(touched.keys(), dtype=np.int64, count=len(touched))
+        self._keep_hits(~np.isin((self.hit_u << 32) | self.hit_v, keys))
+        present = keys[np.fromiter(touched.values(), dtype=bool, count=len(touched))]
+        self._append_hits(present >> 32, present & 0xFFFFFFFF)
+        self._slice_bits.clear()
+
+    def add_zone(self, zi: int):
+        """Yeni eklenen zi bölgesi için yalnızca onun kesişimlerini hesapla."""
+        zone = self.graph.zone_index.zones[zi]
+        packed = pack_polygons([zone.coordinates])
+        for u, v in self._pair_chunks():
+            self._append_hits(u, v, packed, zone_offset=zi)
+        self.refresh_zones()
+
+    def remove_zone(self, zi: int):
+        """zi bölgesinin kesişimlerini at; sonraki bölgelerin indekslerini bir kaydır."""
+        self._keep_hits(self.hit_zone != zi)
+        self.hit_zone = np.where(self.hit_zone > zi, self.hit_zone - 1, self.hit_zone)
+        self.refresh_zones()
+
+    def refresh_zones(self):
+        """Bölge kümesi değişti: zaman dilimlerini yeniden kur, bit kümelerini boşalt."""
+        self.slices = TimeSlices(self.graph.zone_index.zones)
+        self._slice_bits.clear()
+
+    def on_capacity_change(self):
+        """Graf yuva kapasitesi büyüdü: yoğun bit kümeleri yeni boyutta yeniden kurulacak."""
+        self._slice_bits.clear()
+
+    def _pair_chunks(self) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """Önbelleğin kapsadığı (u < v) kenarlarını parçalar halinde üret."""
+        graph = self.graph
+        n = len(graph.nodes)
+        if graph.indptr is not None:
+            rows = np.repeat(np.arange(n), np.diff(graph.indptr))
+            upper = rows < graph.indices
+            u, v = rows[upper], graph.indices[upper]
+            for start in range(0, len(u), self.max_pairs):
+                yield u[start:start + self.max_pairs], v[start:start + self.max_pairs]
+            return
+        r0 = 0
+        while r0 < n:
+            r1, total = r0, 0
+            while r1 < n and (total == 0 or total + (n - 1 - r1) <= self.max_pairs):
+                total += n - 1 - r1
+                r1 += 1
+            counts = n - 1 - np.arange(r0, r1)
+            u = np.repeat(np.arange(r0, r1), counts)
+            v = u + 1 + np.arange(len(u)) - np.repeat(np.cumsum(counts) - counts, counts)
+            yield u, v
+            r0 = r1
+
+    def _edge_keys(self) -> np.ndarray:
+        """knn modunda CSR konumlarının sıralı u * n + v anahtarları."""
+        graph = self.graph
+        n = len(graph.nodes)
+        rows = np.repeat(np.arange(n), np.diff(graph.indptr))
+        return rows * n + graph.indices
+
+    def slice_bits(self, slice_id: int) -> np.ndarray:
+        """Dilimin engellenen-kenar bit kümesi (gerekirse bir kez kurulur)."""
+        bits = self._slice_bits.get(slice_id)
+        if bits is not None:
+            return bits
+        graph = self.graph
+        n = len(graph.nodes)
+        active = self.slices.slice_masks[slice_id][self.hit_zone]
+        u, v = self.hit_u[active], self.hit_v[active]
+        if graph.indptr is None:
+            # Yerinde yamanabilmesi için bit kümesi graf kapasitesi boyutunda tutulur
+            blocked = np.zeros((graph.capacity, graph.capacity), dtype=bool)
+            blocked[u, v] = True
+            blocked[v, u] = True
+            bits = np.packbits(blocked, axis=1, bitorder="little")
+        else:
+            keys = self._edge_keys()
+            blocked = np.zeros(len(keys), dtype=bool)
+            blocked[np.searchsorted(keys, u * n + v)] = True
+            blocked[np.searchsorted(keys, v * n + u)] = True
+            bits = np.packbits(blocked, bitorder="little")
+        self._slice_bits[slice_id] = bits
+        return bits
+
+    def is_blocked(self, u: int, v: int, current_time: Optional[float] = None) -> bool:
+        """(u, v) kenarının verilen anda aktif bir bölge tarafından engellenip engellenmediği."""
+        bits = self.slice_bits(self.slices.slice_of(current_time))
+        graph = self.graph
+        if graph.indptr is None:
+            return bool((bits[u, v >> 3] >> (v & 7)) & 1)
+        start, end = graph.indptr[u], graph.indptr[u + 1]
+        pos = start + int(np.searchsorted(graph.indices[start:end], v))
+        if pos >= end or graph.indices[pos] != v:
+            # Graf kenarı olmayan çiftler için doğrudan geometri
+            return graph.is_in_no_fly_zone(graph._node_positions[u], graph._node_positions[v], current_time)
+        return bool((bits[pos >> 3] >> (pos & 7)) & 1)
+
+    def blocked_row(self, u: int, current_time: Optional[float] = None) -> np.ndarray:
+        """Yoğun graf için u düğümünden tüm düğümlere engellenme vektörü."""
+        if self.graph.indptr is not None:
+            raise ValueError("blocked_row yalnızca yoğun (dense) graf için kullanılabilir")
+        bits = self.slice_bits(self.slices.slice_of(current_time))
+        return np.unpackbits(bits[u], bitorder="little", count=len(self.graph.nodes)).astype(bool)
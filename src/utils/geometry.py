@@ -0,0 +1,134 @@
+from typing import List, NamedTuple, Sequence, Tuple
+import numpy as np
+
+class PackedPolygons(NamedTuple):
+    """Çokgen kenarlarının tek dizide paketlenmiş hali.
+
+    edges: (E, 4) dizisi [x1, y1, x2, y2]; aynı bölgenin kenarları ardışıktır.
+    edge_start / edge_count: bölge z'nin kenarları edges[edge_start[z]:edge_start[z] + edge_count[z]].
+    bboxes: (Z, 4) dizisi [min_x, min_y, max_x, max_y].
+    """
+    edges: np.ndarray
+    edge_start: np.ndarray
+    edge_count: np.ndarray
+    bboxes: np.ndarray
+
+def pack_polygons(polygons: Sequence[Sequence[Tuple[float, float]]]) -> PackedPolygons:
+    """Çokgen köşe listelerini toplu kesişim çekirdeği için paketle."""
+    edge_blocks, counts, bboxes = [], [], []
+    for polygon in polygons:
+        coords = np.asarray(polygon, dtype=np.float64).reshape(-1, 2)
+        edge_blocks.append(np.hstack((coords, np.roll(coords, -1, axis=0))))
+        counts.append(len(coords))
+        if len(coords):
+            bboxes.append([coords[:, 0].min(), coords[:, 1].min(), coords[:, 0].max(), coords[:, 1].max()])
+        else:
+            bboxes.append([np.inf, np.inf, -np.inf, -np.inf])
+    edge_count = np.array(counts, dtype=np.int64)
+    edge_start = np.concatenate(([0], np.cumsum(edge_count)[:-1])).astype(np.int64) if counts else np.empty(0, dtype=np.int64)
+    edges = np.vstack(edge_blocks) if edge_blocks else np.empty((0, 4))
+    return PackedPolygons(edges, edge_start, edge_count, np.array(bboxes, dtype=np.float64).reshape(-1, 4))
+
+def _orientation(ax, ay, bx, by, cx, cy):
+    """(a, b, c) üçlüsünün yönelimi: >0 saat yönü tersi, <0 saat yönü, 0 doğrusal."""
+    return np.sign((bx - ax) * (cy - ay) - (by - ay) * (cx - ax))
+
+def _segments_cross(seg: np.ndarray, edge: np.ndarray) -> np.ndarray:
+    """Doğru parçası çiftlerinin kesişip kesişmediği (uç noktada değme ve doğrusal çakışma dahil)."""
+    px1, py1, px2, py2 = seg[:, 0], seg[:, 1], seg[:, 2], seg[:, 3]
+    qx1, qy1, qx2, qy2 = edge[:, 0], edge[:, 1], edge[:, 2], edge[:, 3]
+    o1 = _orientation(px1, py1, px2, py2, qx1, qy1)
+    o2 = _orientation(px1, py1, px2, py2, qx2, qy2)
+    o3 = _orientation(qx1, qy1, qx2, qy2, px1, py1)
+    o4 = _orientation(qx1, qy1, qx2, qy2, px2, py2)
+    # Doğrusal durumda yönelimler sıfırdır; o zaman kutuların çakışması belirleyicidir
+    boxes = ((np.maximum(px1, px2) >= np.minimum(qx1, qx2)) & (np.maximum(qx1, qx2) >= np.minimum(px1, px2)) &
+             (np.maximum(py1, py2) >= np.minimum(qy1, qy2)) & (np.maximum(qy1, qy2) >= np.minimum(py1, py2)))
+    return (o1 * o2 <= 0) & (o3 * o4 <= 0) & boxes
+
+def _ray_crossings(px: np.ndarray, py: np.ndarray, edge: np.ndarray) -> np.ndarray:
+    """Noktadan +x yönünde atılan ışının kenarı kesip kesmediği (çift-tek kuralı için)."""
+    ex1, ey1, ex2, ey2 = edge[:, 0], edge[:, 1], edge[:, 2], edge[:, 3]
+    straddles = (ey1 > py) != (ey2 > py)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        x_at = ex1 + (py - ey1) * (ex2 - ex1) / (ey2 - ey1)
+    return straddles & (px < x_at)
+
+def segments_intersect_polygons(segments: np.ndarray, packed: PackedPolygons, max_pairs: int = 1 << 20) -> np.ndarray:
+    """M doğru parçası için M×Z kesişim matrisi döndürür.
+
+    Bir parça, bir çokgenin herhangi bir kenarını kesiyor/değiyorsa ya da tamamen çokgenin içindeyse
+    o bölgeye çarpar. Önce kutu (bbox) elemesi yapılır; kesin yönelim testleri yalnızca aday
+    (parça, bölge) çiftlerinin kenarlarında, `max_pairs` kenar testlik parçalar halinde çalışır.
+    """
+    segments = np.asarray(segments, dtype=np.float64).reshape(-1, 4)
+    num_segments, num_zones = len(segments), len(packed.bboxes)
+    hits = np.zeros((num_segments, num_zones), dtype=bool)
+    if num_segments == 0 or num_zones == 0:
+        return hits
+
+    b = packed.bboxes
+    seg_min_x = np.minimum(segments[:, 0], segments[:, 2])
+    seg_max_x = np.maximum(segments[:, 0], segments[:, 2])
+    seg_min_y = np.minimum(segments[:, 1], segments[:, 3])
+    seg_max_y = np.maximum(segments[:, 1], segments[:, 3])
+    mean_edges = max(1, int(packed.edge_count.mean()))
+    rows_per_chunk = max(1, max_pairs // (num_zones * mean_edges))
+
+    for start in range(0, num_segments, rows_per_chunk):
+        stop = min(start + rows_per_chunk, num_segments)
+        overlap = ((seg_min_x[start:stop, None] <= b[None, :, 2]) & (seg_max_x[start:stop, None] >= b[None, :, 0]) &
+                   (seg_min_y[start:stop, None] <= b[None, :, 3]) & (seg_max_y[start:stop, None] >= b[None, :, 1]))
+        cand_m, cand_z = np.nonzero(overlap)
+        cand_m = cand_m + start
+        # Kutunun dört köşesi de parçanın taşıyıcı doğrusunun aynı tarafındaysa kesişim olamaz
+        sx, sy = segments[cand_m, 0], segments[cand_m, 1]
+        dx, dy = segments[cand_m, 2] - sx, segments[cand_m, 3] - sy
+        side_pos = np.zeros(len(cand_m), dtype=bool)
+        side_neg = np.zeros(len(cand_m), dtype=bool)
+        for cx, cy in ((0, 1), (2, 1), (2, 3), (0, 3)):
+            side = dx * (b[cand_z, cy] - sy) - dy * (b[cand_z, cx] - sx)
+            side_pos |= side >= 0
+            side_neg |= side <= 0
+        straddle = side_pos & side_neg
+        cand_m, cand_z = cand_m[straddle], cand_z[straddle]
+        if len(cand_m) == 0:
+            continue
+
+        # Aday çiftleri kenarlara aç: (çift, kenar) düzleştirilmiş listesi
+        counts = packed.edge_count[cand_z]
+        pair_id = np.repeat(np.arange(len(cand_m)), counts)
+        offsets = np.arange(len(pair_id)) - np.repeat(np.cumsum(counts) - counts, counts)
+        edge = packed.edges[np.repeat(packed.edge_start[cand_z], counts) + offsets]
+        seg = segments[cand_m[pair_id]]
+
+        crossing = np.bincount(pair_id, weights=_segments_cross(seg, edge), minlength=len(cand_m)) > 0
+        # Hiçbir kenarı kesmeyen parça ya tamamen içeride ya da tamamen dışarıdadır: bir uç noktayı test et
+        ray = np.bincount(pair_id, weights=_ray_crossings(seg[:, 0], seg[:, 1], edge), minlength=len(cand_m))
+        inside = (ray.astype(np.int64) % 2) == 1
+        hits[cand_m, cand_z] = crossing | inside
+    return hits
+
+def _sign(value: float) -> int:
+    return 1 if value > 0 else (-1 if value < 0 else 0)
+
+def segment_intersects_polygon(pos1: Tuple[float, float], pos2: Tuple[float, float], polygon: List[Tuple[float, float]]) -> bool:
+    """Tek bir doğru parçası ve çokgen için kesin kesişim testi (toplu çekirdekle aynı kurallar)."""
+    x1, y1 = pos1
+    x2, y2 = pos2
+    inside = False
+    for i in range(len(polygon)):
+        x3, y3 = polygon[i]
+        x4, y4 = polygon[(i + 1) % len(polygon)]
+        o1 = _sign((x2 - x1) * (y3 - y1) - (y2 - y1) * (x3 - x1))
+        o2 = _sign((x2 - x1) * (y4 - y1) - (y2 - y1) * (x4 - x1))
+        o3 = _sign((x4 - x3) * (y1 - y3) - (y4 - y3) * (x1 - x3))
+        o4 = _sign((x4 - x3) * (y2 - y3) - (y4 - y3) * (x2 - x3))
+        if (o1 * o2 <= 0 and o3 * o4 <= 0 and
+            max(x1, x2) >= min(x3, x4) and max(x3, x4) >= min(x1, x2) and
+            max(y1, y2) >= min(y3, y4) and max(y3, y4) >= min(y1, y2)):
+            return True
+        # Çift-tek kuralı: parçanın ilk ucundan +x yönüne ışın
+        if (y3 > y1) != (y4 > y1) and x1 < x3 + (y1 - y3) * (x4 - x3) / (y4 - y3):
+            inside = not inside
+    return inside
@@ -1,61 +1,688 @@
-from typing import List, Tuple, Dict
+from collections.abc import Mapping
+from typing import List, Tuple, Dict, Optional
+import numpy as np
 from src.models.drone import Drone
 from src.models.delivery_point import DeliveryPoint
 from src.models.no_fly_zone import NoFlyZone
+from src.models.store import DeliveryStore, DroneStore
+from src.utils.spatial_index import GridIndex, ZoneIndex
+from src.utils.geometry import segment_intersects_polygon, segments_intersect_polygons
+from src.utils.edge_cache import EdgeBlockCache
+from src.utils.visibility import DetourTable
+
+class _NeighborView(Mapping):
+    """Bir düğümün komşularını {komşu: mesafe} sözlüğü gibi gösteren salt okunur görünüm."""
+    def __init__(self, graph: "Graph", index: int):
+        self._graph = graph
+        self._index = index
+
+    def __getitem__(self, node: str) -> float:
+        j = self._graph.node_index.get(node)
+        if j is None or not self._graph.has_edge(self._index, j):
+            raise KeyError(node)
+        return self._graph.distance(self._index, j)
+
+    def __iter__(self):
+        for j in self._graph.neighbor_indices(self._index):
+            yield self._graph.nodes[j]
+
+    def __len__(self) -> int:
+        return len(self._graph.neighbor_indices(self._index))
+
+class _EdgeView(Mapping):
+    """Eski dict-of-dicts `edges` arayüzünü mesafe matrisi üzerinde taklit eder."""
+    def __init__(self, graph: "Graph"):
+        self._graph = graph
+
+    def __getitem__(self, node: str) -> _NeighborView:
+        index = self._graph.node_index.get(node)
+        if index is None:
+            raise KeyError(node)
+        return _NeighborView(self._graph, index)
+
+    def __iter__(self):
+        return (node for node in self._graph.nodes if node is not None)
+
+    def __len__(self) -> int:
+        return len(self._graph.node_index)
 
 class Graph:
-    def __init__(self, drones: List[Drone], delivery_points: List[DeliveryPoint], no_fly_zones: List[NoFlyZone]):
-        self.drones = drones
-        self.delivery_points = delivery_points  # Hata ayıklaması için kontrol
-        self.no_fly_zones = no_fly_zones
-        self.edges = {}
+    """Drone ve teslimat düğümlerinden oluşan graf.
+
+    mode="dense": her düğüm diğer tüm düğümlere bağlı, N×N mesafe matrisi tutulur.
+    mode="knn": her düğüm en fazla k en yakın komşusuna (ve/veya `radius` içindekilere) bağlanır;
+    komşular ızgara indeksinden bulunur, kenarlar CSR dizilerinde saklanır ve graf bağlı olacak şekilde tamamlanır.
+
+    Graf artımlı güncellenebilir (add_delivery_point, remove_delivery_point, add_drone, remove_drone, update_drone_position,
+    add_no_fly_zone, remove_no_fly_zone): yalnızca etkilenen satır/sütunlar ve türetilmiş önbellekler güncellenir.
+    Silinen düğümün yuvası boş kalır (nodes[i] None) ve sonraki eklemede yeniden kullanılır; diğer indeksler değişmez.
+    knn modunda bir güncelleme, komşu topu değişen noktayı içeren düğümleri yeniden bağlar ve yalnızca değişen CSR
+    satırlarını yerinde değiştirir: komşu kümeleri sıfırdan kurulan grafla aynıdır. Bağlılığı korumak için eklenen
+    kenarlar yerel olarak seçilir; k-en yakın komşu grafı kendiliğinden bağlı değilse bunlar sıfırdan kurulumdakilerden
+    farklı olabilir.
+    """
+    def __init__(self, drones: List[Drone], delivery_points: List[DeliveryPoint], no_fly_zones: List[NoFlyZone],
+                 dtype=np.float64, mode: str = "dense", k: Optional[int] = None, radius: Optional[float] = None):
+        if mode not in ("dense", "knn"):
+            raise ValueError(f"Geçersiz graf modu: {mode}")
+        if mode == "knn" and k is None and radius is None:
+            raise ValueError("knn modu için k veya radius verilmelidir")
+        self.drones = list(drones)
+        self.delivery_points = list(delivery_points)  # Hata ayıklaması için kontrol
+        self.no_fly_zones = list(no_fly_zones)
+        self.dtype = np.dtype(dtype)
+        self.mode = mode
+        self.k = k
+        self.radius = radius
+        self.nodes: List[str] = []
+        self.node_index: Dict[str, int] = {}
+        self.positions = np.empty((0, 2), dtype=self.dtype)
+        self.distance_matrix: Optional[np.ndarray] = None
+        # knn modunda komşuluk (CSR): indices[indptr[i]:indptr[i+1]] düğüm i'nin komşuları
+        self.indptr: Optional[np.ndarray] = None
+        self.indices: Optional[np.ndarray] = None
+        self.weights: Optional[np.ndarray] = None
+        # knn modunda düğüm başına kurulum kuralının komşu kümesi ve erimi, bağlılık için eklenen (u < v) kenarlar
+        # ve son önbellek güncellemesinden beri değişen kenarlar (u << 32 | v → kenar var mı)
+        self._knn_out: List[set] = []
+        self._knn_reach = np.empty(0)
+        self._bridges: set = set()
+        self._touched_edges: Dict[int, bool] = {}
+        self.edges = _EdgeView(self)
+        self.zone_index = ZoneIndex(self.no_fly_zones)
+        self._edge_cache = None
+        self._detour_tables: Dict[int, DetourTable] = {}
+        self._grid: Optional[GridIndex] = None
+        self._free_slots: List[int] = []
+        self._stores: Dict[str, Tuple[int, object]] = {}
+        # A* işaret düğümü (ALT) ön hesaplaması; AStar kurar, graf değişince geçersizleşir
+        self.landmarks = None
+        # Her artımlı değişiklikte artar; graf türevli önbellekler geçerliliklerini buna göre denetler
+        self.version = 0
         #print(f"Graph initialized with {len(delivery_points)} delivery points: {[dp.id for dp in delivery_points]}")  # Hata ayıklaması
         self._build_graph()
 
     def _build_graph(self):
-        """Grafı oluştur: düğümler (dronelar ve teslimat noktaları) ve kenarları (mesafeler)."""
-        nodes = [f"drone_{drone.id}" for drone in self.drones] + [f"dp_{dp.id}" for dp in self.delivery_points]
-        #print(f"Generated nodes: {nodes}")  # Hata ayıklaması
-        for node1 in nodes:
-            self.edges[node1] = {}
-            for node2 in nodes:
-                if node1 != node2:
-                    pos1 = self.get_node_position(node1)
-                    pos2 = self.get_node_position(node2)
-                    distance = ((pos1[0] - pos2[0]) ** 2 + (pos1[1] - pos2[1]) ** 2) ** 0.5
-                    self.edges[node1][node2] = distance
+        """Grafı oluştur: düğümler (dronelar ve teslimat noktaları) ve tek bir yayınla (broadcast) mesafe matrisi."""
+        # Düğüm sırası: önce dronelar (0..D-1), sonra teslimat noktaları (D..D+P-1)
+        self.nodes = [f"drone_{drone.id}" for drone in self.drones] + [f"dp_{dp.id}" for dp in self.delivery_points]
+        self._node_positions = [drone.start_pos for drone in self.drones] + [dp.pos for dp in self.delivery_points]
+        self.node_index = {}
+        for i, node in enumerate(self.nodes):
+            self.node_index.setdefault(node, i)  # Aynı id tekrarlanırsa ilk düğüm geçerli
+        n = len(self.nodes)
+
+        # Artımlı eklemeler için kapasiteli tamponlar; dışarıya ilk n yuvalık görünümler verilir
+        capacity = max(n, 16)
+        self._coord_buf = np.full((capacity, 2), np.nan)
+        self._coord_buf[:n] = np.array(self._node_positions, dtype=np.float64).reshape(-1, 2)
+        self._kind_buf = np.zeros(capacity, dtype=np.int8)  # 1 = drone, 2 = teslimat, 0 = boş yuva
+        self._kind_buf[:len(self.drones)] = 1
+        self._kind_buf[len(self.drones):n] = 2
+        if self.mode == "knn":
+            self._set_views(n)
+            self._build_sparse()
+            return
+        self._dist_buf = np.full((capacity, capacity), np.nan, dtype=self.dtype)
+        # Geometri testleri her zaman float64 koordinatlarla yapılır; mesafeler `dtype` ile tutulur
+        x = self._coord_buf[:n, 0].astype(self.dtype)
+        y = self._coord_buf[:n, 1].astype(self.dtype)
+        self._dist_buf[:n, :n] = np.hypot(x[:, None] - x[None, :], y[:, None] - y[None, :])
+        self._set_views(n)
+
+    def _set_views(self, n: int):
+        """Tamponların ilk n yuvasına bakan herkese açık görünümleri yenile."""
+        self.coordinates = self._coord_buf[:n]
+        self.positions = self.coordinates.astype(self.dtype, copy=False)
+        if self.mode == "dense":
+            self.distance_matrix = self._dist_buf[:n, :n]
+
+    @property
+    def capacity(self) -> int:
+        return len(self._coord_buf)
+
+    @property
+    def num_drones(self) -> int:
+        return int(np.count_nonzero(self._kind_buf[:len(self.nodes)] == 1))
+
+    @property
+    def drone_indices(self) -> np.ndarray:
+        return np.flatnonzero(self._kind_buf[:len(self.nodes)] == 1)
+
+    @property
+    def dp_indices(self) -> np.ndarray:
+        return np.flatnonzero(self._kind_buf[:len(self.nodes)] == 2)
+
+    @property
+    def alive(self) -> np.ndarray:
+        """Dolu (silinmemiş) yuvaların maskesi."""
+        return self._kind_buf[:len(self.nodes)] != 0
+
+    @property
+    def drone_store(self) -> DroneStore:
+        """Dronelar için sütunsal depo (graf değiştikçe yeniden kurulur)."""
+        return self._store("drones", DroneStore, self.drones)
+
+    @property
+    def delivery_store(self) -> DeliveryStore:
+        """Teslimat noktaları için sütunsal depo (graf değiştikçe yeniden kurulur)."""
+        return self._store("delivery_points", DeliveryStore, self.delivery_points)
+
+    def _store(self, key: str, factory, items: list):
+        cached = self._stores.get(key)
+        if cached is None or cached[0] != self.version:
+            cached = (self.version, factory(items))
+            self._stores[key] = cached
+        return cached[1]
+
+    def _build_sparse(self):
+        """Her düğümü ızgara indeksinden bulunan en yakın komşularına bağla, ardından bağlılığı garanti et."""
+        n = len(self.nodes)
+        index = GridIndex(self.coordinates)
+        self._grid = index
+        self_mask = np.zeros(n, dtype=bool)
+        self._knn_out = []
+        self._knn_reach = np.empty(n)
+        sources, targets = [], []
+        for i in range(n):
+            self_mask[i] = True
+            nbrs, self._knn_reach[i] = self._knn_query(i, self_mask)
+            self_mask[i] = False
+            self._knn_out.append(set(nbrs.tolist()))
+            sources.append(np.full(len(nbrs), i, dtype=np.int64))
+            targets.append(nbrs)
+
+        src = np.concatenate(sources) if sources else np.empty(0, dtype=np.int64)
+        dst = np.concatenate(targets) if targets else np.empty(0, dtype=np.int64)
+        base = len(src)
+        src, dst = self._connect_components(index, src, dst)
+        self._bridges = {(min(a, b), max(a, b)) for a, b in zip(src[base:].tolist(), dst[base:].tolist())}
+        self._set_csr(src, dst)
+
+    def _connect_components(self, index: "GridIndex", src: np.ndarray, dst: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Bileşenleri, her küçük bileşeni dışarıdaki en yakın düğüme bağlayarak birleştir (Borůvka turları)."""
+        n = len(self.nodes)
+        extra_src, extra_dst = [src], [dst]
+        while True:
+            labels = _component_labels(n, np.concatenate(extra_src), np.concatenate(extra_dst))
+            counts = np.bincount(labels, minlength=n) if n else np.empty(0, dtype=np.int64)
+            if np.count_nonzero(counts) <= 1:
+                break
+            largest = int(np.argmax(counts))
+            for comp in np.flatnonzero(counts):
+                if comp == largest:
+                    continue
+                members = np.flatnonzero(labels == comp)
+                inside = labels == comp
+                best = (np.inf, -1, -1)
+                for i in members:
+                    nbr, dist = index.query_knn(self.positions[i], 1, exclude=inside)
+                    if len(nbr) and dist[0] < best[0]:
+                        best = (dist[0], i, nbr[0])
+                extra_src.append(np.array([best[1]], dtype=np.int64))
+                extra_dst.append(np.array([best[2]], dtype=np.int64))
+        return np.concatenate(extra_src), np.concatenate(extra_dst)
+
+    def _set_csr(self, src: np.ndarray, dst: np.ndarray):
+        """Yönsüz kenar listesinden sıralı CSR komşuluk dizilerini kur."""
+        n = len(self.nodes)
+        keys = np.unique(np.concatenate((src * n + dst, dst * n + src)))
+        rows, cols = keys // n, keys % n
+        self.indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=n), out=self.indptr[1:])
+        self.indices = cols
+        diff = self.coordinates[rows] - self.coordinates[cols]
+        self.weights = np.hypot(diff[:, 0], diff[:, 1]).astype(self.dtype)
+
+    def _csr_edges(self) -> Tuple[np.ndarray, np.ndarray]:
+        """CSR dizilerindeki yönlü kenarları (satır, sütun) olarak döndür."""
+        rows = np.repeat(np.arange(len(self.indptr) - 1), np.diff(self.indptr))
+        return rows, self.indices
+
+    def _knn_query(self, i: int, exclude: np.ndarray) -> Tuple[np.ndarray, float]:
+        """i düğümünün kurulum kuralına (k ve/veya radius) göre komşuları ve erimi.
+
+        Erim, yeni bir noktanın i'nin komşu listesine girebileceği en büyük uzaklıktır (liste doluysa k. komşunun
+        uzaklığı, değilse radius ya da sonsuz).
+        """
+        if self.radius is not None:
+            nbrs, dist = self._grid.query_radius(self.coordinates[i], self.radius, exclude=exclude)
+            if self.k is not None and len(nbrs) >= self.k:
+                return nbrs[:self.k].astype(np.int64), float(dist[self.k - 1])
+            return nbrs.astype(np.int64), float(self.radius)
+        nbrs, dist = self._grid.query_knn(self.coordinates[i], self.k, exclude=exclude)
+        return nbrs.astype(np.int64), float(dist[-1]) if len(nbrs) == self.k else np.inf
+
+    def _adjacent(self, a: int, b: int) -> bool:
+        """Komşu listeleri ve bağlılık kenarlarına göre a-b kenarı olmalı mı."""
+        return b in self._knn_out[a] or a in self._knn_out[b] or (min(a, b), max(a, b)) in self._bridges
+
+    def _relink_sparse(self, i: int, removing: bool):
+        """i düğümü eklendi (removing=False) ya da çıkarılıyor: komşuluğu etkilenen düğümleri yeniden bağla.
+
+        Etkilenenler, k-en yakın (ya da yarıçap) topunun içine i'nin düştüğü düğümlerdir (uzaklık <= erim); yalnızca
+        onların komşu listeleri yeniden sorgulanır ve yalnızca değişen CSR satırları yerinde değiştirilir, O(N + E)
+        kopyalama ile (global sıralama yok). Düşen bir kenarın uçları yakın çevrede başka bir yolla bağlı değilse kenar
+        bağlılık kenarı olarak tutulur; silinen düğümün eski komşuları arasında gerekirse en kısa bağlılık kenarları
+        eklenir, artık gereksiz kalan bağlılık kenarları kaldırılır.
+        """
+        n = len(self.nodes)
+        exclude = ~self.alive
+        exclude[i] = True
+        dist = np.hypot(self.coordinates[:, 0] - self.coordinates[i, 0], self.coordinates[:, 1] - self.coordinates[i, 1])
+        affected = np.flatnonzero(~exclude & (dist <= self._knn_reach[:n])).tolist()
+        former = self.neighbor_indices(i).tolist() if removing else []
+        pairs = set()
+        if removing:
+            pairs.update((min(i, j), max(i, j)) for j in former)
+            self._bridges = {edge for edge in self._bridges if i not in edge}
+            self._knn_out[i] = set()
+            self._knn_reach[i] = -1.0  # Boş yuva hiçbir eklemeden etkilenmez
+        else:
+            nbrs, self._knn_reach[i] = self._knn_query(i, exclude)
+            self._knn_out[i] = set(nbrs.tolist())
+            exclude[i] = False  # Etkilenen düğümlerin sorgularında i aday olmalı
+            pairs.update((min(i, j), max(i, j)) for j in self._knn_out[i])
+        for u in affected:
+            exclude[u] = True
+            nbrs, self._knn_reach[u] = self._knn_query(u, exclude)
+            exclude[u] = False
+            new = set(nbrs.tolist())
+            pairs.update((min(u, j), max(u, j)) for j in new ^ self._knn_out[u])
+            self._knn_out[u] = new
+
+        rows: Dict[int, set] = {}
+
+        def row(v: int) -> set:
+            if v not in rows:
+                rows[v] = set(self.neighbor_indices(v).tolist())
+            return rows[v]
+
+        lost = []
+        for a, b in pairs:
+            present = self._adjacent(a, b)
+            if present != (b in row(a)):
+                (row(a).add if present else row(a).discard)(b)
+                (row(b).add if present else row(b).discard)(a)
+                self._touched_edges[(a << 32) | b] = present
+                if not present and i not in (a, b):
+                    lost.append((a, b))
+        # Düşen kenarın uçları yakın çevrede başka bir yolla bağlı değilse kenar bağlılık kenarı olarak kalır
+        for a, b in lost:
+            if not self._locally_connected(a, b, row):
+                self._add_bridge(a, b, row)
+        if removing and len(former) > 1:
+            self._patch_former(former, row)
+        elif not removing and not row(i) and exclude.sum() < n - 1:
+            # Yarıçap içinde komşu yoksa en yakın düğüme bağlılık kenarı
+            exclude[i] = True
+            nbr, _ = self._grid.query_knn(self.coordinates[i], 1, exclude=exclude)
+            self._add_bridge(i, int(nbr[0]), row)
+        # Değişen satırlara dokunan bağlılık kenarları artık yerel bir yolla telafi ediliyorsa kaldırılır
+        for a, b in [edge for edge in self._bridges if edge[0] in rows or edge[1] in rows]:
+            self._bridges.discard((a, b))
+            if self._adjacent(a, b):
+                continue  # Kenar komşu listelerinden zaten var
+            row(a).discard(b)
+            row(b).discard(a)
+            if self._locally_connected(a, b, row):
+                self._touched_edges[(a << 32) | b] = False
+            else:
+                self._add_bridge(a, b, row)
+        self._splice_csr(rows)
+
+    def _locally_connected(self, a: int, b: int, row) -> bool:
+        """a'dan b'ye güncel kenarlarla, yakın çevrede (sınırlı arama) ulaşılabiliyor mu."""
+        return b in self._local_component(a, row, {b})
+
+    def _local_component(self, a: int, row, targets: set, limit: int = 256) -> set:
+        """a'dan güncel kenarlarla genişlik öncelikli gezilen düğümler; tüm hedefler bulununca ya da `limit` düğümde durur."""
+        seen = {a}
+        frontier = [a]
+        remaining = len(targets - seen)
+        while frontier and remaining and len(seen) < limit:
+            next_frontier = []
+            for v in frontier:
+                for w in row(v):
+                    if w not in seen:
+                        seen.add(w)
+                        next_frontier.append(w)
+                        remaining -= w in targets
+            frontier = next_frontier
+        return seen
+
+    def _add_bridge(self, a: int, b: int, row):
+        """a-b bağlılık kenarını ekle."""
+        a, b = min(a, b), max(a, b)
+        self._bridges.add((a, b))
+        row(a).add(b)
+        row(b).add(a)
+        self._touched_edges[(a << 32) | b] = True
+
+    def _patch_former(self, former: List[int], row):
+        """Silinen düğümün eski komşularını, yakın çevrede başka bir yolla bağlı değillerse en kısa kenarlarla
+        birleştir (Kruskal): düğümden geçen her yol korunur."""
+        parent = list(range(len(former)))
+
+        def find(x):
+            while parent[x] != x:
+                parent[x] = parent[parent[x]]
+                x = parent[x]
+            return x
+
+        pts = self.coordinates[former]
+        dist = np.hypot(pts[:, None, 0] - pts[None, :, 0], pts[:, None, 1] - pts[None, :, 1])
+        position = {v: x for x, v in enumerate(former)}
+        for x, v in enumerate(former):
+            if find(x) == x:
+                for w in self._local_component(v, row, set(former)) & position.keys():
+                    parent[find(position[w])] = find(x)
+        candidates = sorted((dist[x, y], x, y) for x in range(len(former)) for y in range(x + 1, len(former)))
+        for _, x, y in candidates:
+            rx, ry = find(x), find(y)
+            if rx != ry:
+                parent[ry] = rx
+                self._add_bridge(former[x], former[y], row)
+
+    def _splice_csr(self, rows: Dict[int, set]):
+        """Yalnızca verilen satırları yeni komşu kümeleriyle değiştir; diğer satırlar olduğu gibi kopyalanır."""
+        if not rows:
+            return
+        changed = sorted(rows)
+        lengths = np.diff(self.indptr)
+        index_parts, weight_parts = [], []
+        prev = 0
+        for v in changed:
+            index_parts.append(self.indices[self.indptr[prev]:self.indptr[v]])
+            weight_parts.append(self.weights[self.indptr[prev]:self.indptr[v]])
+            cols = np.array(sorted(rows[v]), dtype=np.int64)
+            diff = self.coordinates[cols] - self.coordinates[v]
+            index_parts.append(cols)
+            weight_parts.append(np.hypot(diff[:, 0], diff[:, 1]).astype(self.dtype))
+            lengths[v] = len(cols)
+            prev = v + 1
+        index_parts.append(self.indices[self.indptr[prev]:])
+        weight_parts.append(self.weights[self.indptr[prev]:])
+        self.indptr = np.zeros(len(lengths) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=self.indptr[1:])
+        self.indices = np.concatenate(index_parts)
+        self.weights = np.concatenate(weight_parts)
+
+    def _link_sparse(self, i: int):
+        """Yeni/taşınan i düğümünü komşularına bağla; komşu listesi etkilenen düğümler yeniden bağlanır."""
+        self._relink_sparse(i, removing=False)
+
+    def _unlink_sparse(self, i: int):
+        """i düğümünün kenarlarını kaldır; onu komşu listesinde tutan düğümler yeniden bağlanır, bağlılık korunur."""
+        self._relink_sparse(i, removing=True)
+
+    def index_of(self, node: str) -> int:
+        """Düğüm adının (drone_X / dp_Y) tamsayı indeksini döndür."""
+        index = self.node_index.get(node)
+        if index is None:
+            raise ValueError(f"Geçersiz düğüm: {node}")
+        return index
+
+    def _grow(self):
+        """Yuva kapasitesini ikiye katla (amortize O(1) ekleme)."""
+        old = self.capacity
+        new = old * 2
+        coord_buf = np.full((new, 2), np.nan)
+        coord_buf[:old] = self._coord_buf
+        kind_buf = np.zeros(new, dtype=np.int8)
+        kind_buf[:old] = self._kind_buf
+        self._coord_buf, self._kind_buf = coord_buf, kind_buf
+        if self.mode == "dense":
+            dist_buf = np.full((new, new), np.nan, dtype=self.dtype)
+            dist_buf[:old, :old] = self._dist_buf
+            self._dist_buf = dist_buf
+        if self._edge_cache is not None:
+            self._edge_cache.on_capacity_change()
+
+    def _add_node(self, name: str, pos: Tuple[float, float], kind: int) -> int:
+        """Yeni düğümü boş bir yuvaya (yoksa sona) yerleştir ve yalnızca onun satır/sütununu hesapla."""
+        if name in self.node_index:
+            raise ValueError(f"Düğüm zaten var: {name}")
+        if self._free_slots:
+            i = self._free_slots.pop()
+        else:
+            i = len(self.nodes)
+            if i == self.capacity:
+                self._grow()
+            self.nodes.append(None)
+            self._node_positions.append(None)
+            if self.indptr is not None:
+                self.indptr = np.append(self.indptr, self.indptr[-1])
+                self._knn_out.append(set())
+                self._knn_reach = np.append(self._knn_reach, -1.0)
+            self._set_views(i + 1)
+        self.nodes[i] = name
+        self.node_index[name] = i
+        self._kind_buf[i] = kind
+        self._place(i, pos)
+        return i
+
+    def _place(self, i: int, pos: Tuple[float, float]):
+        """i yuvasını verilen konuma koy; mesafe satırı/sütunu, komşuluk ve önbellekleri güncelle."""
+        self._node_positions[i] = pos
+        self._coord_buf[i] = pos
+        self.positions = self.coordinates.astype(self.dtype, copy=False)
+        n = len(self.nodes)
+        if self.mode == "dense":
+            x, y = self.positions[:, 0], self.positions[:, 1]
+            row = np.hypot(x - x[i], y - y[i])
+            self._dist_buf[i, :n] = row
+            self._dist_buf[:n, i] = row
+        else:
+            self._grid.insert(i, self.coordinates)
+            self._link_sparse(i)
+        self._invalidate(i)
+
+    def _drop_node(self, name: str) -> int:
+        """Düğümü sil: yuvası boşaltılır, diğer düğümlerin indeksleri değişmez."""
+        i = self.index_of(name)
+        if self.mode == "knn":
+            self._unlink_sparse(i)
+            self._grid.remove(i, self.coordinates[i])
+        del self.node_index[name]
+        self.nodes[i] = None
+        self._node_positions[i] = None
+        self._kind_buf[i] = 0
+        self._coord_buf[i] = np.nan
+        self.positions = self.coordinates.astype(self.dtype, copy=False)
+        if self.mode == "dense":
+            self._dist_buf[i, :] = np.nan
+            self._dist_buf[:, i] = np.nan
+        self._free_slots.append(i)
+        self._invalidate(i)
+        return i
+
+    def _invalidate(self, i: Optional[int] = None):
+        """Türetilmiş önbellekleri güncelle: kenar önbelleği yalnızca i satırı için, dolambaç tabloları yeniden kurulur."""
+        if self._edge_cache is not None:
+            if i is None:
+                self._edge_cache.refresh_zones()
+            elif self.indptr is not None:
+                self._edge_cache.update_edges(self._touched_edges)
+            else:
+                self._edge_cache.update_node(i)
+        self._touched_edges = {}
+        self._detour_tables.clear()
+        self.landmarks = None
+        self.version += 1
+
+    def add_delivery_point(self, dp: DeliveryPoint) -> int:
+        """Teslimat noktası ekle; O(N) mesafe güncellemesi. Yeni düğüm indeksini döndürür."""
+        i = self._add_node(f"dp_{dp.id}", dp.pos, 2)
+        self.delivery_points.append(dp)
+        return i
+
+    def remove_delivery_point(self, dp_id: int):
+        """Teslimat noktasını sil."""
+        self._drop_node(f"dp_{dp_id}")
+        self.delivery_points = [dp for dp in self.delivery_points if dp.id != dp_id]
+
+    def add_drone(self, drone: Drone) -> int:
+        """Drone ekle; O(N) mesafe güncellemesi. Yeni düğüm indeksini döndürür."""
+        i = self._add_node(f"drone_{drone.id}", drone.start_pos, 1)
+        self.drones.append(drone)
+        return i
+
+    def remove_drone(self, drone_id: int):
+        """Drone'u sil."""
+        self._drop_node(f"drone_{drone_id}")
+        self.drones = [drone for drone in self.drones if drone.id != drone_id]
+
+    def update_drone_position(self, drone_id: int, pos: Tuple[float, float]):
+        """Drone'un konumunu güncelle; yalnızca onun satırı/sütunu yeniden hesaplanır."""
+        i = self.index_of(f"drone_{drone_id}")
+        if self.mode == "knn":
+            self._unlink_sparse(i)
+            self._grid.remove(i, self.coordinates[i])
+        for drone in self.drones:
+            if drone.id == drone_id:
+                drone.start_pos = pos
+        self._place(i, pos)
+
+    def add_no_fly_zone(self, zone: NoFlyZone):
+        """Uçuş yasağı bölgesi ekle; kenar önbelleğinde yalnızca bu bölgenin kesişimleri hesaplanır."""
+        self.no_fly_zones.append(zone)
+        self.zone_index = ZoneIndex(self.no_fly_zones)
+        if self._edge_cache is not None:
+            self._edge_cache.add_zone(len(self.no_fly_zones) - 1)
+        self._invalidate()
+
+    def remove_no_fly_zone(self, zone_id: int):
+        """Uçuş yasağı bölgesini sil."""
+        positions = [zi for zi, zone in enumerate(self.no_fly_zones) if zone.id == zone_id]
+        if not positions:
+            raise ValueError(f"Geçersiz uçuş yasağı bölgesi: {zone_id}")
+        for zi in reversed(positions):
+            del self.no_fly_zones[zi]
+            if self._edge_cache is not None:
+                self._edge_cache.remove_zone(zi)
+        self.zone_index = ZoneIndex(self.no_fly_zones)
+        self._invalidate()
+
+    def node_name(self, index: int) -> str:
+        """Tamsayı indeksin düğüm adını döndür."""
+        return self.nodes[index]
 
     def get_node_position(self, node: str) -> Tuple[float, float]:
         """Verilen düğümün (drone_X veya dp_Y) koordinatlarını döndür."""
-        if node.startswith("drone_"):
-            drone_id = int(node.split("_")[1])
-            drone = next(d for d in self.drones if d.id == drone_id)
-            return drone.start_pos
-        elif node.startswith("dp_"):
-            dp_id = int(node.split("_")[1])
-            dp = next(dp for dp in self.delivery_points if dp.id == dp_id)
-            return dp.pos
-        raise ValueError(f"Geçersiz düğüm: {node}")
+        return self._node_positions[self.index_of(node)]
 
     def get_neighbors(self, node: str) -> List[str]:
         """Verilen düğümün komşularını döndür."""
-        return list(self.edges[node].keys())
+        return [self.nodes[j] for j in self.neighbor_indices(self.index_of(node))]
+
+    def neighbor_indices(self, index: int) -> np.ndarray:
+        """Verilen indeksteki düğümün komşu indekslerini döndür."""
+        if self.indptr is not None:
+            return self.indices[self.indptr[index]:self.indptr[index + 1]]
+        alive = self.alive
+        alive[index] = False
+        return np.flatnonzero(alive)
+
+    def neighbors_with_distances(self, index: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Komşu indeksleri ve bunlara olan kenar uzunlukları."""
+        if self.indptr is not None:
+            start, end = self.indptr[index], self.indptr[index + 1]
+            return self.indices[start:end], self.weights[start:end]
+        neighbors = self.neighbor_indices(index)
+        return neighbors, self.distance_matrix[index, neighbors]
+
+    def has_edge(self, i: int, j: int) -> bool:
+        """i ve j arasında kenar olup olmadığını döndür."""
+        if i == j or self.nodes[i] is None or self.nodes[j] is None:
+            return False
+        if self.indptr is not None:
+            row = self.indices[self.indptr[i]:self.indptr[i + 1]]
+            pos = np.searchsorted(row, j)
+            return bool(pos < len(row) and row[pos] == j)
+        return True
+
+    def distance(self, i: int, j: int) -> float:
+        """İki düğüm indeksi arasındaki kuş uçuşu mesafe."""
+        if self.distance_matrix is not None:
+            return float(self.distance_matrix[i, j])
+        diff = self.positions[i] - self.positions[j]
+        return float(np.hypot(diff[0], diff[1]))
 
     def _is_line_intersecting_no_fly_zone(self, pos1: Tuple[float, float], pos2: Tuple[float, float], coordinates: List[Tuple[float, float]]) -> bool:
         """İki nokta arasındaki çizginin uçuş yasağı bölgesini kesip kesmediğini kontrol eder."""
-        x1, y1 = pos1
-        x2, y2 = pos2
-        for i in range(len(coordinates)):
-            x3, y3 = coordinates[i]
-            x4, y4 = coordinates[(i + 1) % len(coordinates)]
-            if (max(x1, x2) >= min(x3, x4) and max(x3, x4) >= min(x1, x2) and
-                max(y1, y2) >= min(y3, y4) and max(y3, y4) >= min(y1, y2)):
-                return True
-        return False
+        return segment_intersects_polygon(pos1, pos2, coordinates)
+
+    def segment_zone_hits(self, src: np.ndarray, dst: np.ndarray, packed=None) -> np.ndarray:
+        """Eşleşen (src[m], dst[m]) düğüm çiftleri için M×Z bölge kesişim matrisi (tek çağrıda).
+
+        packed verilmezse grafın tüm bölgeleri kullanılır; boş yuvalar (NaN) hiçbir bölgeye çarpmaz.
+        """
+        src = np.asarray(src, dtype=np.int64)
+        dst = np.asarray(dst, dtype=np.int64)
+        segments = np.hstack((self.coordinates[src], self.coordinates[dst]))
+        return segments_intersect_polygons(segments, self.zone_index.packed if packed is None else packed)
+
+    def blocking_matrix(self, sources: np.ndarray, targets: np.ndarray, current_time: Optional[float] = None) -> np.ndarray:
+        """Kaynak×hedef düğümleri için S×T engellenme matrisi; current_time verilirse yalnızca aktif bölgeler."""
+        sources = np.asarray(sources, dtype=np.int64)
+        targets = np.asarray(targets, dtype=np.int64)
+        hits = self.segment_zone_hits(np.repeat(sources, len(targets)), np.tile(targets, len(sources)))
+        if current_time is not None:
+            active = np.array([zone.is_active(current_time) for zone in self.zone_index.zones], dtype=bool)
+            hits = hits[:, active]
+        return hits.any(axis=1).reshape(len(sources), len(targets))
 
-    def is_in_no_fly_zone(self, pos1: Tuple[float, float], pos2: Tuple[float, float]) -> bool:
-        """İki nokta arasındaki yolun uçuş yasağı bölgesine girip girmediğini kontrol eder."""
-        for no_fly_zone in self.no_fly_zones:
+    @property
+    def edge_cache(self) -> EdgeBlockCache:
+        """Zaman dilimli kenar engellenme önbelleği (ilk kullanımda bir kez kurulur)."""
+        if self._edge_cache is None:
+            self._edge_cache = EdgeBlockCache(self)
+        return self._edge_cache
+
+    def is_edge_blocked(self, i: int, j: int, current_time: Optional[float] = None) -> bool:
+        """i-j kenarının verilen anda aktif bir uçuş yasağı bölgesinden geçip geçmediği (önbellekten)."""
+        if i == j:
+            return False
+        return self.edge_cache.is_blocked(i, j, current_time)
+
+    def detour_table(self, current_time: Optional[float] = None, workers: int = 1) -> DetourTable:
+        """Verilen andaki aktif bölgeler için engelden kaçınan mesafe tablosu (zaman dilimi başına bir kez)."""
+        slice_id = self.edge_cache.slices.slice_of(current_time)
+        table = self._detour_tables.get(slice_id)
+        if table is None:
+            table = DetourTable(self, current_time, workers=workers)
+            self._detour_tables[slice_id] = table
+        return table
+
+    def flight_distance(self, i: int, j: int, current_time: Optional[float] = None) -> float:
+        """i'den j'ye aktif bölgelerin etrafından dolaşarak uçulacak gerçek mesafe (O(1) okuma)."""
+        return self.detour_table(current_time).distance(i, j)
+
+    def is_in_no_fly_zone(self, pos1: Tuple[float, float], pos2: Tuple[float, float], current_time: Optional[float] = None) -> bool:
+        """İki nokta arasındaki yolun uçuş yasağı bölgesine girip girmediğini kontrol eder.
+
+        Yalnızca bölge indeksinin döndürdüğü aday bölgeler test edilir; current_time verilirse pasif bölgeler atlanır.
+        """
+        for no_fly_zone in self.zone_index.candidate_zones(pos1, pos2, current_time):
             if self._is_line_intersecting_no_fly_zone(pos1, pos2, no_fly_zone.coordinates):
                 return True
-        return False
\ No newline at end of file
+        return False
+
+def _component_labels(n: int, src: np.ndarray, dst: np.ndarray) -> np.ndarray:
+    """Birleşim-bul (union-find) ile her düğümün bağlı bileşen etiketini döndür."""
+    parent = np.arange(n)
+
+    def find(x):
+        root = x
+        while parent[root] != root:
+            root = parent[root]
+        while parent[x] != root:
+            parent[x], x = root, parent[x]
+        return root
+
+    for a, b in zip(src.tolist(), dst.tolist()):
+        ra, rb = find(a), find(b)
+        if ra != rb:
+            parent[max(ra, rb)] = min(ra, rb)
+    return np.array([find(x) for x in range(n)], dtype=np.int64)
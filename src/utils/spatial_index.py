@@ -0,0 +1,212 @@
+from typing import Dict, List, Optional, Tuple
+import math
+import numpy as np
+from src.utils.geometry import PackedPolygons, pack_polygons
+
+class GridIndex:
+    """Noktalar için düzgün ızgara (uniform grid) uzamsal indeksi: k-en yakın komşu ve yarıçap sorguları."""
+    def __init__(self, points: np.ndarray, cell_size: Optional[float] = None):
+        self.points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        n = len(self.points)
+        self.cells: Dict[Tuple[int, int], np.ndarray] = {}
+        valid = ~np.isnan(self.points).any(axis=1)
+        if not valid.any():
+            self.origin = np.zeros(2)
+            self.cell_size = 1.0 if cell_size is None else float(cell_size)
+            self.cell_min = np.zeros(2, dtype=np.int64)
+            self.cell_max = np.zeros(2, dtype=np.int64)
+            return
+
+        self.origin = self.points[valid].min(axis=0)
+        extent = self.points[valid].max(axis=0) - self.origin
+        if cell_size is None:
+            # Hücre başına ortalama ~2 nokta düşecek şekilde boyutlandır
+            area = max(float(extent[0]) * float(extent[1]), 1e-9)
+            cell_size = math.sqrt(2.0 * area / n) if area > 1e-9 else max(float(extent.max()), 1.0)
+        self.cell_size = max(float(cell_size), 1e-9)
+
+        # NaN (silinmiş) noktalar indekse alınmaz
+        members = np.flatnonzero(valid)
+        cell_coords = np.floor((self.points[members] - self.origin) / self.cell_size).astype(np.int64)
+        self.cell_min = cell_coords.min(axis=0)
+        self.cell_max = cell_coords.max(axis=0)
+        span = self.cell_max + 1
+        keys = cell_coords[:, 0] * int(span[1]) + cell_coords[:, 1]
+        order = np.argsort(keys, kind="stable")
+        sorted_keys = keys[order]
+        boundaries = np.flatnonzero(np.diff(sorted_keys)) + 1
+        starts = np.concatenate(([0], boundaries))
+        ends = np.concatenate((boundaries, [len(members)]))
+        for start, end in zip(starts, ends):
+            cx, cy = cell_coords[order[start]]
+            self.cells[(int(cx), int(cy))] = members[order[start:end]]
+
+    def _search_bound(self, center: Tuple[int, int]) -> int:
+        """Merkezden en uzak dolu hücreye Chebyshev uzaklığı (halka aramasının üst sınırı)."""
+        c = np.asarray(center, dtype=np.int64)
+        return int(max(0, np.max(np.maximum(c - self.cell_min, self.cell_max - c))))
+
+    def insert(self, i: int, points: np.ndarray):
+        """points[i] noktasını indekse ekle (points, çağıranın güncel koordinat dizisi)."""
+        self.points = points
+        cell = self._cell_of(points[i])
+        existing = self.cells.get(cell)
+        self.cells[cell] = np.array([i]) if existing is None else np.append(existing, i)
+        self.cell_min = np.minimum(self.cell_min, cell)
+        self.cell_max = np.maximum(self.cell_max, cell)
+
+    def remove(self, i: int, point):
+        """Daha önce `point` konumunda eklenmiş i noktasını indeksten çıkar."""
+        cell = self._cell_of(point)
+        existing = self.cells.get(cell)
+        if existing is None:
+            return
+        remaining = existing[existing != i]
+        if len(remaining):
+            self.cells[cell] = remaining
+        else:
+            del self.cells[cell]
+
+    def _cell_of(self, point) -> Tuple[int, int]:
+        cx = int(math.floor((point[0] - self.origin[0]) / self.cell_size))
+        cy = int(math.floor((point[1] - self.origin[1]) / self.cell_size))
+        return cx, cy
+
+    def _ring(self, center: Tuple[int, int], r: int) -> List[np.ndarray]:
+        """Merkez hücreye Chebyshev uzaklığı tam olarak r olan hücrelerdeki noktalar."""
+        cx, cy = center
+        found = []
+        if r == 0:
+            cell = self.cells.get((cx, cy))
+            return [cell] if cell is not None else []
+        for dx in range(-r, r + 1):
+            for dy in (-r, r):
+                cell = self.cells.get((cx + dx, cy + dy))
+                if cell is not None:
+                    found.append(cell)
+        for dy in range(-r + 1, r):
+            for dx in (-r, r):
+                cell = self.cells.get((cx + dx, cy + dy))
+                if cell is not None:
+                    found.append(cell)
+        return found
+
+    def query_knn(self, point, k: int, exclude: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Noktaya en yakın k noktanın indekslerini ve mesafelerini (artan sırada) döndür.
+
+        exclude: True olan indeksler sonuçlara dahil edilmez (ör. sorgu noktasının kendisi).
+        """
+        point = np.asarray(point, dtype=np.float64)
+        center = self._cell_of(point)
+        bound = self._search_bound(center)
+        candidates: List[np.ndarray] = []
+        r = 0
+        while True:
+            ring = self._ring(center, r)
+            if ring:
+                ring_idx = np.concatenate(ring)
+                if exclude is not None:
+                    ring_idx = ring_idx[~exclude[ring_idx]]
+                candidates.append(ring_idx)
+            total = sum(len(c) for c in candidates)
+            exhausted = r >= bound
+            # Aranan blok dışındaki her nokta en az r * cell_size uzaktadır
+            if total >= k or exhausted:
+                idx = np.concatenate(candidates) if candidates else np.empty(0, dtype=np.int64)
+                dist = np.hypot(self.points[idx, 0] - point[0], self.points[idx, 1] - point[1])
+                if len(idx) > k:
+                    part = np.argpartition(dist, k - 1)[:k]
+                    idx, dist = idx[part], dist[part]
+                if exhausted or dist.max(initial=0.0) <= r * self.cell_size:
+                    order = np.argsort(dist, kind="stable")
+                    return idx[order], dist[order]
+            r += 1
+
+    def query_radius(self, point, radius: float, exclude: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Noktaya en fazla `radius` uzaklıktaki noktaların indekslerini ve mesafelerini döndür."""
+        point = np.asarray(point, dtype=np.float64)
+        center = self._cell_of(point)
+        rings = int(math.ceil(radius / self.cell_size))
+        candidates = []
+        for r in range(min(rings, self._search_bound(center)) + 1):
+            candidates.extend(self._ring(center, r))
+        if not candidates:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        idx = np.concatenate(candidates)
+        if exclude is not None:
+            idx = idx[~exclude[idx]]
+        dist = np.hypot(self.points[idx, 0] - point[0], self.points[idx, 1] - point[1])
+        keep = dist <= radius
+        order = np.argsort(dist[keep], kind="stable")
+        return idx[keep][order], dist[keep][order]
+
+class ZoneIndex:
+    """Uçuş yasağı bölgelerinin sınırlayıcı kutuları (bbox) üzerine kurulan düzgün ızgara indeksi.
+
+    Senaryo başına bir kez kurulur; bir doğru parçası sorgusu yalnızca kutusu parçanın kutusuyla
+    çakışan aday bölgeleri döndürür. Graph, CSP, GA ve A* aynı indeksi paylaşabilir.
+    """
+    def __init__(self, no_fly_zones: list, cell_size: Optional[float] = None):
+        self.zones = list(no_fly_zones)
+        # Toplu kesişim çekirdeği için paketlenmiş kenarlar
+        self.packed: PackedPolygons = pack_polygons([zone.coordinates for zone in self.zones])
+        if not self.zones:
+            self.bboxes = np.empty((0, 4))
+            self.cells: Dict[Tuple[int, int], List[int]] = {}
+            self.origin = np.zeros(2)
+            self.cell_size = 1.0
+            self.shape = (0, 0)
+            return
+
+        coords = [np.asarray(zone.coordinates, dtype=np.float64).reshape(-1, 2) for zone in self.zones]
+        self.bboxes = np.array([[c[:, 0].min(), c[:, 1].min(), c[:, 0].max(), c[:, 1].max()] for c in coords])
+        self.origin = self.bboxes[:, :2].min(axis=0)
+        extent = self.bboxes[:, 2:].max(axis=0) - self.origin
+        if cell_size is None:
+            # Ortalama bölge boyutunda hücreler; ızgara en fazla 256×256
+            sizes = np.maximum(self.bboxes[:, 2] - self.bboxes[:, 0], self.bboxes[:, 3] - self.bboxes[:, 1])
+            cell_size = max(float(sizes.mean()), float(extent.max()) / 256.0)
+        self.cell_size = max(float(cell_size), 1e-9)
+        self.shape = (int(extent[0] // self.cell_size) + 1, int(extent[1] // self.cell_size) + 1)
+
+        self.cells = {}
+        for zi, (x0, y0, x1, y1) in enumerate(self.bboxes):
+            cx0, cy0, cx1, cy1 = self._cell_range(x0, y0, x1, y1)
+            for cx in range(cx0, cx1 + 1):
+                for cy in range(cy0, cy1 + 1):
+                    self.cells.setdefault((cx, cy), []).append(zi)
+
+    def _cell_range(self, x0: float, y0: float, x1: float, y1: float) -> Tuple[int, int, int, int]:
+        """Kutunun kapladığı hücre aralığı (ızgara sınırlarına kırpılmış)."""
+        nx, ny = self.shape
+        cx0 = min(max(int(math.floor((x0 - self.origin[0]) / self.cell_size)), 0), nx - 1)
+        cy0 = min(max(int(math.floor((y0 - self.origin[1]) / self.cell_size)), 0), ny - 1)
+        cx1 = min(max(int(math.floor((x1 - self.origin[0]) / self.cell_size)), 0), nx - 1)
+        cy1 = min(max(int(math.floor((y1 - self.origin[1]) / self.cell_size)), 0), ny - 1)
+        return cx0, cy0, cx1, cy1
+
+    def candidates(self, pos1: Tuple[float, float], pos2: Tuple[float, float]) -> List[int]:
+        """Kutusu doğru parçasının kutusuyla çakışan bölgelerin indekslerini döndür."""
+        if not self.zones:
+            return []
+        x0, x1 = min(pos1[0], pos2[0]), max(pos1[0], pos2[0])
+        y0, y1 = min(pos1[1], pos2[1]), max(pos1[1], pos2[1])
+        b = self.bboxes
+        cx0, cy0, cx1, cy1 = self._cell_range(x0, y0, x1, y1)
+        if (cx1 - cx0 + 1) * (cy1 - cy0 + 1) > len(self.zones):
+            # Uzun parçalarda hücre taramak yerine tüm kutuları tek seferde karşılaştır
+            hits = (b[:, 0] <= x1) & (b[:, 2] >= x0) & (b[:, 1] <= y1) & (b[:, 3] >= y0)
+            return np.flatnonzero(hits).tolist()
+        found = set()
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                found.update(self.cells.get((cx, cy), ()))
+        return sorted(zi for zi in found
+                      if b[zi, 0] <= x1 and b[zi, 2] >= x0 and b[zi, 1] <= y1 and b[zi, 3] >= y0)
+
+    def candidate_zones(self, pos1: Tuple[float, float], pos2: Tuple[float, float], current_time: Optional[float] = None) -> list:
+        """Aday bölge nesneleri; current_time verilirse yalnızca o anda aktif olanlar."""
+        zones = [self.zones[zi] for zi in self.candidates(pos1, pos2)]
+        if current_time is None:
+            return zones
+        return [zone for zone in zones if zone.is_active(current_time)]
@@ -0,0 +1,228 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+import numpy as np
+from src.utils.geometry import pack_polygons, segments_intersect_polygons
+
+def _convex_offset_vertices(polygon, clearance: float) -> np.ndarray:
+    """Çokgenin dışbükey köşelerini dışa doğru `clearance` kadar itilmiş olarak döndür.
+
+    En kısa engelden kaçınan yollar yalnızca dışbükey köşelerde kırılır; içbükey köşeler atlanır.
+    Köşeyi biraz dışarı itmek, kenar boyunca uçan parçaların çokgene "değmiş" sayılmasını önler.
+    """
+    coords = np.asarray(polygon, dtype=np.float64).reshape(-1, 2)
+    if len(coords) < 3:
+        return coords
+    x, y = coords[:, 0], coords[:, 1]
+    area = 0.5 * np.sum(x * np.roll(y, -1) - np.roll(x, -1) * y)
+    orientation = 1.0 if area >= 0 else -1.0
+    prev = coords - np.roll(coords, 1, axis=0)
+    nxt = np.roll(coords, -1, axis=0) - coords
+    cross = prev[:, 0] * nxt[:, 1] - prev[:, 1] * nxt[:, 0]
+    convex = cross * orientation > 0
+
+    # Kenarların dış normalleri (saat yönü tersi çokgende sağ taraf)
+    def outward(d):
+        n = np.stack((d[:, 1], -d[:, 0]), axis=1) * orientation
+        length = np.linalg.norm(n, axis=1, keepdims=True)
+        return n / np.where(length > 0, length, 1.0)
+
+    bisector = outward(prev) + outward(nxt)
+    length = np.linalg.norm(bisector, axis=1, keepdims=True)
+    bisector = bisector / np.where(length > 0, length, 1.0)
+    return (coords + clearance * bisector)[convex]
+
+def _is_convex(coords: np.ndarray) -> bool:
+    """Köşe dizisinin dışbükey (tüm dönüşleri aynı yönde) bir çokgen olup olmadığı."""
+    prev = coords - np.roll(coords, 1, axis=0)
+    nxt = np.roll(coords, -1, axis=0) - coords
+    cross = prev[:, 0] * nxt[:, 1] - prev[:, 1] * nxt[:, 0]
+    return bool((cross >= 0).all() or (cross <= 0).all())
+
+def _cones(points: np.ndarray, coords: np.ndarray, bbox: np.ndarray, eps: float = 1e-9) -> np.ndarray:
+    """Noktalardan bölgenin göründüğü açı aralığının kenar ışınları (nokta başına bir satır).
+
+    Sütunlar: eps kadar genişletilmiş aralığın alt/üst ışınları (cos, sin, cos, sin), eps kadar daraltılmış
+    aralığınkiler, noktanın kutu dışında olup olmadığı ve kutuya uzaklığın karesi. Kutu dışındaki noktadan
+    bakıldığında bölge bir yarı düzlemde kaldığından aralık π'den dardır; kutu içindeki noktalar için anlamsızdır.
+    """
+    center = np.array([(bbox[0] + bbox[2]) / 2, (bbox[1] + bbox[3]) / 2])
+    to_center = center[None, :] - points
+    rel = coords[None, :, :] - points[:, None, :]
+    angle = np.arctan2(to_center[:, None, 0] * rel[:, :, 1] - to_center[:, None, 1] * rel[:, :, 0],
+                       to_center[:, None, 0] * rel[:, :, 0] + to_center[:, None, 1] * rel[:, :, 1])
+    base = np.arctan2(to_center[:, 1], to_center[:, 0])
+    lo, hi = base + angle.min(axis=1), base + angle.max(axis=1)
+    gx = np.maximum(np.maximum(bbox[0] - points[:, 0], points[:, 0] - bbox[2]), 0.0)
+    gy = np.maximum(np.maximum(bbox[1] - points[:, 1], points[:, 1] - bbox[3]), 0.0)
+    columns = []
+    for margin in (eps, -eps):
+        columns += [np.cos(lo - margin), np.sin(lo - margin), np.cos(hi + margin), np.sin(hi + margin)]
+    return np.stack(columns + [(gx > 0) | (gy > 0), gx * gx + gy * gy], axis=1)
+
+def _in_cone(rays: np.ndarray, dx: np.ndarray, dy: np.ndarray) -> np.ndarray:
+    """(dx, dy) yönlerinin, satırın (cos_lo, sin_lo, cos_hi, sin_hi) ışınları arasındaki açıda olup olmadığı."""
+    return (rays[:, 0] * dy - rays[:, 1] * dx >= 0) & (dx * rays[:, 3] - dy * rays[:, 2] >= 0)
+
+def _zone_candidates(a: np.ndarray, b: np.ndarray, a_cones: np.ndarray, b_cones: np.ndarray, bbox: np.ndarray,
+                     convex: bool, eps: float = 1e-9) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """a×b parçalarından bölgeye çarpabilecek olanlar: (a indeksleri, b indeksleri, kesinlikle çarpar maskesi).
+
+    Elenen çiftler bölgeye çarpmaz: parçanın kutusu bölge kutusuyla çakışmalı, uçların bölge kutusuna uzaklığı parça
+    boyunu aşmamalı ve kutu dışındaki her uç, diğerini bölgenin kendisinden göründüğü açı aralığında (koni) görmelidir.
+    Dışbükey bölgede, uçların ikisi de kutu dışındaysa karşılıklı koni koşulu kesişimin tam karşılığıdır: açı
+    aralığının içinde kalan çiftler kesin testsiz engellidir, yalnızca sınırdakiler kesin teste gider.
+    """
+    x0, y0, x1, y1 = bbox
+    ax, ay = a[:, 0, None], a[:, 1, None]
+    bx, by = b[None, :, 0], b[None, :, 1]
+    ri, ci = np.nonzero((np.minimum(ax, bx) <= x1) & (np.maximum(ax, bx) >= x0) &
+                        (np.minimum(ay, by) <= y1) & (np.maximum(ay, by) >= y0))
+    # Ucuz koşullardan pahalıya: her adımda kalan çiftler daraltılır
+    dx, dy = b[ci, 0] - a[ri, 0], b[ci, 1] - a[ri, 1]
+    reach = (dx * dx + dy * dy) * (1 + eps)
+    keep = (a_cones[ri, 9] <= reach) & (b_cones[ci, 9] <= reach)
+    ri, ci, dx, dy = ri[keep], ci[keep], dx[keep], dy[keep]
+    a_out = a_cones[ri, 8] > 0
+    keep = _in_cone(a_cones[ri, :4], dx, dy) | ~a_out
+    ri, ci, dx, dy, a_out = ri[keep], ci[keep], dx[keep], dy[keep], a_out[keep]
+    b_out = b_cones[ci, 8] > 0
+    keep = _in_cone(b_cones[ci, :4], -dx, -dy) | ~b_out
+    ri, ci = ri[keep], ci[keep]
+    if not convex:
+        return ri, ci, np.zeros(len(ri), dtype=bool)
+    dx, dy, a_out, b_out = dx[keep], dy[keep], a_out[keep], b_out[keep]
+    certain = a_out & b_out & _in_cone(a_cones[ri, 4:8], dx, dy) & _in_cone(b_cones[ci, 4:8], -dx, -dy)
+    return ri, ci, certain
+
+def blocked_pairs(a: np.ndarray, b: np.ndarray, polygons: list, symmetric: bool = False,
+                  max_segments: int = 1 << 20, workers: int = 1) -> np.ndarray:
+    """a×b nokta çiftleri arasındaki parçaların herhangi bir çokgene çarpıp çarpmadığı.
+
+    Her bölge için çiftler önce _zone_candidates ile elenir; kesin kesişim çekirdeği yalnızca kesin karara
+    varılamayan adaylarda çalışır. symmetric=True (a ile b aynı nokta kümesi) ise yalnızca i < j çiftleri test
+    edilip aynalanır. Satır blokları workers > 1 ise iş parçacıklarında işlenir (NumPy çekirdekleri GIL'i bırakır).
+    """
+    blocked = np.zeros((len(a), len(b)), dtype=bool)
+    if not polygons or len(a) == 0 or len(b) == 0:
+        return blocked
+    zones = []
+    for polygon in polygons:
+        coords = np.asarray(polygon, dtype=np.float64).reshape(-1, 2)
+        if len(coords):
+            bbox = np.array([coords[:, 0].min(), coords[:, 1].min(), coords[:, 0].max(), coords[:, 1].max()])
+            a_cones = _cones(a, coords, bbox)
+            b_cones = a_cones if symmetric else _cones(b, coords, bbox)
+            zones.append((bbox, _is_convex(coords), pack_polygons([coords]), a_cones, b_cones))
+    rows = max(1, max_segments // len(b))
+    blocks = [(start, min(start + rows, len(a))) for start in range(0, len(a), rows)]
+
+    def solve_block(block: Tuple[int, int]):
+        start, stop = block
+        # Simetrik durumda yalnızca sağ üst üçgen: sütunlar start'tan başlar
+        first = start if symmetric else 0
+        for bbox, convex, packed, a_cones, b_cones in zones:
+            ri, ci, certain = _zone_candidates(a[start:stop], b[first:],
+                                               a_cones[start:stop], b_cones[first:], bbox, convex)
+            ri, ci = ri + start, ci + first
+            if symmetric:
+                upper = ci > ri
+                ri, ci, certain = ri[upper], ci[upper], certain[upper]
+            blocked[ri[certain], ci[certain]] = True
+            ri, ci = ri[~certain], ci[~certain]
+            if len(ri) == 0:
+                continue
+            hits = segments_intersect_polygons(np.hstack((a[ri], b[ci])), packed)[:, 0]
+            blocked[ri[hits], ci[hits]] = True
+
+    if workers > 1 and len(blocks) > 1:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(solve_block, blocks))
+    else:
+        for block in blocks:
+            solve_block(block)
+    if symmetric:
+        blocked |= blocked.T
+    return blocked
+
+class DetourTable:
+    """Uçuş yasağı bölgelerinden kaçınan en kısa uçuş mesafeleri (tüm düğüm çiftleri).
+
+    Görünürlük grafı bölgelerin dışbükey köşeleri ile drone/teslimat düğümlerinden kurulur:
+    iki nokta arasındaki parça hiçbir aktif bölgeye çarpmıyorsa birbirini görür (blocked_pairs: bölge başına
+    kutu/koni elemesi, kesin test yalnızca karar verilemeyen çiftlerde; yoğun grafta kurulmuş kenar önbelleği
+    varsa doğrudan ondan okunur). Köşeler arası
+    en kısa yollar bir kez hesaplanır; ardından her kaynak düğüm için
+    d(a, b) = min(doğrudan, min_u,v d(a, u) + D(u, v) + d(v, b)) kaynak blokları halinde
+    (isteğe bağlı iş parçacıklarıyla paralel) hesaplanır. Sorgular O(1) dizi okumasıdır.
+    """
+    def __init__(self, graph, current_time: Optional[float] = None, clearance: float = 1e-6,
+                 workers: int = 1, block_size: int = 256):
+        self.graph = graph
+        self.current_time = current_time
+        zones = graph.zone_index.zones
+        active = [zone for zone in zones if current_time is None or zone.is_active(current_time)]
+        polygons = [zone.coordinates for zone in active]
+        packed = pack_polygons(polygons)
+        terminals = graph.coordinates  # Silinmiş düğüm yuvaları NaN'dır; mesafeleri de NaN kalır
+        # Pay, koordinat ölçeğine göre büyütülür (kayan nokta yönelim testleri için)
+        clearance *= max(1.0, float(np.nanmax(np.abs(terminals), initial=0.0)))
+
+        vertices = [_convex_offset_vertices(zone.coordinates, clearance) for zone in active]
+        vertices = np.vstack(vertices) if vertices else np.empty((0, 2))
+        # Başka bir bölgenin içinde kalan köşeler kullanılamaz
+        if len(vertices):
+            inside = segments_intersect_polygons(np.hstack((vertices, vertices)), packed).any(axis=1)
+            vertices = vertices[~inside]
+        self.vertices = vertices
+        v = len(vertices)
+
+        # Doğrudan görünürlük (terminal-terminal); yalnızca bir bölgeye çarpabilecek çiftler kesin test edilir
+        self.distances = np.hypot(terminals[:, None, 0] - terminals[None, :, 0], terminals[:, None, 1] - terminals[None, :, 1])
+        if graph.indptr is None and graph._edge_cache is not None:
+            # Kurulmuş yoğun kenar önbelleğinde doğrudan engellenme zaten dilim bit kümesinde
+            cache = graph.edge_cache
+            bits = cache.slice_bits(cache.slices.slice_of(current_time))
+            blocked = np.unpackbits(bits[:len(terminals)], axis=1, bitorder="little", count=len(terminals)).astype(bool)
+        else:
+            # Silinmiş düğüm yuvaları (NaN) aday elemesinden geçmez; mesafeleri NaN kalır
+            blocked = blocked_pairs(terminals, terminals, polygons, symmetric=True, workers=workers)
+        self.distances[blocked] = np.inf
+        np.fill_diagonal(self.distances, 0.0)
+        if v == 0 or not blocked.any():
+            return
+
+        # Köşe-köşe görünürlük grafı ve köşeler arası en kısa yollar (Floyd-Warshall)
+        vv = np.hypot(vertices[:, None, 0] - vertices[None, :, 0], vertices[:, None, 1] - vertices[None, :, 1])
+        vv[blocked_pairs(vertices, vertices, polygons, symmetric=True)] = np.inf
+        np.fill_diagonal(vv, 0.0)
+        for k in range(v):
+            np.minimum(vv, vv[:, k, None] + vv[None, k, :], out=vv)
+
+        # Terminal-köşe görünürlüğü
+        tv = np.hypot(terminals[:, None, 0] - vertices[None, :, 0], terminals[:, None, 1] - vertices[None, :, 1])
+        tv[blocked_pairs(terminals, vertices, polygons, workers=workers)] = np.inf
+
+        # Yalnızca doğrudan görüşü engellenen çiftleri olan kaynaklar için dolambaçlı yol hesapla
+        sources = np.flatnonzero(blocked.any(axis=1))
+        blocks = [sources[i:i + block_size] for i in range(0, len(sources), block_size)]
+
+        def solve_block(rows: np.ndarray):
+            # a -> v: önce ilk köşeye, sonra köşeler arası en kısa yol
+            to_vertex = np.full((len(rows), v), np.inf)
+            for u in range(v):
+                np.minimum(to_vertex, tv[rows, u, None] + vv[None, u, :], out=to_vertex)
+            result = self.distances[rows].copy()
+            for w in range(v):
+                np.minimum(result, to_vertex[:, w, None] + tv[None, :, w], out=result)
+            self.distances[rows] = result
+
+        if workers > 1 and len(blocks) > 1:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                list(pool.map(solve_block, blocks))
+        else:
+            for rows in blocks:
+                solve_block(rows)
+
+    def distance(self, i: int, j: int) -> float:
+        """i ve j düğümleri arasındaki engelden kaçınan uçuş mesafesi (ulaşılamıyorsa inf)."""
+        return float(self.distances[i, j])
@@ -33,10 +33,10 @@ def plot_routes(drones: list[Drone], delivery_points: list[DeliveryPoint], no_fl
             x, y = [drones[i].start_pos[0]], [drones[i].start_pos[1]]
             for dp_id in route:
                 try:
-                    dp = next(dp for dp in delivery_points if dp.id == dp_id)
-                    x.append(dp.pos[0])
-                    y.append(dp.pos[1])
-                except StopIteration:
+                    dp_pos = graph.get_node_position(f"dp_{dp_id}")
+                    x.append(dp_pos[0])
+                    y.append(dp_pos[1])
+                except ValueError:
                     print(f"Uyarı: Teslimat noktası ID {dp_id} bulunamadı, rotada atlanıyor.")
                     continue
             plt.plot(x, y, color=color, linestyle="-", label=f"Drone {drones[i].id} Rotası")